@@ -0,0 +1,96 @@
+"""响应解码基准：dict 与 __slots__ 记录的内存和解码耗时
+
+构造与 list_v2 响应结构一致的配置文件列表，对比:
+- dict: json.loads 后保留完整的嵌套 dict（当前默认行为）
+- records: 用 models.loads（安装了 orjson 时使用 orjson）解析后投影为 Profile，只保留所需字段
+
+内存为 tracemalloc 统计的、解码后仍被持有的记录占用（不含响应正文）。
+
+用法: python -m benchmarks.bench_models [--profiles 100000] [--fields dir_id,window_name,proxy_info]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_payload(count: int, page_size: int = 100) -> List[bytes]:
+    """生成 count 条配置文件，按 page_size 分页编码为响应正文"""
+    pages = []
+    for start in range(0, count, page_size):
+        rows = []
+        for i in range(start, min(start + page_size, count)):
+            rows.append({
+                "dirId": f"{i:032x}",
+                "workspaceId": 1,
+                "windowName": f"AutoProfile_{i + 1}",
+                "windowSortNum": i + 1,
+                "os": "Windows" if i % 2 else "macOS",
+                "labelIds": [i % 7],
+                "proxyInfo": {"proxyMethod": "custom", "proxyHost": f"10.0.{i % 256}.{i % 200}", "proxyPort": 8000 + i % 100},
+                "fingerInfo": {"randomFingerprint": True, "webgl": "noise", "canvas": "noise", "clientRects": "noise"},
+                "createTime": 1700000000.0 + i,
+                "updateTime": 1700000000.0 + i
+            })
+        pages.append(json.dumps({"code": 0, "msg": "success", "data": {"total": count, "list": rows}}).encode())
+    return pages
+
+
+def measure(pages: List[bytes], decode: Callable[[bytes], List], repeat: int) -> Dict:
+    """返回解码耗时（取最小值）和持有结果的内存"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        held = [item for page in pages for item in decode(page)]
+        best = min(best, time.perf_counter() - start)
+        del held
+
+    gc.collect()
+    tracemalloc.start()
+    held = [item for page in pages for item in decode(page)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return {"decode_s": round(best, 4), "memory_mb": round(current / 1024 / 1024, 2)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="响应解码基准")
+    parser.add_argument("--profiles", type=int, default=100000, help="配置文件数量")
+    parser.add_argument("--fields", default="dir_id,window_name,proxy_info", help="records 方式保留的字段")
+    parser.add_argument("--repeat", type=int, default=3, help="解码耗时重复次数")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from core.models import JSON_BACKEND, Profile, list_rows, loads
+
+    pages = make_payload(args.profiles)
+    fields = [f for f in args.fields.split(",") if f]
+    project = Profile.decoder(fields)
+    full = Profile.decoder()
+
+    scenarios = {
+        "dict": lambda raw: json.loads(raw)["data"]["list"],
+        "records_all_fields": lambda raw: [full(row) for row in list_rows(loads(raw)["data"])],
+        "records_projected": lambda raw: [project(row) for row in list_rows(loads(raw)["data"])]
+    }
+    results = {name: measure(pages, decode, args.repeat) for name, decode in scenarios.items()}
+    base = results["dict"]
+    for name, result in results.items():
+        result["memory_ratio"] = round(result["memory_mb"] / base["memory_mb"], 3) if base["memory_mb"] else None
+        result["speedup"] = round(base["decode_s"] / result["decode_s"], 2) if result["decode_s"] else None
+
+    report = {"profiles": args.profiles, "fields": fields, "json_backend": JSON_BACKEND, "results": results}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
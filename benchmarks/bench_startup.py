@@ -0,0 +1,60 @@
+"""命令行启动耗时基准
+
+对每个任务分别测量两种启动方式的解释器墙钟时间（取中位数）:
+- lazy: 导入 main 并通过任务注册表只加载所选任务（当前实现）
+- eager: 导入 main 后加载全部任务模块并初始化日志（旧实现的等价开销）
+
+用法: python -m benchmarks.bench_startup [--runs 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_SNIPPET = "import main; from tasks import load_task; load_task({task!r})"
+EAGER_SNIPPET = (
+    "import main; from tasks import load_task, CLI_TASKS; "
+    "[load_task(t) for t in CLI_TASKS]; "
+    "from utils.logger import _configure; _configure()"
+)
+
+
+def measure(code: str, runs: int) -> float:
+    """返回执行 code 的解释器启动耗时中位数（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="命令行启动耗时基准")
+    parser.add_argument("--runs", type=int, default=15, help="每种方式的运行次数")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from tasks import CLI_TASKS
+
+    baseline = measure("pass", args.runs)
+    eager = measure(EAGER_SNIPPET, args.runs)
+    results = {"interpreter_ms": round(baseline, 1), "eager_ms": round(eager, 1), "tasks": {}}
+    for task in CLI_TASKS:
+        lazy = measure(LAZY_SNIPPET.format(task=task), args.runs)
+        results["tasks"][task] = {
+            "lazy_ms": round(lazy, 1),
+            "speedup": round(eager / lazy, 2)
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""客户端与批量任务吞吐基准
+
+每个场景在独立子进程中对本地 FakeRoxyServer 运行，记录墙钟时间、每秒请求数、
+客户端延迟分位数和峰值 RSS，结果以 JSON 输出，并可与保存的基线比较。替身服务运行在
+场景进程之外的另一个进程中，峰值 RSS 只包含客户端。
+
+用法:
+    python -m benchmarks.bench_throughput                       # 全部场景
+    python -m benchmarks.bench_throughput --quick               # 小规模快速运行
+    python -m benchmarks.bench_throughput --output result.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_throughput --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _scenarios(quick: bool) -> List[Tuple[str, Dict]]:
+    """场景名与参数"""
+    create_sizes = [100] if quick else [100, 1000, 10000]
+    workspace = 500 if quick else 5000
+    calls = 500 if quick else 5000
+    scenarios = [("client_calls", {"calls": calls, "threads": 16})]
+    scenarios += [(f"create_{n}", {"num": n}) for n in create_sizes]
+    scenarios += [
+        ("modify_proxies", {"profiles": workspace}),
+        ("random_fingerprints", {"profiles": workspace}),
+        ("pagination", {"profiles": workspace * 4, "page_size": 100, "prefetch": 2})
+    ]
+    return scenarios
+
+
+# ---------------------------------------------------------------------- 替身服务进程
+
+def _serve(conn, kwargs: Dict) -> None:
+    """在独立进程中运行 FakeRoxyServer，按管道收到的 (方法名, 参数) 调用并返回结果"""
+    sys.path.insert(0, ROOT)
+    from testing import FakeRoxyServer
+
+    with FakeRoxyServer(**kwargs) as server:
+        conn.send(server.base_url)
+        while True:
+            method, args = conn.recv()
+            if method is None:
+                return
+            conn.send(getattr(server, method)(*args))
+
+
+class _ServerProcess:
+    """独立进程中的 FakeRoxyServer，提供场景用到的 add_profiles、stats 和 reset_stats"""
+
+    def __init__(self, **kwargs):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, args=(child, kwargs), daemon=True)
+        self._process.start()
+        self.base_url = self._conn.recv()
+
+    def _call(self, method: str, *args):
+        self._conn.send((method, args))
+        return self._conn.recv()
+
+    def add_profiles(self, *args) -> List[str]:
+        return self._call("add_profiles", *args)
+
+    def stats(self) -> Dict:
+        return self._call("stats")
+
+    def reset_stats(self) -> None:
+        self._call("reset_stats")
+
+    def __enter__(self) -> "_ServerProcess":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._conn.send((None, ()))
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+# ---------------------------------------------------------------------- 场景实现（在子进程中运行）
+
+def _run_client_calls(client, server, params: Dict) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    server.add_profiles(1, 100)
+    calls = params["calls"]
+
+    def call(i: int) -> None:
+        if i % 2:
+            client.health_check()
+        else:
+            client.list_profiles(1, size=20)
+
+    with ThreadPoolExecutor(max_workers=params["threads"]) as executor:
+        list(executor.map(call, range(calls)))
+
+
+def _run_create(client, server, params: Dict) -> None:
+    from tasks.create_profiles import create_multiple_profiles
+
+    created = create_multiple_profiles(
+        params["num"], 1, "Bench", concurrency=params["concurrency"], client=client
+    )
+    assert len(created) == params["num"], "创建数量不符"
+
+
+def _run_modify_proxies(client, server, params: Dict) -> None:
+    from tasks.modify_proxies import modify_profile_proxies
+
+    dir_ids = server.add_profiles(1, params["profiles"])
+    proxy = {"proxyMethod": "custom", "proxyHost": "127.0.0.1", "proxyPort": 8080}
+    assert modify_profile_proxies(dir_ids, proxy, 1, client=client)
+
+
+def _run_random_fingerprints(client, server, params: Dict) -> None:
+    from tasks.random_all_fp import random_fingerprints
+
+    server.add_profiles(1, params["profiles"])
+    assert random_fingerprints(1, client=client)
+
+
+def _run_pagination(client, server, params: Dict) -> None:
+    server.add_profiles(1, params["profiles"])
+    count = sum(1 for _ in client.iter_profiles(1, page_size=params["page_size"], prefetch=params["prefetch"]))
+    assert count == params["profiles"], "分页数量不符"
+
+
+_RUNNERS: Dict[str, Callable] = {
+    "client_calls": _run_client_calls,
+    "modify_proxies": _run_modify_proxies,
+    "random_fingerprints": _run_random_fingerprints,
+    "pagination": _run_pagination
+}
+
+
+def run_scenario(name: str, params: Dict) -> Dict:
+    """在当前进程中运行单个场景并返回结果"""
+    sys.path.insert(0, ROOT)
+    from core import RoxyAPIClient
+
+    runner = _RUNNERS.get(name) or (_run_create if name.startswith("create_") else None)
+    if runner is None:
+        raise KeyError(f"未知场景: {name}")
+
+    with _ServerProcess(token="bench", latency=params.get("latency"), seed=0) as server:
+        client = RoxyAPIClient(server.base_url, "bench")
+        server.reset_stats()
+        # 任务逐条打印结果，基准中丢弃输出
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            runner(client, server, params)
+            wall = time.perf_counter() - start
+        stats = server.stats()
+        metrics = client.metrics()
+        client.close()
+
+    latency = {}
+    for endpoint, data in metrics.items():
+        latency[endpoint] = {k: round(v * 1000, 3) for k, v in data["latency"].items()}
+    errors = sum(data["errors"] for data in metrics.values())
+
+    return {
+        "scenario": name,
+        "params": params,
+        "wall_time_s": round(wall, 4),
+        "requests": stats["total_requests"],
+        "requests_per_s": round(stats["total_requests"] / wall, 1) if wall else 0.0,
+        "errors": errors,
+        "latency_ms": latency,
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+# ---------------------------------------------------------------------- 调度与比较
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """与基线比较墙钟时间，返回比较结果列表"""
+    base = {item["scenario"]: item for item in baseline}
+    comparisons = []
+    for item in results:
+        old = base.get(item["scenario"])
+        if old is None:
+            continue
+        ratio = item["wall_time_s"] / old["wall_time_s"] if old["wall_time_s"] else 1.0
+        comparisons.append({
+            "scenario": item["scenario"],
+            "baseline_s": old["wall_time_s"],
+            "current_s": item["wall_time_s"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance
+        })
+    return comparisons
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="客户端与批量任务吞吐基准")
+    parser.add_argument("--quick", action="store_true", help="只运行小规模场景")
+    parser.add_argument("--only", nargs="*", help="只运行指定场景")
+    parser.add_argument("--concurrency", type=int, default=8, help="批量创建的并发数")
+    parser.add_argument("--latency", type=float, default=0.0, help="替身服务的固定延迟(秒)")
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="允许的墙钟时间退化比例")
+    parser.add_argument("--_child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._child:
+        name, params = json.loads(args._child)
+        print(json.dumps(run_scenario(name, params)))
+        return 0
+
+    results = []
+    for name, params in _scenarios(args.quick):
+        if args.only and name not in args.only:
+            continue
+        params = dict(params, concurrency=args.concurrency, latency=args.latency or None)
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_throughput", "--_child", json.dumps([name, params])],
+            cwd=ROOT,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            print(f"场景 {name} 运行失败:\n{proc.stderr}", file=sys.stderr)
+            return 1
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{name}: {result['wall_time_s']}s, {result['requests_per_s']} req/s", file=sys.stderr)
+        results.append(result)
+
+    report = {"results": results}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        report["comparison"] = compare(results, baseline, args.tolerance)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2, ensure_ascii=False)
+
+    if any(item["regression"] for item in report.get("comparison", [])):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
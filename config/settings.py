@@ -11,6 +11,34 @@ API_PORT = int(os.getenv("ROXY_API_PORT", 50000))
 API_TOKEN = os.getenv("ROXY_API_TOKEN", "YOUR_API_KEY_HERE")
 BASE_URL = f"http://{API_HOST}:{API_PORT}"
 
+
+def parse_api_nodes(value: str) -> list:
+    """解析多节点配置 "token@host:port,host:port"，缺省的端口和 token 取单节点配置"""
+    nodes = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        token, _, address = item.rpartition("@")
+        host, _, port = address.partition(":")
+        port = int(port) if port else API_PORT
+        nodes.append({
+            "host": host,
+            "port": port,
+            "token": token or API_TOKEN,
+            "base_url": f"http://{host}:{port}"
+        })
+    return nodes
+
+
+# 多节点配置（ROXY_API_NODES 为空时只使用上面的单个节点）
+API_NODES = parse_api_nodes(os.getenv("ROXY_API_NODES", "")) or [
+    {"host": API_HOST, "port": API_PORT, "token": API_TOKEN, "base_url": BASE_URL}
+]
+
+# 多节点下未找到归属的 dirId 在一次全量扫描后多少秒内不再重新扫描
+SHARD_MISS_TTL = float(os.getenv("ROXY_SHARD_MISS_TTL", 30))
+
 # 工作区配置
 DEFAULT_WORKSPACE_ID = int(os.getenv("ROXY_DEFAULT_WORKSPACE_ID", 1))
 
@@ -40,4 +68,115 @@ DEFAULT_HEADERS = {
 
 # 其他配置项
 REQUEST_TIMEOUT = int(os.getenv("ROXY_REQUEST_TIMEOUT", 30))
-MAX_RETRIES = int(os.getenv("ROXY_MAX_RETRIES", 3))
\ No newline at end of file
+MAX_RETRIES = int(os.getenv("ROXY_MAX_RETRIES", 3))
+
+# 异步客户端配置
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ROXY_ASYNC_MAX_IN_FLIGHT", 100))
+ASYNC_POOL_SIZE = int(os.getenv("ROXY_ASYNC_POOL_SIZE", 100))
+
+# 分页遍历配置
+LIST_PAGE_SIZE = int(os.getenv("ROXY_LIST_PAGE_SIZE", 100))
+LIST_PREFETCH = int(os.getenv("ROXY_LIST_PREFETCH", 2))
+
+# 连接池配置
+POOL_CONNECTIONS = int(os.getenv("ROXY_POOL_CONNECTIONS", 10))
+POOL_MAXSIZE = int(os.getenv("ROXY_POOL_MAXSIZE", 100))
+POOL_BLOCK = os.getenv("ROXY_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+TCP_KEEPALIVE = os.getenv("ROXY_TCP_KEEPALIVE", "true").lower() in ("1", "true", "yes")
+
+# 请求合并配置（窗口为 0 时不合并）
+COALESCE_WINDOW = float(os.getenv("ROXY_COALESCE_WINDOW", 0))
+COALESCE_MAX_BATCH = int(os.getenv("ROXY_COALESCE_MAX_BATCH", 50))
+
+# 连接信息缓存配置（TTL 为 0 时不缓存）
+CONNECTION_CACHE_TTL = float(os.getenv("ROXY_CONNECTION_CACHE_TTL", 10))
+CONNECTION_CACHE_SIZE = int(os.getenv("ROXY_CONNECTION_CACHE_SIZE", 1024))
+
+# 浏览器会话池配置
+SESSION_POOL_SIZE = int(os.getenv("ROXY_SESSION_POOL_SIZE", 5))
+SESSION_IDLE_TIMEOUT = float(os.getenv("ROXY_SESSION_IDLE_TIMEOUT", 300))
+
+# 客户端指标统计
+METRICS_ENABLED = os.getenv("ROXY_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# 自适应并发控制（AIMD）
+ADAPTIVE_CONCURRENCY = os.getenv("ROXY_ADAPTIVE_CONCURRENCY", "true").lower() in ("1", "true", "yes")
+ADAPTIVE_INITIAL_LIMIT = int(os.getenv("ROXY_ADAPTIVE_INITIAL_LIMIT", 8))
+ADAPTIVE_MIN_LIMIT = int(os.getenv("ROXY_ADAPTIVE_MIN_LIMIT", 1))
+ADAPTIVE_MAX_LIMIT = int(os.getenv("ROXY_ADAPTIVE_MAX_LIMIT", POOL_MAXSIZE))
+
+# 熔断配置
+BREAKER_ENABLED = os.getenv("ROXY_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("ROXY_BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_PROBE_INTERVAL = float(os.getenv("ROXY_BREAKER_PROBE_INTERVAL", 2))
+BREAKER_PROBE_TIMEOUT = float(os.getenv("ROXY_BREAKER_PROBE_TIMEOUT", 2))
+BREAKER_MAX_PAUSE = float(os.getenv("ROXY_BREAKER_MAX_PAUSE", 600))
+
+# 本地数据目录（配置文件索引、任务日志）
+DATA_DIR = os.getenv(
+    "ROXY_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+
+# 本地配置文件索引（SQLite）
+PROFILE_INDEX_ENABLED = os.getenv("ROXY_PROFILE_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_INDEX_PATH = os.getenv("ROXY_PROFILE_INDEX_PATH", os.path.join(DATA_DIR, "profile_index.db"))
+# 批量任务按索引选取目标时，距上次同步不超过该秒数则直接查询，否则先增量同步
+PROFILE_INDEX_MAX_AGE = float(os.getenv("ROXY_PROFILE_INDEX_MAX_AGE", 300))
+
+# 批量任务日志（SQLite），用于断点续跑
+JOURNAL_PATH = os.getenv("ROXY_JOURNAL_PATH", os.path.join(DATA_DIR, "jobs.db"))
+JOURNAL_BATCH_SIZE = int(os.getenv("ROXY_JOURNAL_BATCH_SIZE", 200))
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("ROXY_JOURNAL_FLUSH_INTERVAL", 1.0))
+
+# 批量登录（进程数为 0 时按 CPU 核数，浏览器上限为 0 时等于进程数 × 每进程浏览器数）
+LOGIN_FARM_PROCESSES = int(os.getenv("ROXY_LOGIN_FARM_PROCESSES", 0))
+LOGIN_FARM_DRIVERS_PER_PROCESS = int(os.getenv("ROXY_LOGIN_FARM_DRIVERS_PER_PROCESS", 4))
+LOGIN_FARM_MAX_BROWSERS = int(os.getenv("ROXY_LOGIN_FARM_MAX_BROWSERS", 0))
+
+# 代理检测（目标为 CONNECT/SOCKS5 握手时请求连接的地址）
+PROXY_PROBE_CONCURRENCY = int(os.getenv("ROXY_PROXY_PROBE_CONCURRENCY", 100))
+PROXY_PROBE_TIMEOUT = float(os.getenv("ROXY_PROXY_PROBE_TIMEOUT", 5))
+PROXY_PROBE_TARGET = os.getenv("ROXY_PROXY_PROBE_TARGET", "example.com:443")
+
+# 代理池（策略: round_robin / least_used / sticky_label；失败分数超过上限时停用代理）
+PROXY_POOL_POLICY = os.getenv("ROXY_PROXY_POOL_POLICY", "least_used")
+PROXY_POOL_MAX_FAILURES = float(os.getenv("ROXY_PROXY_POOL_MAX_FAILURES", 3))
+PROXY_POOL_FAILURE_DECAY = float(os.getenv("ROXY_PROXY_POOL_FAILURE_DECAY", 0.5))
+PROXY_POOL_BATCH_SIZE = int(os.getenv("ROXY_PROXY_POOL_BATCH_SIZE", 500))
+
+# 批量随机指纹（进度打印间隔为秒，0 为不打印）
+FP_REFRESH_CONCURRENCY = int(os.getenv("ROXY_FP_REFRESH_CONCURRENCY", 8))
+FP_REFRESH_PROGRESS_INTERVAL = float(os.getenv("ROXY_FP_REFRESH_PROGRESS_INTERVAL", 10))
+
+
+def parse_stage_concurrency(value: str) -> dict:
+    """解析各阶段并发数 "create=4,proxy=8"，返回 阶段名 -> 并发数"""
+    result = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, count = item.partition("=")
+        result[name.strip()] = int(count)
+    return result
+
+
+# 开通流水线（阶段: create / proxy / random_fp / login；队列长度为相邻阶段之间最多排队的配置文件数）
+PIPELINE_QUEUE_SIZE = int(os.getenv("ROXY_PIPELINE_QUEUE_SIZE", 100))
+PROVISION_CONCURRENCY = parse_stage_concurrency(
+    os.getenv("ROXY_PROVISION_CONCURRENCY", "create=4,proxy=8,random_fp=8,login=2")
+)
+
+# 定时任务调度器（抖动为每次触发随机推迟的最大秒数；清理过期配置文件时每次删除请求的 dirId 数）
+SCHEDULER_MAX_WORKERS = int(os.getenv("ROXY_SCHEDULER_MAX_WORKERS", 4))
+SCHEDULER_DEFAULT_JITTER = float(os.getenv("ROXY_SCHEDULER_DEFAULT_JITTER", 60))
+STALE_DELETE_BATCH_SIZE = int(os.getenv("ROXY_STALE_DELETE_BATCH_SIZE", 100))
+SCHEDULE_PATH = os.getenv(
+    "ROXY_SCHEDULE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule.json")
+)
+
+# 批量清空缓存（每批 dirId 数和并发请求数）
+CACHE_CLEAR_BATCH_SIZE = int(os.getenv("ROXY_CACHE_CLEAR_BATCH_SIZE", 200))
+CACHE_CLEAR_CONCURRENCY = int(os.getenv("ROXY_CACHE_CLEAR_CONCURRENCY", 4))
@@ -1,3 +1,51 @@
-from .roxy_client import RoxyAPIClient
+from .roxy_client import RoxyAPIClient, RoxyAPIError
+from .registry import get_client, close_all_clients
+from .session_pool import BrowserSession, BrowserSessionPool
+from .cdp_driver import CDPDriver, CDPError
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, call_with_pause
+from .profile_index import ProfileIndex
+from .job_journal import JobJournal
+from .sharding import ShardedRoxyClient
+from .models import Profile, Workspace, ConnectionInfo, Account, Label
+from .proxy_pool import ProxyPool, load_proxies
+from .pipeline import Pipeline, Stage
+from .scheduler import Scheduler, Job, CronSchedule, IntervalSchedule
 
-__all__ = ['RoxyAPIClient']
\ No newline at end of file
+__all__ = [
+    'RoxyAPIClient',
+    'RoxyAPIError',
+    'AsyncRoxyAPIClient',
+    'get_client',
+    'close_all_clients',
+    'BrowserSession',
+    'BrowserSessionPool',
+    'CDPDriver',
+    'CDPError',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'call_with_pause',
+    'ProfileIndex',
+    'JobJournal',
+    'ShardedRoxyClient',
+    'Profile',
+    'Workspace',
+    'ConnectionInfo',
+    'Account',
+    'Label',
+    'ProxyPool',
+    'load_proxies',
+    'Pipeline',
+    'Stage',
+    'Scheduler',
+    'Job',
+    'CronSchedule',
+    'IntervalSchedule'
+]
+
+
+def __getattr__(name):
+    # 异步客户端依赖 aiohttp，导入较慢，按需加载
+    if name == 'AsyncRoxyAPIClient':
+        from .async_client import AsyncRoxyAPIClient
+        return AsyncRoxyAPIClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,251 @@
+import asyncio
+import aiohttp
+from typing import Dict, List, Union, Optional
+from config.settings import (
+    BASE_URL,
+    API_TOKEN,
+    API_ENDPOINTS,
+    DEFAULT_HEADERS,
+    REQUEST_TIMEOUT,
+    MAX_RETRIES,
+    ASYNC_MAX_IN_FLIGHT,
+    ASYNC_POOL_SIZE
+)
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# 与同步客户端的 Retry 策略保持一致
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+RETRY_BACKOFF_FACTOR = 0.5
+
+
+class AsyncRoxyAPIClient:
+    """基于 asyncio 的 Roxy API 客户端
+
+    接口与 RoxyAPIClient 一致，所有方法均为协程，并额外支持 timeout 参数
+    覆盖单次请求的超时时间。并发请求数由 max_in_flight 限制，底层连接池在
+    同一事件循环内复用。
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        token: str = API_TOKEN,
+        max_in_flight: int = ASYNC_MAX_IN_FLIGHT,
+        pool_size: int = ASYNC_POOL_SIZE,
+        timeout: float = REQUEST_TIMEOUT,
+        max_retries: int = MAX_RETRIES
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight 必须大于0")
+
+        self.base_url = base_url
+        self.headers = DEFAULT_HEADERS.copy()
+        self.headers["Authorization"] = token
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        logger.debug(f"初始化 AsyncRoxyAPIClient: base_url={base_url}, max_in_flight={max_in_flight}")
+
+    async def __aenter__(self) -> "AsyncRoxyAPIClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """延迟创建会话，确保连接池绑定到当前事件循环"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """关闭底层连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """发送请求，5xx 响应与连接错误按指数退避重试"""
+        url = f"{self.base_url}{endpoint}"
+        client_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+        session = self._get_session()
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    logger.debug(f"发送 {method} 请求: {url}, params={params}, data={data}")
+                    async with session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=data,
+                        timeout=client_timeout
+                    ) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info,
+                                response.history,
+                                status=response.status
+                            )
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    logger.error(f"{method} 请求失败: {url}, 错误: {str(e)}")
+                    raise
+                delay = RETRY_BACKOFF_FACTOR * (2 ** attempt)
+                attempt += 1
+                logger.debug(f"{method} 请求重试 ({attempt}/{self.max_retries}): {url}, {delay}s 后重试")
+                await asyncio.sleep(delay)
+
+    async def _get(self, endpoint: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """发送 GET 请求到指定端点"""
+        return await self._request("GET", endpoint, params=params, timeout=timeout)
+
+    async def _post(self, endpoint: str, data: Dict, timeout: Optional[float] = None) -> Dict:
+        """发送 POST 请求到指定端点"""
+        return await self._request("POST", endpoint, data=data, timeout=timeout)
+
+    async def health_check(self, timeout: Optional[float] = None) -> Dict:
+        """检查 API 服务健康状态"""
+        return await self._get(API_ENDPOINTS["health_check"], timeout=timeout)
+
+    async def get_workspaces(self, timeout: Optional[float] = None) -> Dict:
+        """获取所有工作区列表"""
+        return await self._get(API_ENDPOINTS["workspaces"], timeout=timeout)
+
+    async def list_profiles(
+        self,
+        workspace_id: int,
+        sort_nums: str = "",
+        page: int = 1,
+        size: int = 20,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """获取指定工作区的配置文件列表"""
+        params = {
+            "workspaceId": workspace_id,
+            "sortNums": sort_nums,
+            "page": page,
+            "size": size
+        }
+        return await self._get(API_ENDPOINTS["list_profiles"], params, timeout=timeout)
+
+    async def get_accounts(
+        self,
+        workspace_id: int,
+        account_id: int = 0,
+        page: int = 1,
+        size: int = 15,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """获取已配置的平台账号列表"""
+        params = {
+            "workspaceId": workspace_id,
+            "accountId": account_id,
+            "page_index": page,
+            "page_size": size
+        }
+        return await self._get(API_ENDPOINTS["accounts"], params, timeout=timeout)
+
+    async def get_labels(self, workspace_id: int, timeout: Optional[float] = None) -> Dict:
+        """获取已配置的标签信息"""
+        params = {"workspaceId": workspace_id}
+        return await self._get(API_ENDPOINTS["labels"], params, timeout=timeout)
+
+    async def create_profile(self, data: Dict, timeout: Optional[float] = None) -> Dict:
+        """创建新的配置文件"""
+        return await self._post(API_ENDPOINTS["create_profile"], data, timeout=timeout)
+
+    async def modify_profile(self, data: Dict, timeout: Optional[float] = None) -> Dict:
+        """修改现有配置文件"""
+        return await self._post(API_ENDPOINTS["modify_profile"], data, timeout=timeout)
+
+    async def open_profile(
+        self,
+        dir_id: Union[str, int],
+        args: Optional[Union[str, int]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """打开指定的配置文件"""
+        data = {"dirId": dir_id}
+        if args:
+            data["args"] = args
+        return await self._post(API_ENDPOINTS["open_profile"], data, timeout=timeout)
+
+    async def close_profile(self, dir_id: Union[str, int], timeout: Optional[float] = None) -> Dict:
+        """关闭指定的配置文件"""
+        data = {"dirId": dir_id}
+        return await self._post(API_ENDPOINTS["close_profile"], data, timeout=timeout)
+
+    async def random_fingerprint(
+        self,
+        workspace_id: int,
+        dir_id: Union[str, int],
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """为指定配置文件随机生成指纹"""
+        data = {
+            "workspaceId": workspace_id,
+            "dirId": dir_id
+        }
+        return await self._post(API_ENDPOINTS["random_fingerprint"], data, timeout=timeout)
+
+    async def delete_profile(
+        self,
+        workspace_id: int,
+        dir_ids: List[Union[str, int]],
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """删除指定的配置文件"""
+        data = {
+            "workspaceId": workspace_id,
+            "dirIds": dir_ids
+        }
+        return await self._post(API_ENDPOINTS["delete_profile"], data, timeout=timeout)
+
+    async def get_connection_info(
+        self,
+        dir_ids: Optional[List[Union[str, int]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """获取已打开窗口的连接信息"""
+        data = {}
+        if dir_ids:
+            data["dirIds"] = dir_ids
+        return await self._post(API_ENDPOINTS["connection_info"], data, timeout=timeout)
+
+    async def clear_local_cache(self, dir_ids: List[Union[str, int]], timeout: Optional[float] = None) -> Dict:
+        """清空指定配置文件的本地缓存"""
+        data = {"dirIds": dir_ids}
+        return await self._post(API_ENDPOINTS["clear_local_cache"], data, timeout=timeout)
+
+    async def clear_server_cache(
+        self,
+        workspace_id: int,
+        dir_ids: List[Union[str, int]],
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """清空指定配置文件的服务器缓存"""
+        data = {
+            "workspaceId": workspace_id,
+            "dirIds": dir_ids
+        }
+        return await self._post(API_ENDPOINTS["clear_server_cache"], data, timeout=timeout)
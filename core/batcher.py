@@ -0,0 +1,112 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+DirId = Union[str, int]
+
+
+class _Batch:
+    __slots__ = ("dir_ids", "seen", "full", "done", "results")
+
+    def __init__(self):
+        self.dir_ids: List[DirId] = []
+        self.seen = set()
+        self.full = threading.Event()
+        self.done = threading.Event()
+        # 每个分块一项: (分块内的 dirId, 响应, 异常)
+        self.results: List[Tuple[Set[str], Optional[Dict], Optional[BaseException]]] = []
+
+
+def _merge_chunks(responses: List[Dict]) -> Dict:
+    """合并同一批次各分块的响应：有失败时返回第一个失败响应，data 为字典时合并"""
+    for response in responses:
+        if not response or response.get("code") != 0:
+            return response
+    first = responses[0]
+    if len(responses) > 1 and all(isinstance(r.get("data"), dict) for r in responses):
+        data: Dict = {}
+        for response in responses:
+            data.update(response["data"])
+        return {**first, "data": data}
+    return first
+
+
+class RequestCoalescer:
+    """把短时间内到达的多 dirId 请求合并为一次调用
+
+    同一 key 下第一个到达的调用方成为 leader，等待 window 秒或批次达到 max_batch
+    后发送合并后的请求；其余调用方阻塞等待，再由 split 从合并响应中取出各自的部分。
+    单个调用方传入的 dirId 较多时批次可能超过 max_batch，leader 按 max_batch 分块依次发送，
+    每个调用方只接收包含其 dirId 的分块的结果。
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        if max_batch <= 0:
+            raise ValueError("max_batch 必须大于0")
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _Batch] = {}
+
+    def submit(
+        self,
+        key: Hashable,
+        dir_ids: List[DirId],
+        execute: Callable[[List[DirId]], Dict],
+        split: Callable[[Dict, List[DirId]], Dict]
+    ) -> Dict:
+        """加入 key 对应的批次并返回属于 dir_ids 的响应"""
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self._open[key] = batch
+            for dir_id in dir_ids:
+                marker = str(dir_id)
+                if marker not in batch.seen:
+                    batch.seen.add(marker)
+                    batch.dir_ids.append(dir_id)
+            if len(batch.dir_ids) >= self.max_batch:
+                # 批次已满，后续调用方进入新批次
+                self._open.pop(key, None)
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            try:
+                chunks = [
+                    batch.dir_ids[i:i + self.max_batch] for i in range(0, len(batch.dir_ids), self.max_batch)
+                ] or [[]]
+                for chunk in chunks:
+                    try:
+                        batch.results.append(({str(d) for d in chunk}, execute(chunk), None))
+                    except BaseException as e:
+                        batch.results.append(({str(d) for d in chunk}, None, e))
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        wanted = {str(dir_id) for dir_id in dir_ids}
+        results = [item for item in batch.results if item[0] & wanted] or batch.results[:1]
+        for _, _, error in results:
+            if error is not None:
+                raise error
+        return split(_merge_chunks([response for _, response, _ in results]), dir_ids)
+
+
+def split_by_dir_id(response: Dict, dir_ids: List[DirId]) -> Dict:
+    """从按 dirId 索引的合并响应中取出指定配置文件的数据"""
+    if not response or response.get("code") != 0 or not isinstance(response.get("data"), dict):
+        return response
+    wanted = {str(dir_id) for dir_id in dir_ids}
+    data = {k: v for k, v in response["data"].items() if str(k) in wanted}
+    return {**response, "data": data}
+
+
+def share_response(response: Dict, dir_ids: List[DirId]) -> Dict:
+    """合并响应对所有调用方相同（如缓存清理、删除）"""
+    return response
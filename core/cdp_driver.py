@@ -0,0 +1,163 @@
+import json
+import time
+from typing import Any, Dict, Optional
+from urllib.request import urlopen
+from config.settings import REQUEST_TIMEOUT
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# 页面跳转期间旧文档的执行上下文被销毁时 Runtime.evaluate 返回的错误
+_CONTEXT_GONE = ("Cannot find context", "Execution context was destroyed", "Inspected target navigated or closed")
+
+
+class CDPError(Exception):
+    """CDP 命令返回错误或页面脚本抛出异常"""
+
+
+class CDPDriver:
+    """直接通过 DevTools WebSocket 控制浏览器页面，无需启动 chromedriver
+
+    提供登录类短流程所需的 navigate / wait_for_selector / type / click / evaluate。
+    连接到浏览器级 ws 地址时自动附加到第一个页面。
+    """
+
+    def __init__(self, connection: Any, timeout: float = REQUEST_TIMEOUT):
+        self._ws = connection
+        self.timeout = timeout
+        self._next_id = 0
+        self._session_id: Optional[str] = None
+
+    @classmethod
+    def connect(cls, address: str, timeout: float = REQUEST_TIMEOUT) -> "CDPDriver":
+        """连接到 ws 地址，或通过 http 调试地址的 /json/version 查找 ws 地址"""
+        import websocket
+
+        ws_url = address
+        if not address.startswith(("ws://", "wss://")):
+            base = address if address.startswith("http") else f"http://{address}"
+            with urlopen(f"{base}/json/version", timeout=timeout) as response:
+                ws_url = json.loads(response.read())["webSocketDebuggerUrl"]
+
+        connection = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        driver = cls(connection, timeout)
+        if "/devtools/browser/" in ws_url:
+            driver.attach_to_page()
+        logger.debug(f"CDP 已连接: {ws_url}")
+        return driver
+
+    def send(self, method: str, params: Optional[Dict] = None) -> Dict:
+        """发送 CDP 命令并等待对应的响应，期间到达的事件被忽略"""
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if self._session_id and not method.startswith("Target."):
+            message["sessionId"] = self._session_id
+        self._ws.send(json.dumps(message))
+
+        while True:
+            reply = json.loads(self._ws.recv())
+            if reply.get("id") != self._next_id:
+                continue
+            if "error" in reply:
+                raise CDPError(f"{method} 失败: {reply['error']}")
+            return reply.get("result", {})
+
+    def attach_to_page(self) -> None:
+        """附加到第一个页面 target，之后的命令都发送到该页面"""
+        targets = self.send("Target.getTargets")["targetInfos"]
+        pages = [t for t in targets if t.get("type") == "page"]
+        if pages:
+            target_id = pages[0]["targetId"]
+        else:
+            target_id = self.send("Target.createTarget", {"url": "about:blank"})["targetId"]
+        self._session_id = self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})["sessionId"]
+
+    def evaluate(self, expression: str, await_promise: bool = False) -> Any:
+        """在页面中执行脚本并返回结果值"""
+        result = self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(f"脚本执行出错: {details.get('exception', {}).get('description') or details.get('text')}")
+        return result.get("result", {}).get("value")
+
+    def navigate(self, url: str, timeout: Optional[float] = None) -> None:
+        """打开页面并等待加载完成
+
+        Page.navigate 返回时新文档可能尚未提交，此时旧页面的 readyState 已是 complete。
+        因此先等待主 frame 的 loaderId 变为本次跳转的 loaderId，再等待 readyState；
+        页内锚点跳转没有新的 loaderId，只检查 readyState。
+        """
+        result = self.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CDPError(f"打开页面失败: {url}, {result['errorText']}")
+        loader_id = result.get("loaderId")
+
+        def loaded() -> bool:
+            if loader_id and self.send("Page.getFrameTree")["frameTree"]["frame"].get("loaderId") != loader_id:
+                return False
+            return self.evaluate("document.readyState") == "complete"
+
+        self._poll(loaded, timeout, f"页面加载超时: {url}")
+
+    def wait_for_selector(self, selector: str, timeout: Optional[float] = None) -> None:
+        """等待匹配 CSS 选择器的元素出现"""
+        expression = f"document.querySelector({json.dumps(selector)}) !== null"
+        self._poll(lambda: self.evaluate(expression), timeout, f"等待元素超时: {selector}")
+
+    def type(self, selector: str, text: str, timeout: Optional[float] = None) -> None:
+        """聚焦元素并输入文本"""
+        self.wait_for_selector(selector, timeout)
+        self.evaluate(f"document.querySelector({json.dumps(selector)}).focus()")
+        self.send("Input.insertText", {"text": text})
+
+    def click(self, selector: str, timeout: Optional[float] = None) -> None:
+        """在元素中心位置模拟鼠标点击"""
+        self.wait_for_selector(selector, timeout)
+        rect = self.evaluate(
+            f"(() => {{ const el = document.querySelector({json.dumps(selector)});"
+            " el.scrollIntoView({block: 'center'});"
+            " const r = el.getBoundingClientRect();"
+            " return {x: r.left + r.width / 2, y: r.top + r.height / 2}; })()"
+        )
+        for event_type in ("mousePressed", "mouseReleased"):
+            self.send("Input.dispatchMouseEvent", {
+                "type": event_type,
+                "x": rect["x"],
+                "y": rect["y"],
+                "button": "left",
+                "clickCount": 1
+            })
+
+    @property
+    def current_url(self) -> str:
+        return self.evaluate("location.href")
+
+    def quit(self) -> None:
+        """断开 WebSocket 连接，不关闭浏览器"""
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+    def _poll(self, condition, timeout: Optional[float], message: str, interval: float = 0.1) -> None:
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            try:
+                if condition():
+                    return
+            except CDPError as e:
+                # 跳转中旧文档已销毁、新文档尚未就绪，视为未满足条件继续等待
+                if not any(text in str(e) for text in _CONTEXT_GONE):
+                    raise
+            if time.monotonic() >= deadline:
+                raise TimeoutError(message)
+            time.sleep(interval)
+
+
+def attach_cdp(debugger_address: str) -> CDPDriver:
+    """会话池使用的 CDP driver 工厂"""
+    return CDPDriver.connect(debugger_address)
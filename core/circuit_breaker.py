@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Callable, Optional
+import requests
+from config.settings import BREAKER_MAX_PAUSE
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """熔断器打开期间快速失败，不再发送请求"""
+
+
+class CircuitBreaker:
+    """连续连接失败达到阈值后打开，后台探测健康检查恢复后自动关闭
+
+    打开期间 before_request 立即抛出 CircuitOpenError；批量任务可调用
+    pause 暂停，待服务恢复后继续。
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        failure_threshold: int = 5,
+        probe_interval: float = 2.0
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold 必须大于0")
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+
+        self._failures = 0
+        self._open = False
+        self._opened_at = 0.0
+        # 曾经连通过才值得暂停等待；本次打开期间已有等待超时则不再重复等待
+        self._reachable = False
+        self._gave_up = False
+        self._cond = threading.Condition()
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def before_request(self) -> None:
+        """熔断器打开时抛出 CircuitOpenError"""
+        if self._open:
+            raise CircuitOpenError(f"Roxy API 不可用，熔断已打开 {time.monotonic() - self._opened_at:.1f}s")
+
+    def record_success(self) -> None:
+        if self._failures or not self._reachable:
+            with self._cond:
+                self._failures = 0
+                self._reachable = True
+
+    def record_failure(self) -> None:
+        """记录一次连接失败，达到阈值时打开熔断并启动探测"""
+        with self._cond:
+            self._failures += 1
+            if self._open or self._failures < self.failure_threshold:
+                return
+            self._open = True
+            self._opened_at = time.monotonic()
+            logger.warning(f"连续 {self._failures} 次连接失败，熔断打开")
+            self._prober = threading.Thread(target=self._probe_loop, name="roxy-breaker-probe", daemon=True)
+            self._prober.start()
+
+    def wait_until_closed(self, timeout: Optional[float] = None) -> bool:
+        """阻塞直到熔断关闭，超时返回 False"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._open, timeout)
+
+    def pause(self, timeout: Optional[float] = None) -> bool:
+        """批量任务暂停等待恢复
+
+        服务从未连通过（地址配置错误、应用未启动）或本次打开期间已有等待超时的，
+        立即返回 False，避免每个任务项都重复等待一遍。
+        """
+        with self._cond:
+            if self._open and (not self._reachable or self._gave_up):
+                return False
+            closed = self._cond.wait_for(lambda: not self._open, timeout)
+            if not closed:
+                self._gave_up = True
+            return closed
+
+    def reset(self) -> None:
+        """手动关闭熔断"""
+        with self._cond:
+            self._close()
+
+    def _close(self) -> None:
+        if self._open:
+            logger.info(f"Roxy API 已恢复，熔断关闭（持续 {time.monotonic() - self._opened_at:.1f}s）")
+        self._open = False
+        self._failures = 0
+        self._gave_up = False
+        self._cond.notify_all()
+
+    def _probe_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._open:
+                    return
+                self._cond.wait(self.probe_interval)
+                if not self._open:
+                    return
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                logger.debug(f"熔断探测失败: {str(e)}")
+                healthy = False
+            if healthy:
+                with self._cond:
+                    self._close()
+                return
+
+
+def call_with_pause(client, func: Callable, *args, max_wait: Optional[float] = None, **kwargs):
+    """调用 func，遇到熔断时暂停等待服务恢复后重试
+
+    熔断打开时（或请求失败时熔断恰好已打开）等待 client.wait_until_available，
+    恢复后重新调用；max_wait（默认 BREAKER_MAX_PAUSE）内未恢复则抛出原异常。
+    """
+    if max_wait is None:
+        max_wait = BREAKER_MAX_PAUSE
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except requests.exceptions.ConnectionError:
+            if not getattr(client, "circuit_open", False):
+                raise
+            if not client.wait_until_available(max_wait):
+                raise
@@ -0,0 +1,210 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import JOURNAL_PATH, JOURNAL_BATCH_SIZE, JOURNAL_FLUSH_INTERVAL
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    PRIMARY KEY (job_id, item_key)
+) WITHOUT ROWID;
+"""
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobJournal:
+    """批量任务的持久化日志
+
+    每个任务项记录为 pending / done / failed。执行中的项不单独落盘：崩溃时仍为 pending，
+    恢复时与 failed 一起重试。结果先写入内存缓冲，累计 batch_size 条或距上次落盘超过
+    flush_interval 秒时在一个事务中批量写入。服务端已产生副作用、恢复时需要据此认领的结果
+    （如新建窗口的 dirId）用 checkpoint 立即落盘。
+    """
+
+    def __init__(
+        self,
+        path: str = JOURNAL_PATH,
+        batch_size: int = JOURNAL_BATCH_SIZE,
+        flush_interval: float = JOURNAL_FLUSH_INTERVAL
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size 必须大于0")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple] = []
+        self._last_flush = time.monotonic()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "JobJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ 任务
+
+    def open_job(self, task: str, params: Dict, keys: Iterable[str], job_id: Optional[str] = None) -> str:
+        """新建任务（job_id 为空时）或打开已有任务，返回 job_id
+
+        打开已有任务时校验任务名一致，并补登记此前没有的任务项。
+        """
+        keys = [str(key) for key in keys]
+        with self._lock:
+            if job_id is None:
+                job_id = uuid.uuid4().hex[:12]
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, task, params, created_at) VALUES (?, ?, ?, ?)",
+                    (job_id, task, json.dumps(params, ensure_ascii=False), time.time())
+                )
+            else:
+                row = self._conn.execute("SELECT task FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if row is None:
+                    raise KeyError(f"任务不存在: {job_id}")
+                if row[0] != task:
+                    raise ValueError(f"任务 {job_id} 属于 {row[0]}，不能以 {task} 恢复")
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO job_items (job_id, item_key, seq) VALUES (?, ?, ?)",
+                [(job_id, key, seq) for seq, key in enumerate(keys)]
+            )
+            self._conn.execute("COMMIT")
+        return job_id
+
+    def get_job(self, job_id: str) -> Dict:
+        """返回 {"job_id", "task", "params", "created_at"}，不存在时抛出 KeyError"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT task, params, created_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"任务不存在: {job_id}")
+        return {"job_id": job_id, "task": row[0], "params": json.loads(row[1]), "created_at": row[2]}
+
+    def pending(self, job_id: str) -> List[str]:
+        """尚未完成（pending 或 failed）的任务项，按登记顺序"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key FROM job_items WHERE job_id = ? AND state != ? ORDER BY seq", (job_id, DONE)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def results(self, job_id: str) -> Dict[str, object]:
+        """已完成任务项的结果，按登记顺序"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, result FROM job_items WHERE job_id = ? AND state = ? ORDER BY seq", (job_id, DONE)
+            ).fetchall()
+        return {key: json.loads(result) if result is not None else None for key, result in rows}
+
+    def checkpoints(self, job_id: str) -> Dict[str, object]:
+        """未完成但已通过 checkpoint 保存了结果的任务项"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, result FROM job_items WHERE job_id = ? AND state != ? AND result IS NOT NULL "
+                "ORDER BY seq", (job_id, DONE)
+            ).fetchall()
+        return {key: json.loads(result) for key, result in rows}
+
+    def summary(self, job_id: str) -> Dict[str, int]:
+        """各状态的任务项数量"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall()
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    # ------------------------------------------------------------------ 记录
+
+    def record(self, job_id: str, key: str, ok: bool, result: object = None, error: Optional[str] = None) -> None:
+        """记录任务项结果，写入缓冲区，按批量大小或时间间隔落盘"""
+        item = (
+            DONE if ok else FAILED,
+            json.dumps(result, ensure_ascii=False) if result is not None else None,
+            error,
+            time.time(),
+            job_id,
+            str(key)
+        )
+        with self._lock:
+            self._buffer.append(item)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def checkpoint(self, job_id: str, key: str, result: object) -> None:
+        """立即保存任务项的中间结果，不改变状态，崩溃后可由 checkpoints 读出"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET result = ?, updated_at = ? WHERE job_id = ? AND item_key = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(), job_id, str(key))
+            )
+
+    def flush(self) -> None:
+        """把缓冲区中的结果写入数据库"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "UPDATE job_items SET state = ?, result = ?, error = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ? AND item_key = ?",
+                buffer
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            self._buffer = buffer + self._buffer
+            raise
+        logger.debug(f"任务日志落盘 {len(buffer)} 条")
@@ -0,0 +1,113 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应并发限制器
+
+    延迟接近基线且并发额度被实际使用时，每个成功请求把上限加 increase / limit
+    （约每轮往返加 increase）；遇到 5xx、429 或超时时把上限乘以 decrease，同一
+    往返时间内的多次失败只收缩一次。Retry-After 期间暂停发放新的额度。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        increase: float = 1.0,
+        decrease: float = 0.7,
+        latency_tolerance: float = 2.0
+    ):
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("需要满足 0 < min_limit <= initial_limit <= max_limit")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease 必须在 (0, 1) 之间")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """获取一个并发额度，额度用尽或处于 Retry-After 暂停期时阻塞"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= self._blocked_until and self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                wait = self._blocked_until - now if now < self._blocked_until else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise TimeoutError("等待并发额度超时")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def release(self, latency: float, overloaded: bool = False, retry_after: Optional[float] = None) -> None:
+        """归还额度并根据本次请求结果调整上限"""
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+            if overloaded:
+                window = self._baseline if self._baseline is not None else latency
+                if now - self._last_decrease >= window:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                # 基线取近期最低延迟，缓慢向上漂移以适应服务端变化
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency
+                else:
+                    self._baseline = self._baseline * 0.99 + latency * 0.01
+                healthy = latency <= self._baseline * self.latency_tolerance
+                # 只有额度被用到一半以上时才扩张，避免空闲时上限虚高
+                saturated = self._in_flight + 1 >= self._limit / 2
+                if healthy and saturated:
+                    self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "baseline_latency": self._baseline,
+                "paused_for": max(0.0, self._blocked_until - time.monotonic())
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,158 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# 延迟直方图桶上界（秒），1ms 到约 65s 按 2 倍递增
+LATENCY_BUCKETS = tuple(0.001 * 2 ** i for i in range(17))
+
+
+class _EndpointStats:
+    __slots__ = ("calls", "http_errors", "api_errors", "exceptions", "retries", "buckets", "latency_sum")
+
+    def __init__(self):
+        self.calls = 0
+        self.http_errors: Dict[int, int] = {}
+        self.api_errors: Dict[str, int] = {}
+        self.exceptions: Dict[str, int] = {}
+        self.retries = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+
+class ClientMetrics:
+    """按端点统计调用次数、错误、重试和延迟分布
+
+    record 只做计数和一次二分查找，可常开；分位数在 snapshot 时由直方图估算。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _EndpointStats] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        latency: float,
+        status: Optional[int] = None,
+        api_code=None,
+        exception: Optional[str] = None,
+        retries: int = 0
+    ) -> None:
+        """记录一次调用结果"""
+        index = bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = _EndpointStats()
+            stats.calls += 1
+            stats.retries += retries
+            stats.buckets[index] += 1
+            stats.latency_sum += latency
+            if status is not None and status >= 400:
+                stats.http_errors[status] = stats.http_errors.get(status, 0) + 1
+            if api_code is not None and api_code != 0:
+                key = str(api_code)
+                stats.api_errors[key] = stats.api_errors.get(key, 0) + 1
+            if exception is not None:
+                stats.exceptions[exception] = stats.exceptions.get(exception, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """返回各端点统计数据的快照"""
+        with self._lock:
+            items = [(name, _copy(stats)) for name, stats in self._stats.items()]
+
+        result = {}
+        for name, stats in items:
+            errors = sum(stats.http_errors.values()) + sum(stats.api_errors.values()) + sum(stats.exceptions.values())
+            result[name] = {
+                "calls": stats.calls,
+                "errors": errors,
+                "http_errors": dict(stats.http_errors),
+                "api_errors": dict(stats.api_errors),
+                "exceptions": dict(stats.exceptions),
+                "retries": stats.retries,
+                "latency": {
+                    "mean": stats.latency_sum / stats.calls if stats.calls else 0.0,
+                    "p50": _percentile(stats.buckets, 0.50),
+                    "p95": _percentile(stats.buckets, 0.95),
+                    "p99": _percentile(stats.buckets, 0.99)
+                }
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = "roxy_client") -> str:
+        """导出 Prometheus 文本格式"""
+        with self._lock:
+            items = sorted((name, _copy(stats)) for name, stats in self._stats.items())
+
+        lines = [
+            f"# HELP {prefix}_requests_total Roxy API 调用次数",
+            f"# TYPE {prefix}_requests_total counter"
+        ]
+        lines += [f'{prefix}_requests_total{{endpoint="{name}"}} {s.calls}' for name, s in items]
+
+        lines += [
+            f"# HELP {prefix}_errors_total Roxy API 错误次数",
+            f"# TYPE {prefix}_errors_total counter"
+        ]
+        for name, s in items:
+            for status, count in sorted(s.http_errors.items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{name}",kind="http",reason="{status}"}} {count}')
+            for code, count in sorted(s.api_errors.items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{name}",kind="api",reason="{code}"}} {count}')
+            for exc, count in sorted(s.exceptions.items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{name}",kind="exception",reason="{exc}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_retries_total Roxy API 重试次数",
+            f"# TYPE {prefix}_retries_total counter"
+        ]
+        lines += [f'{prefix}_retries_total{{endpoint="{name}"}} {s.retries}' for name, s in items]
+
+        metric = f"{prefix}_request_duration_seconds"
+        lines += [
+            f"# HELP {metric} Roxy API 请求延迟",
+            f"# TYPE {metric} histogram"
+        ]
+        for name, s in items:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{endpoint="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{endpoint="{name}",le="+Inf"}} {s.calls}')
+            lines.append(f'{metric}_sum{{endpoint="{name}"}} {s.latency_sum:.6f}')
+            lines.append(f'{metric}_count{{endpoint="{name}"}} {s.calls}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _copy(stats: _EndpointStats) -> _EndpointStats:
+    copy = _EndpointStats()
+    copy.calls = stats.calls
+    copy.http_errors = dict(stats.http_errors)
+    copy.api_errors = dict(stats.api_errors)
+    copy.exceptions = dict(stats.exceptions)
+    copy.retries = stats.retries
+    copy.buckets = list(stats.buckets)
+    copy.latency_sum = stats.latency_sum
+    return copy
+
+
+def _percentile(buckets: List[int], q: float) -> float:
+    """根据直方图在桶内线性插值估算分位数"""
+    total = sum(buckets)
+    if total == 0:
+        return 0.0
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(buckets):
+        if count and cumulative + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1] * 2
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return LATENCY_BUCKETS[-1]
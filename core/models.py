@@ -0,0 +1,159 @@
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes) -> Any:
+    """解析响应正文，安装了 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class Record:
+    """使用 __slots__ 的紧凑响应记录
+
+    子类通过 _FIELDS 声明 (属性名, API 字段名)。from_api 只复制调用方需要的字段，
+    未请求的字段为 None，内存占用远小于完整的 dict。
+    """
+
+    __slots__ = ()
+    _FIELDS: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, **kwargs):
+        unknown = set(kwargs) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} 没有字段: {', '.join(sorted(unknown))}")
+        for attr in self.__slots__:
+            setattr(self, attr, kwargs.get(attr))
+
+    @classmethod
+    def decoder(cls, fields: Optional[Iterable[str]] = None) -> Callable[[Dict], "Record"]:
+        """返回把 API 字典转换为记录的函数，fields 为需要保留的属性名，None 表示全部"""
+        mapping = cls._FIELDS
+        if fields is not None:
+            fields = set(fields)
+            unknown = fields - {attr for attr, _ in mapping}
+            if unknown:
+                raise ValueError(f"{cls.__name__} 没有字段: {', '.join(sorted(unknown))}")
+            mapping = tuple(item for item in mapping if item[0] in fields)
+        skipped = tuple(attr for attr in cls.__slots__ if attr not in {a for a, _ in mapping})
+        new = object.__new__
+
+        def decode(data: Dict) -> "Record":
+            record = new(cls)
+            get = data.get
+            for attr, key in mapping:
+                setattr(record, attr, get(key))
+            for attr in skipped:
+                setattr(record, attr, None)
+            return record
+
+        return decode
+
+    @classmethod
+    def from_api(cls, data: Dict, fields: Optional[Iterable[str]] = None) -> "Record":
+        return cls.decoder(fields)(data)
+
+    @classmethod
+    def decode_list(cls, items: Iterable[Dict], fields: Optional[Iterable[str]] = None) -> List["Record"]:
+        decode = cls.decoder(fields)
+        return [decode(item) for item in items]
+
+    def to_dict(self) -> Dict:
+        """转换回 API 字段名的字典，省略为 None 的字段"""
+        result = {}
+        for attr, key in self._FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{attr}={getattr(self, attr)!r}" for attr in self.__slots__ if getattr(self, attr) is not None
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class Profile(Record):
+    """浏览器配置文件（窗口）"""
+
+    __slots__ = (
+        "dir_id",
+        "workspace_id",
+        "window_name",
+        "sort_num",
+        "os",
+        "label_ids",
+        "proxy_info",
+        "finger_info",
+        "create_time",
+        "update_time"
+    )
+    _FIELDS = (
+        ("dir_id", "dirId"),
+        ("workspace_id", "workspaceId"),
+        ("window_name", "windowName"),
+        ("sort_num", "windowSortNum"),
+        ("os", "os"),
+        ("label_ids", "labelIds"),
+        ("proxy_info", "proxyInfo"),
+        ("finger_info", "fingerInfo"),
+        ("create_time", "createTime"),
+        ("update_time", "updateTime")
+    )
+
+
+class Workspace(Record):
+    """工作区"""
+
+    __slots__ = ("id", "name")
+    _FIELDS = (("id", "id"), ("name", "name"))
+
+
+class ConnectionInfo(Record):
+    """已打开窗口的连接信息"""
+
+    __slots__ = ("dir_id", "http", "ws", "driver")
+    _FIELDS = (("dir_id", "dirId"), ("http", "http"), ("ws", "ws"), ("driver", "driver"))
+
+
+class Account(Record):
+    """平台账号"""
+
+    __slots__ = ("id", "platform_name", "platform_url", "username", "password", "remarks", "create_time")
+    _FIELDS = (
+        ("id", "id"),
+        ("platform_name", "platformName"),
+        ("platform_url", "platformUrl"),
+        ("username", "platformUserName"),
+        ("password", "platformPassword"),
+        ("remarks", "platformRemarks"),
+        ("create_time", "createTime")
+    )
+
+
+class Label(Record):
+    """标签"""
+
+    __slots__ = ("id", "name", "color")
+    _FIELDS = (("id", "id"), ("name", "name"), ("color", "color"))
+
+
+def list_rows(data: Any) -> List[Dict]:
+    """取出列表类响应 data 中的记录，兼容数组和 {"list"/"rows": [...]}"""
+    if isinstance(data, dict):
+        return data.get("list") or data.get("rows") or []
+    return data or []
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+ON_FAILURE = ("stop", "continue")
+
+
+class Stage:
+    """流水线中的一个阶段
+
+    func 接收并返回 item（dict），返回 False/None 或抛出异常视为失败，失败时最多重试
+    retries 次。on_failure 为 "stop" 时失败的 item 不再进入后续阶段，为 "continue" 时记录
+    错误后继续后续阶段。concurrency 为该阶段的工作线程数。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict], Optional[Dict]],
+        concurrency: int = 1,
+        retries: int = 0,
+        on_failure: str = "stop"
+    ):
+        if concurrency <= 0:
+            raise ValueError(f"阶段 {name} 的并发数必须大于0")
+        if on_failure not in ON_FAILURE:
+            raise ValueError(f"不支持的失败处理方式: {on_failure}")
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.retries = retries
+        self.on_failure = on_failure
+
+
+class Pipeline:
+    """多阶段流水线：各阶段之间用有界队列连接，不同 item 的不同阶段重叠执行
+
+    item 在某阶段完成后立即进入下一阶段，吞吐量由最慢的阶段决定而不是各阶段耗时之和。
+    队列满时上游阶段阻塞，内存中最多保留 queue_size × 阶段数 个 item。
+    结果中附加 "ok"、"failed_stage"、"errors"（阶段名 -> 错误）和 "timings"（阶段名 -> 秒）。
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 100):
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def run(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """按完成顺序产出结果；调用方提前停止迭代时通知所有阶段退出"""
+        stop = threading.Event()
+        done = object()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: "queue.Queue" = queue.Queue()
+        remaining = [stage.concurrency for stage in self.stages]
+        lock = threading.Lock()
+
+        def put(q: "queue.Queue", item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def finish_item(item: Dict) -> None:
+            item.setdefault("failed_stage", None)
+            item["ok"] = item["failed_stage"] is None and not item["errors"]
+            results.put(item)
+
+        def execute(stage: Stage, item: Dict) -> bool:
+            error = None
+            start = time.monotonic()
+            for attempt in range(stage.retries + 1):
+                try:
+                    output = stage.func(item)
+                except Exception as e:
+                    output, error = None, str(e) or type(e).__name__
+                else:
+                    error = None if output else "阶段返回失败"
+                if error is None:
+                    if isinstance(output, dict) and output is not item:
+                        item.update(output)
+                    break
+                if attempt < stage.retries:
+                    logger.warning(f"阶段 {stage.name} 第 {attempt + 1} 次失败，重试: {error}")
+            item["timings"][stage.name] = round(time.monotonic() - start, 3)
+            if error is not None:
+                item["errors"][stage.name] = error
+            return error is None
+
+        def work(index: int) -> None:
+            stage = self.stages[index]
+            last = index == len(self.stages) - 1
+            try:
+                while not stop.is_set():
+                    try:
+                        item = queues[index].get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is done:
+                        return
+                    if not execute(stage, item) and stage.on_failure == "stop":
+                        item["failed_stage"] = stage.name
+                        finish_item(item)
+                    elif last:
+                        finish_item(item)
+                    else:
+                        put(queues[index + 1], item)
+            finally:
+                # 本阶段最后一个退出的线程通知下一阶段结束
+                with lock:
+                    remaining[index] -= 1
+                    exhausted = remaining[index] == 0
+                if exhausted:
+                    if last:
+                        results.put(done)
+                    else:
+                        for _ in range(self.stages[index + 1].concurrency):
+                            put(queues[index + 1], done)
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    item = dict(item, errors={}, timings={})
+                    if not put(queues[0], item):
+                        return
+            except Exception as e:
+                logger.error(f"读取流水线输入时出错: {str(e)}")
+            finally:
+                for _ in range(self.stages[0].concurrency):
+                    put(queues[0], done)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}-{i}", daemon=True)
+                for i in range(stage.concurrency)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    return
+                yield item
+        finally:
+            stop.set()
@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Union
+from config.settings import PROFILE_INDEX_PATH
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    dir_id TEXT PRIMARY KEY,
+    workspace_id INTEGER NOT NULL,
+    window_name TEXT NOT NULL DEFAULT '',
+    sort_num INTEGER,
+    os TEXT,
+    proxy_method TEXT,
+    proxy_host TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_name ON profiles (workspace_id, window_name);
+CREATE INDEX IF NOT EXISTS idx_profiles_os ON profiles (workspace_id, os);
+CREATE INDEX IF NOT EXISTS idx_profiles_proxy ON profiles (workspace_id, proxy_host);
+CREATE TABLE IF NOT EXISTS profile_labels (
+    dir_id TEXT NOT NULL,
+    label_id TEXT NOT NULL,
+    PRIMARY KEY (label_id, dir_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_profile_labels_dir ON profile_labels (dir_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    workspace_id INTEGER PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_owners (
+    dir_id TEXT PRIMARY KEY,
+    node TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# 前缀查询的上界，使 window_name 范围条件可以走索引
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def _dump(profile: Dict) -> str:
+    return json.dumps(profile, ensure_ascii=False, sort_keys=True)
+
+
+def _row(profile: Dict, workspace_id: int, data: str, now: float) -> tuple:
+    proxy = profile.get("proxyInfo") or {}
+    return (
+        str(profile["dirId"]),
+        int(profile.get("workspaceId") or workspace_id),
+        profile.get("windowName") or "",
+        profile.get("windowSortNum"),
+        profile.get("os"),
+        proxy.get("proxyMethod"),
+        proxy.get("proxyHost"),
+        data,
+        now
+    )
+
+
+class ProfileIndex:
+    """工作区配置文件的本地 SQLite 索引
+
+    sync 按 list_profiles 分页结果镜像工作区，只写入内容有变化的行并删除服务端已不存在的行；
+    客户端在创建/修改/删除成功后调用 upsert/update/remove 同步写入，查询直接走本地索引。
+    """
+
+    def __init__(self, path: str = PROFILE_INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 任务线程池中的写穿透共享同一个连接，由锁串行化
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ 同步
+
+    def sync(self, client, workspace_id: int, max_age: Optional[float] = None, **iter_kwargs) -> Dict:
+        """从 API 增量同步一个工作区
+
+        max_age 内已同步过的工作区直接跳过。API 不支持按更新时间过滤，仍需遍历全部分页，
+        但只有内容变化的配置文件会被写入。返回 {"added", "updated", "removed", "total", "skipped"}。
+        """
+        if max_age is not None:
+            synced_at = self.last_synced(workspace_id)
+            if synced_at is not None and time.time() - synced_at < max_age:
+                return {"added": 0, "updated": 0, "removed": 0, "total": self.count(workspace_id), "skipped": True}
+
+        with self._lock:
+            existing = {
+                row["dir_id"]: row["data"]
+                for row in self._conn.execute("SELECT dir_id, data FROM profiles WHERE workspace_id = ?", (workspace_id,))
+            }
+
+        now = time.time()
+        changed = []
+        seen = set()
+        added = 0
+        for profile in client.iter_profiles(workspace_id, **iter_kwargs):
+            dir_id = str(profile["dirId"])
+            seen.add(dir_id)
+            data = _dump(profile)
+            old = existing.get(dir_id)
+            if old == data:
+                continue
+            if old is None:
+                added += 1
+            changed.append(profile)
+        removed = [dir_id for dir_id in existing if dir_id not in seen]
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._write(changed, workspace_id, now)
+                self._delete(removed)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (workspace_id, synced_at, total) VALUES (?, ?, ?)",
+                    (workspace_id, now, len(seen))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        result = {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+            "total": len(seen),
+            "skipped": False
+        }
+        logger.info(f"工作区 {workspace_id} 索引同步完成: {result}")
+        return result
+
+    def last_synced(self, workspace_id: int) -> Optional[float]:
+        """工作区上次同步的时间戳，未同步过返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM sync_state WHERE workspace_id = ?", (workspace_id,)
+            ).fetchone()
+        return row["synced_at"] if row else None
+
+    # ------------------------------------------------------------------ 写穿透
+
+    def upsert(self, profiles: Iterable[Dict], workspace_id: Optional[int] = None) -> None:
+        """写入或覆盖配置文件"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._write(list(profiles), workspace_id, time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update(self, dir_id: Union[str, int], fields: Dict) -> bool:
+        """把修改的字段合并到已索引的配置文件，未索引时返回 False"""
+        with self._lock:
+            row = self._conn.execute("SELECT workspace_id, data FROM profiles WHERE dir_id = ?", (str(dir_id),)).fetchone()
+            if row is None:
+                return False
+            profile = json.loads(row["data"])
+            profile.update(fields)
+            profile["dirId"] = str(dir_id)
+            self._conn.execute("BEGIN")
+            try:
+                self._write([profile], row["workspace_id"], time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def remove(self, dir_ids: Iterable[Union[str, int]]) -> None:
+        """删除配置文件"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete([str(dir_id) for dir_id in dir_ids])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write(self, profiles: List[Dict], workspace_id: Optional[int], now: float) -> None:
+        if not profiles:
+            return
+        rows = [_row(profile, workspace_id, _dump(profile), now) for profile in profiles]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO profiles "
+            "(dir_id, workspace_id, window_name, sort_num, os, proxy_method, proxy_host, data, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        dir_ids = [(row[0],) for row in rows]
+        self._conn.executemany("DELETE FROM profile_labels WHERE dir_id = ?", dir_ids)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO profile_labels (dir_id, label_id) VALUES (?, ?)",
+            [
+                (str(profile["dirId"]), str(label_id))
+                for profile in profiles
+                for label_id in profile.get("labelIds") or []
+            ]
+        )
+
+    def _delete(self, dir_ids: List[str]) -> None:
+        if not dir_ids:
+            return
+        params = [(dir_id,) for dir_id in dir_ids]
+        self._conn.executemany("DELETE FROM profiles WHERE dir_id = ?", params)
+        self._conn.executemany("DELETE FROM profile_labels WHERE dir_id = ?", params)
+
+    # ------------------------------------------------------------------ 多节点归属
+
+    def owners(self) -> Dict[str, str]:
+        """ShardedRoxyClient 记录的配置文件归属，dirId -> 节点地址"""
+        with self._lock:
+            return {row["dir_id"]: row["node"] for row in self._conn.execute("SELECT dir_id, node FROM profile_owners")}
+
+    def set_owners(self, owners: Dict[str, str]) -> None:
+        """写入或覆盖配置文件归属"""
+        if not owners:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO profile_owners (dir_id, node) VALUES (?, ?)",
+                    [(str(dir_id), node) for dir_id, node in owners.items()]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def remove_owners(self, dir_ids: Iterable[Union[str, int]]) -> None:
+        """删除配置文件归属"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM profile_owners WHERE dir_id = ?", [(str(d),) for d in dir_ids])
+
+    # ------------------------------------------------------------------ 查询
+
+    def query(
+        self,
+        workspace_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        label_id: Optional[Union[str, int]] = None,
+        os_name: Optional[str] = None,
+        proxy_host: Optional[str] = None,
+        proxy_method: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """按条件查询配置文件，返回 list_profiles 中的原始字典，按工作区和窗口序号排序"""
+        rows = self._select("p.data", workspace_id, name_prefix, label_id, os_name, proxy_host, proxy_method, limit)
+        return [json.loads(row[0]) for row in rows]
+
+    def dir_ids(self, workspace_id: Optional[int] = None, **filters) -> List[str]:
+        """按条件查询 dirId 列表，参数同 query"""
+        rows = self._select("p.dir_id", workspace_id, **filters)
+        return [row[0] for row in rows]
+
+    def get(self, dir_id: Union[str, int]) -> Optional[Dict]:
+        """按 dirId 获取配置文件"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM profiles WHERE dir_id = ?", (str(dir_id),)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def count(self, workspace_id: Optional[int] = None) -> int:
+        with self._lock:
+            if workspace_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM profiles WHERE workspace_id = ?", (workspace_id,)
+                ).fetchone()
+        return row[0]
+
+    def _select(
+        self,
+        columns: str,
+        workspace_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        label_id: Optional[Union[str, int]] = None,
+        os_name: Optional[str] = None,
+        proxy_host: Optional[str] = None,
+        proxy_method: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        sql = f"SELECT {columns} FROM profiles p"
+        where = []
+        params: list = []
+        if label_id is not None:
+            sql += " JOIN profile_labels l ON l.dir_id = p.dir_id AND l.label_id = ?"
+            params.append(str(label_id))
+        if workspace_id is not None:
+            where.append("p.workspace_id = ?")
+            params.append(workspace_id)
+        if name_prefix:
+            where.append("p.window_name >= ? AND p.window_name < ?")
+            params += [name_prefix, name_prefix + _MAX_CHAR]
+        if os_name is not None:
+            where.append("p.os = ?")
+            params.append(os_name)
+        if proxy_host is not None:
+            where.append("p.proxy_host = ?")
+            params.append(proxy_host)
+        if proxy_method is not None:
+            where.append("p.proxy_method = ?")
+            params.append(proxy_method)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY p.workspace_id, p.sort_num, p.dir_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -0,0 +1,69 @@
+import threading
+from typing import Dict, Optional, Tuple, Union
+from config.settings import API_NODES
+from .roxy_client import RoxyAPIClient
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_clients: Dict[Tuple[str, str], RoxyAPIClient] = {}
+_sharded = None
+_lock = threading.Lock()
+
+
+def get_client(base_url: Optional[str] = None, token: Optional[str] = None) -> Union[RoxyAPIClient, "ShardedRoxyClient"]:
+    """获取进程内共享的客户端实例
+
+    同一 (base_url, token) 始终返回同一个 RoxyAPIClient，使批量任务复用已建立的连接。
+    未指定地址且 ROXY_API_NODES 配置了多个节点时，返回共享的 ShardedRoxyClient。
+    """
+    if base_url is None and token is None and len(API_NODES) > 1:
+        return _get_sharded()
+    base_url = base_url or API_NODES[0]["base_url"]
+    token = API_NODES[0]["token"] if token is None else token
+    key = (base_url, token)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = RoxyAPIClient(base_url, token)
+            _clients[key] = client
+            logger.debug(f"注册共享客户端: base_url={base_url}")
+        return client
+
+
+def _get_sharded():
+    global _sharded
+    with _lock:
+        if _sharded is None:
+            from .sharding import ShardedRoxyClient
+            _sharded = ShardedRoxyClient(
+                clients=[_get_or_create(node["base_url"], node["token"]) for node in API_NODES]
+            )
+            logger.debug(f"注册多节点客户端: {[node['base_url'] for node in API_NODES]}")
+        return _sharded
+
+
+def _get_or_create(base_url: str, token: str) -> RoxyAPIClient:
+    """调用方需持有 _lock"""
+    client = _clients.get((base_url, token))
+    if client is None:
+        client = RoxyAPIClient(base_url, token)
+        _clients[(base_url, token)] = client
+    return client
+
+
+def close_all_clients() -> None:
+    """关闭并移除所有共享客户端"""
+    global _sharded
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        sharded, _sharded = _sharded, None
+    if sharded is not None:
+        sharded.close()
+    for client in clients:
+        client.close()
@@ -1,6 +1,11 @@
 import requests
-from typing import Dict, List, Union, Optional
+import socket
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Union, Optional, Iterator
 from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 from urllib3.util.retry import Retry
 from config.settings import (
     BASE_URL,
@@ -8,63 +13,265 @@ from config.settings import (
     API_ENDPOINTS,
     DEFAULT_HEADERS,
     REQUEST_TIMEOUT,
-    MAX_RETRIES
+    MAX_RETRIES,
+    LIST_PAGE_SIZE,
+    LIST_PREFETCH,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    POOL_BLOCK,
+    TCP_KEEPALIVE,
+    COALESCE_WINDOW,
+    COALESCE_MAX_BATCH,
+    CONNECTION_CACHE_TTL,
+    CONNECTION_CACHE_SIZE,
+    METRICS_ENABLED,
+    ADAPTIVE_CONCURRENCY,
+    ADAPTIVE_INITIAL_LIMIT,
+    ADAPTIVE_MIN_LIMIT,
+    ADAPTIVE_MAX_LIMIT,
+    BREAKER_ENABLED,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_PROBE_INTERVAL,
+    BREAKER_PROBE_TIMEOUT,
+    PROFILE_INDEX_ENABLED
 )
 from utils import get_logger
+from .batcher import RequestCoalescer, split_by_dir_id, share_response
+from .cache import TTLCache
+from .metrics import ClientMetrics
+from .limiter import AdaptiveLimiter, parse_retry_after
+from .circuit_breaker import CircuitBreaker
+from .profile_index import ProfileIndex
+from .models import Profile, Workspace, ConnectionInfo, Account, Label, loads, list_rows
 
 logger = get_logger(__name__)
 
+# 端点路径 -> API_ENDPOINTS 键，用于按端点统计指标
+_ENDPOINT_NAMES = {path: name for name, path in API_ENDPOINTS.items()}
+
+
+class RoxyAPIError(Exception):
+    """API 返回 code != 0 时抛出"""
+
+    def __init__(self, message: str, response: Optional[Dict] = None):
+        super().__init__(message)
+        self.response = response
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """为连接池中的 socket 开启 TCP keep-alive"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
 class RoxyAPIClient:
-    def __init__(self, base_url: str = BASE_URL, token: str = API_TOKEN):
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        token: str = API_TOKEN,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        pool_block: bool = POOL_BLOCK,
+        tcp_keepalive: bool = TCP_KEEPALIVE,
+        coalesce_window: float = COALESCE_WINDOW,
+        coalesce_max_batch: int = COALESCE_MAX_BATCH,
+        connection_cache_ttl: float = CONNECTION_CACHE_TTL,
+        connection_cache_size: int = CONNECTION_CACHE_SIZE,
+        enable_metrics: bool = METRICS_ENABLED,
+        adaptive_concurrency: bool = ADAPTIVE_CONCURRENCY,
+        limiter: Optional[AdaptiveLimiter] = None,
+        circuit_breaker: bool = BREAKER_ENABLED,
+        profile_index: Optional[ProfileIndex] = None
+    ):
         self.base_url = base_url
         self.headers = DEFAULT_HEADERS.copy()
         self.headers["Authorization"] = token
         
         # 配置重试策略
+        # Retry-After 由 _request 统一处理，使限流暂停对所有调用方生效
         retry_strategy = Retry(
             total=MAX_RETRIES,
             backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504]
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False
+        )
+        adapter_cls = _KeepAliveAdapter if tcp_keepalive else HTTPAdapter
+        adapter = adapter_cls(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=retry_strategy
         )
         self.session = requests.Session()
-        self.session.mount("http://", HTTPAdapter(max_retries=retry_strategy))
-        self.session.mount("https://", HTTPAdapter(max_retries=retry_strategy))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # 合并并发的多 dirId 请求
+        self._coalescer = RequestCoalescer(coalesce_window, coalesce_max_batch) if coalesce_window > 0 else None
+
+        # 已打开窗口的连接信息缓存，打开/关闭/删除时失效
+        self._connection_cache = (
+            TTLCache(connection_cache_ttl, connection_cache_size) if connection_cache_ttl > 0 else None
+        )
+
+        self._metrics = ClientMetrics() if enable_metrics else None
+
+        # 所有调用方共享的自适应并发限制
+        if limiter is None and adaptive_concurrency:
+            limiter = AdaptiveLimiter(
+                initial_limit=min(ADAPTIVE_INITIAL_LIMIT, ADAPTIVE_MAX_LIMIT),
+                min_limit=ADAPTIVE_MIN_LIMIT,
+                max_limit=ADAPTIVE_MAX_LIMIT
+            )
+        self._limiter = limiter
+
+        # 连续连接失败时熔断，后台探测健康检查恢复
+        self._breaker = (
+            CircuitBreaker(self._probe_health, BREAKER_FAILURE_THRESHOLD, BREAKER_PROBE_INTERVAL)
+            if circuit_breaker else None
+        )
+
+        # 创建/修改/删除成功后写穿透到本地索引
+        if profile_index is None and PROFILE_INDEX_ENABLED:
+            profile_index = ProfileIndex()
+        self.profile_index = profile_index
         
-        logger.debug(f"初始化 RoxyAPIClient: base_url={base_url}")
+        logger.debug(f"初始化 RoxyAPIClient: base_url={base_url}, pool_maxsize={pool_maxsize}")
+
+    def close(self) -> None:
+        """关闭底层连接池"""
+        self.session.close()
 
-    def _get(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+    def sync_profile_index(self, workspace_id: int, max_age: Optional[float] = None) -> Dict:
+        """把工作区增量同步到本地索引，未配置索引时抛出 RuntimeError"""
+        if self.profile_index is None:
+            raise RuntimeError("未配置本地配置文件索引")
+        return self.profile_index.sync(self, workspace_id, max_age)
+
+    def _get(self, endpoint: str, params: Optional[Dict] = None, decode: Optional[Callable] = None) -> Dict:
         """发送 GET 请求到指定端点"""
-        url = f"{self.base_url}{endpoint}"
-        try:
-            logger.debug(f"发送 GET 请求: {url}, params={params}")
-            response = self.session.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"GET 请求失败: {url}, 错误: {str(e)}")
-            raise
+        return self._request("GET", endpoint, decode=decode, params=params)
 
     def _post(self, endpoint: str, data: Dict) -> Dict:
         """发送 POST 请求到指定端点"""
+        return self._request("POST", endpoint, json=data)
+
+    def _request(self, method: str, endpoint: str, decode: Optional[Callable] = None, **kwargs) -> Dict:
+        """发送请求并记录指标，429 响应按 Retry-After 等待后重试
+
+        decode 用于替换 response.json() 解析响应正文（例如 orjson）。
+        """
         url = f"{self.base_url}{endpoint}"
-        try:
-            logger.debug(f"发送 POST 请求: {url}, data={data}")
-            response = self.session.post(
-                url,
-                headers=self.headers,
-                json=data,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"POST 请求失败: {url}, 错误: {str(e)}")
-            raise
+        if self._breaker is not None:
+            self._breaker.before_request()
+        throttled = 0
+        while True:
+            start = time.perf_counter()
+            status = None
+            api_code = None
+            exception = None
+            retries = 0
+            overloaded = False
+            retry_after = None
+            if self._limiter is not None:
+                self._limiter.acquire()
+            try:
+                logger.debug(f"发送 {method} 请求: {url}, {kwargs}")
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    timeout=REQUEST_TIMEOUT,
+                    **kwargs
+                )
+                status = response.status_code
+                retries = _retry_count(response)
+                if self._breaker is not None:
+                    self._breaker.record_success()
+                # 5xx 被 urllib3 重试过或 429 都说明服务端已过载
+                overloaded = status == 429 or status >= 500 or retries > 0
+                if status in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+                if status == 429 and throttled < MAX_RETRIES:
+                    throttled += 1
+                    retries += 1
+                    if retry_after is None:
+                        retry_after = 0.5 * (2 ** (throttled - 1))
+                    logger.warning(f"请求被限流: {url}, {retry_after:.2f}s 后重试 ({throttled}/{MAX_RETRIES})")
+                    if self._limiter is None:
+                        time.sleep(retry_after)
+                    continue
+
+                response.raise_for_status()
+                result = decode(response.content) if decode is not None else response.json()
+                if isinstance(result, dict):
+                    api_code = result.get("code")
+                return result
+            except requests.exceptions.RequestException as e:
+                # 4xx/5xx 已按状态码记录，异常只统计连接、超时等传输层失败和响应解析失败
+                if status is None or status < 400:
+                    exception = type(e).__name__
+                if isinstance(e, requests.exceptions.Timeout):
+                    overloaded = True
+                if self._breaker is not None and isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                ):
+                    self._breaker.record_failure()
+                if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.RetryError)):
+                    retries = MAX_RETRIES
+                logger.error(f"{method} 请求失败: {url}, 错误: {str(e)}")
+                raise
+            finally:
+                latency = time.perf_counter() - start
+                if self._limiter is not None:
+                    self._limiter.release(latency, overloaded, retry_after)
+                if self._metrics is not None:
+                    self._metrics.record(
+                        _ENDPOINT_NAMES.get(endpoint, endpoint),
+                        latency,
+                        status=status,
+                        api_code=api_code,
+                        exception=exception,
+                        retries=retries
+                    )
+
+    def _probe_health(self) -> bool:
+        """熔断探测：绕过熔断和重试直接请求健康检查接口"""
+        response = requests.get(
+            f"{self.base_url}{API_ENDPOINTS['health_check']}",
+            headers=self.headers,
+            timeout=BREAKER_PROBE_TIMEOUT
+        )
+        return response.ok and response.json().get("code") == 0
+
+    @property
+    def circuit_open(self) -> bool:
+        """熔断器是否处于打开状态"""
+        return self._breaker is not None and self._breaker.is_open
+
+    def wait_until_available(self, timeout: Optional[float] = None) -> bool:
+        """暂停等待熔断关闭，未启用熔断时立即返回 True"""
+        if self._breaker is None:
+            return True
+        return self._breaker.pause(timeout)
+
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        """自适应限制器当前允许的并发请求数，未启用时为 None"""
+        return self._limiter.limit if self._limiter is not None else None
+
+    def metrics(self) -> Dict[str, Dict]:
+        """返回按 API_ENDPOINTS 键统计的调用次数、错误、重试和延迟分位数"""
+        return self._metrics.snapshot() if self._metrics is not None else {}
+
+    def metrics_prometheus(self) -> str:
+        """以 Prometheus 文本格式导出指标"""
+        return self._metrics.to_prometheus() if self._metrics is not None else ""
 
     def health_check(self) -> Dict:
         """检查 API 服务健康状态"""
@@ -74,7 +281,14 @@ class RoxyAPIClient:
         """获取所有工作区列表"""
         return self._get(API_ENDPOINTS["workspaces"])
 
-    def list_profiles(self, workspace_id: int, sort_nums: str = "", page: int = 1, size: int = 20) -> Dict:
+    def list_profiles(
+        self,
+        workspace_id: int,
+        sort_nums: str = "",
+        page: int = 1,
+        size: int = 20,
+        decode: Optional[Callable] = None
+    ) -> Dict:
         """获取指定工作区的配置文件列表"""
         params = {
             "workspaceId": workspace_id,
@@ -82,7 +296,70 @@ class RoxyAPIClient:
             "page": page,
             "size": size
         }
-        return self._get(API_ENDPOINTS["list_profiles"], params)
+        return self._get(API_ENDPOINTS["list_profiles"], params, decode)
+
+    def iter_profiles(
+        self,
+        workspace_id: int,
+        page_size: int = LIST_PAGE_SIZE,
+        prefetch: int = LIST_PREFETCH,
+        sort_nums: str = "",
+        decode: Optional[Callable] = None
+    ) -> Iterator[Dict]:
+        """逐条遍历工作区内的全部配置文件
+
+        在调用方处理当前页时后台预取后续 prefetch 页，内存中最多保留
+        prefetch + 1 页数据。任一页返回 code != 0 时抛出 RoxyAPIError。
+        decode 可替换响应正文的 JSON 解析函数。
+        """
+        if page_size <= 0:
+            raise ValueError("page_size 必须大于0")
+
+        # 只在指定时传入 decode，保持对 list_profiles 的调用方式不变
+        extra = {"decode": decode} if decode is not None else {}
+
+        def fetch(page: int) -> Dict:
+            response = self.list_profiles(workspace_id, sort_nums, page, page_size, **extra)
+            if not response or response.get("code") != 0:
+                raise RoxyAPIError(f"获取配置文件列表失败: page={page}, {response}", response)
+            return response.get("data") or {}
+
+        if prefetch <= 0:
+            page = 1
+            while True:
+                data = fetch(page)
+                rows = data.get("list") or data.get("rows") or []
+                yield from rows
+                if not _has_next_page(data, rows, page, page_size):
+                    return
+                page += 1
+
+        executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="roxy-prefetch")
+        pending = deque()
+        next_page = 1
+        try:
+            pending.append((next_page, executor.submit(fetch, next_page)))
+            next_page += 1
+            while pending:
+                page, future = pending.popleft()
+                data = future.result()
+                rows = data.get("list") or data.get("rows") or []
+                if not _has_next_page(data, rows, page, page_size):
+                    for _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                else:
+                    # 总数已知时不越过最后一页预取
+                    total = data.get("total")
+                    last_page = -(-int(total) // page_size) if total is not None else None
+                    while len(pending) < prefetch and (last_page is None or next_page <= last_page):
+                        pending.append((next_page, executor.submit(fetch, next_page)))
+                        next_page += 1
+                yield from rows
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def get_accounts(self, workspace_id: int, account_id: int = 0, page: int = 1, size: int = 15) -> Dict:
         """获取已配置的平台账号列表"""
@@ -101,23 +378,47 @@ class RoxyAPIClient:
 
     def create_profile(self, data: Dict) -> Dict:
         """创建新的配置文件"""
-        return self._post(API_ENDPOINTS["create_profile"], data)
+        response = self._post(API_ENDPOINTS["create_profile"], data)
+        if self.profile_index is not None and response.get("code") == 0:
+            created = response.get("data") or {}
+            workspace_id = data.get("workspaceId") or created.get("workspaceId")
+            if created.get("dirId") and workspace_id is not None:
+                profile = dict(data, dirId=created["dirId"], workspaceId=workspace_id)
+                self._write_index("写入", self.profile_index.upsert, [profile], workspace_id)
+        return response
 
     def modify_profile(self, data: Dict) -> Dict:
         """修改现有配置文件"""
-        return self._post(API_ENDPOINTS["modify_profile"], data)
+        response = self._post(API_ENDPOINTS["modify_profile"], data)
+        if self.profile_index is not None and response.get("code") == 0 and data.get("dirId"):
+            fields = {k: v for k, v in data.items() if k not in ("dirId", "workspaceId")}
+            self._write_index("更新", self.profile_index.update, data["dirId"], fields)
+        return response
+
+    def _write_index(self, action: str, func: Callable, *args) -> None:
+        """写穿透到本地索引；接口已成功，索引写入失败只记录日志，下次 sync 时修正"""
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error(f"{action}配置文件索引失败: {str(e)}")
 
     def open_profile(self, dir_id: Union[str, int], args: Optional[Union[str, int]] = None) -> Dict:
         """打开指定的配置文件"""
         data = {"dirId": dir_id}
         if args:
             data["args"] = args
-        return self._post(API_ENDPOINTS["open_profile"], data)
+        try:
+            return self._post(API_ENDPOINTS["open_profile"], data)
+        finally:
+            self.invalidate_connection_info([dir_id])
 
     def close_profile(self, dir_id: Union[str, int]) -> Dict:
         """关闭指定的配置文件"""
         data = {"dirId": dir_id}
-        return self._post(API_ENDPOINTS["close_profile"], data)
+        try:
+            return self._post(API_ENDPOINTS["close_profile"], data)
+        finally:
+            self.invalidate_connection_info([dir_id])
 
     def random_fingerprint(self, workspace_id: int, dir_id: Union[str, int]) -> Dict:
         """为指定配置文件随机生成指纹"""
@@ -127,30 +428,161 @@ class RoxyAPIClient:
         }
         return self._post(API_ENDPOINTS["random_fingerprint"], data)
 
+    def _post_dir_ids(self, name: str, dir_ids: List[Union[str, int]], split, workspace_id: Optional[int] = None) -> Dict:
+        """发送带 dirIds 的 POST 请求，开启合并时与并发调用合并为一次请求"""
+        def execute(ids: List[Union[str, int]]) -> Dict:
+            data = {}
+            if workspace_id is not None:
+                data["workspaceId"] = workspace_id
+            data["dirIds"] = ids
+            return self._post(API_ENDPOINTS[name], data)
+
+        if self._coalescer is None:
+            return execute(dir_ids)
+        return self._coalescer.submit((name, workspace_id), dir_ids, execute, split)
+
     def delete_profile(self, workspace_id: int, dir_ids: List[Union[str, int]]) -> Dict:
         """删除指定的配置文件"""
-        data = {
-            "workspaceId": workspace_id,
-            "dirIds": dir_ids
-        }
-        return self._post(API_ENDPOINTS["delete_profile"], data)
+        try:
+            response = self._post_dir_ids("delete_profile", dir_ids, share_response, workspace_id)
+            if self.profile_index is not None and response.get("code") == 0:
+                self._write_index("删除", self.profile_index.remove, dir_ids)
+            return response
+        finally:
+            self.invalidate_connection_info(dir_ids)
 
     def get_connection_info(self, dir_ids: Optional[List[Union[str, int]]] = None) -> Dict:
-        """获取已打开窗口的连接信息"""
-        data = {}
-        if dir_ids:
-            data["dirIds"] = dir_ids
-        return self._post(API_ENDPOINTS["connection_info"], data)
+        """获取已打开窗口的连接信息
+
+        开启缓存时，仅对缓存中不存在或已过期的 dirId 发起请求；全部命中时不发送请求。
+        """
+        if not dir_ids:
+            response = self._post(API_ENDPOINTS["connection_info"], {})
+            self._cache_connection_info(response)
+            return response
+
+        if self._connection_cache is None:
+            return self._post_dir_ids("connection_info", dir_ids, split_by_dir_id)
+
+        cached = {}
+        missing = []
+        for dir_id in dir_ids:
+            info = self._connection_cache.get(str(dir_id))
+            if info is None:
+                missing.append(dir_id)
+            else:
+                cached[str(dir_id)] = info
+        if not missing:
+            return {"code": 0, "msg": "success", "data": cached}
+
+        response = self._post_dir_ids("connection_info", missing, split_by_dir_id)
+        self._cache_connection_info(response)
+        if cached and response and response.get("code") == 0:
+            response = {**response, "data": {**cached, **(response.get("data") or {})}}
+        return response
+
+    def _cache_connection_info(self, response: Dict) -> None:
+        """把连接信息响应写入缓存
+
+        按 dirId 缓存接口返回的原始条目，命中缓存时返回的数据与直接请求一致；缺少 http
+        字段的条目不缓存。
+        """
+        if self._connection_cache is None or not response or response.get("code") != 0 or not response.get("data"):
+            return
+        self._connection_cache.update({
+            str(k): v for k, v in response["data"].items() if isinstance(v, dict) and "http" in v
+        })
+
+    def invalidate_connection_info(self, dir_ids: Optional[List[Union[str, int]]] = None) -> None:
+        """使指定（或全部）配置文件的连接信息缓存失效"""
+        if self._connection_cache is None:
+            return
+        if dir_ids is None:
+            self._connection_cache.clear()
+        else:
+            self._connection_cache.invalidate(str(dir_id) for dir_id in dir_ids)
 
     def clear_local_cache(self, dir_ids: List[Union[str, int]]) -> Dict:
         """清空指定配置文件的本地缓存"""
-        data = {"dirIds": dir_ids}
-        return self._post(API_ENDPOINTS["clear_local_cache"], data)
+        return self._post_dir_ids("clear_local_cache", dir_ids, share_response)
 
     def clear_server_cache(self, workspace_id: int, dir_ids: List[Union[str, int]]) -> Dict:
         """清空指定配置文件的服务器缓存"""
-        data = {
-            "workspaceId": workspace_id,
-            "dirIds": dir_ids
-        }
-        return self._post(API_ENDPOINTS["clear_server_cache"], data)
\ No newline at end of file
+        return self._post_dir_ids("clear_server_cache", dir_ids, share_response, workspace_id)
+
+    # ------------------------------------------------------------------ 类型化接口（可选）
+
+    def list_profile_records(
+        self,
+        workspace_id: int,
+        page: int = 1,
+        size: int = 20,
+        fields: Optional[Iterable[str]] = None,
+        sort_nums: str = ""
+    ) -> List[Profile]:
+        """获取一页配置文件并转换为 Profile，fields 为需要保留的属性名"""
+        response = self.list_profiles(workspace_id, sort_nums, page, size, loads)
+        return Profile.decode_list(list_rows(_checked(response, "获取配置文件列表失败")), fields)
+
+    def iter_profile_records(
+        self,
+        workspace_id: int,
+        fields: Optional[Iterable[str]] = None,
+        page_size: int = LIST_PAGE_SIZE,
+        prefetch: int = LIST_PREFETCH,
+        sort_nums: str = ""
+    ) -> Iterator[Profile]:
+        """逐条遍历工作区内的配置文件并只保留 fields 指定的字段"""
+        decode = Profile.decoder(fields)
+        for row in self.iter_profiles(workspace_id, page_size, prefetch, sort_nums, loads):
+            yield decode(row)
+
+    def get_workspace_records(self) -> List[Workspace]:
+        """获取工作区列表并转换为 Workspace"""
+        response = self._get(API_ENDPOINTS["workspaces"], decode=loads)
+        return Workspace.decode_list(list_rows(_checked(response, "获取工作区列表失败")))
+
+    def get_account_records(
+        self,
+        workspace_id: int,
+        fields: Optional[Iterable[str]] = None,
+        page: int = 1,
+        size: int = 15
+    ) -> List[Account]:
+        """获取平台账号并转换为 Account"""
+        params = {"workspaceId": workspace_id, "accountId": 0, "page_index": page, "page_size": size}
+        response = self._get(API_ENDPOINTS["accounts"], params, loads)
+        return Account.decode_list(list_rows(_checked(response, "获取账号列表失败")), fields)
+
+    def get_label_records(self, workspace_id: int) -> List[Label]:
+        """获取标签并转换为 Label"""
+        response = self._get(API_ENDPOINTS["labels"], {"workspaceId": workspace_id}, loads)
+        return Label.decode_list(list_rows(_checked(response, "获取标签列表失败")))
+
+    def get_connection_records(self, dir_ids: Optional[List[Union[str, int]]] = None) -> Dict[str, ConnectionInfo]:
+        """获取连接信息，返回 dirId -> ConnectionInfo"""
+        data = _checked(self.get_connection_info(dir_ids), "获取连接信息失败")
+        decode = ConnectionInfo.decoder()
+        return {str(dir_id): decode(dict(info, dirId=str(dir_id))) for dir_id, info in data.items()}
+
+
+def _checked(response: Dict, message: str):
+    """校验 code == 0 并返回 data，否则抛出 RoxyAPIError"""
+    if not response or response.get("code") != 0:
+        raise RoxyAPIError(f"{message}: {response}", response)
+    return response.get("data") or {}
+
+
+def _retry_count(response: requests.Response) -> int:
+    """读取 urllib3 在本次请求中实际执行的重试次数"""
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None)
+    return len(history) if history else 0
+
+
+def _has_next_page(data: Dict, rows: List, page: int, page_size: int) -> bool:
+    """根据 total 或本页条数判断是否还有下一页"""
+    total = data.get("total")
+    if total is not None:
+        return page * page_size < int(total)
+    return len(rows) >= page_size
@@ -0,0 +1,239 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from config.settings import SCHEDULER_MAX_WORKERS
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value) -> float:
+    """解析间隔 "30s"、"15m"、"2h"、"1d" 或秒数"""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(value))
+        if not match:
+            raise ValueError(f"无法解析的间隔: {value}")
+        seconds = float(match.group(1)) * _UNITS.get(match.group(2) or "s")
+    if seconds <= 0:
+        raise ValueError(f"间隔必须大于0: {value}")
+    return seconds
+
+
+def _cron_field(text: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in text.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron 字段超出范围: {text}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    """五段式 cron 表达式：分 时 日 月 周（0 为周日），支持 *、a-b、a,b 和 /n
+
+    日和周同时指定时满足任一即可，与 cron 一致。
+    """
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要 5 个字段: {expr}")
+        self.expr = expr
+        self.minutes = _cron_field(fields[0], 0, 59)
+        self.hours = _cron_field(fields[1], 0, 23)
+        self.days = _cron_field(fields[2], 1, 31)
+        self.months = _cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, timestamp: float) -> float:
+        """返回 timestamp 之后的下一次触发时间（本地时间）"""
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"cron 表达式永远不会触发: {self.expr}")
+
+
+class IntervalSchedule:
+    """固定间隔"""
+
+    def __init__(self, interval):
+        self.interval = parse_interval(interval)
+
+    def next_after(self, timestamp: float) -> float:
+        return timestamp + self.interval
+
+
+class Job:
+    """定时任务
+
+    schedule 为 CronSchedule 或 IntervalSchedule。每次触发时间加上 [0, jitter) 秒的随机偏移，
+    使同一时刻到期的多个任务（如各工作区的同类任务）错开请求。下一次计划时间从上一次未加
+    偏移的计划时间推算，偏移不会逐次累积。同一任务上一次尚未结束时，本次触发跳过，不会重叠执行。
+    """
+
+    def __init__(self, name: str, func: Callable[[], object], schedule, jitter: float = 0, run_at_start: bool = False):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.next_run: Optional[float] = None
+        # 未加抖动的计划时间
+        self.base_run: Optional[float] = None
+        self.running = False
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+
+    def plan(self, now: float, rng: random.Random) -> None:
+        if self.base_run is None:
+            base = now if self.run_at_start else self.schedule.next_after(now)
+        else:
+            base = self.schedule.next_after(self.base_run)
+            if base <= now:
+                # 调度循环停顿错过了若干次，从当前时间重新计划，不补跑
+                base = self.schedule.next_after(now)
+        self.base_run = base
+        self.next_run = base + (rng.uniform(0, self.jitter) if self.jitter else 0)
+
+
+class Scheduler:
+    """在常驻进程中按计划执行任务
+
+    到期的任务提交到 max_workers 个线程的线程池执行，调度循环不被长任务阻塞；
+    任务使用的客户端在进程内复用，避免每次重新建立连接。
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[List[Job]] = None,
+        max_workers: int = SCHEDULER_MAX_WORKERS,
+        clock: Callable[[], float] = time.time,
+        seed: Optional[int] = None
+    ):
+        self.jobs: List[Job] = []
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        for job in jobs or []:
+            self.add(job)
+
+    def add(self, job: Job) -> Job:
+        if any(existing.name == job.name for existing in self.jobs):
+            raise ValueError(f"任务名重复: {job.name}")
+        job.plan(self._clock(), self._rng)
+        self.jobs.append(job)
+        logger.info(f"添加定时任务 {job.name}，下次执行 {datetime.fromtimestamp(job.next_run):%Y-%m-%d %H:%M:%S}")
+        return job
+
+    def _execute(self, job: Job) -> None:
+        start = time.monotonic()
+        try:
+            job.func()
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"定时任务 {job.name} 执行失败: {str(e)}")
+        else:
+            job.last_error = None
+        finally:
+            job.last_duration = time.monotonic() - start
+            job.runs += 1
+            with self._lock:
+                job.running = False
+            logger.info(f"定时任务 {job.name} 结束，耗时 {job.last_duration:.1f}s")
+
+    def run_pending(self) -> List[str]:
+        """提交所有到期的任务，返回本次启动的任务名"""
+        now = self._clock()
+        started = []
+        for job in self.jobs:
+            if job.next_run is None or job.next_run > now:
+                continue
+            job.plan(now, self._rng)
+            with self._lock:
+                if job.running:
+                    job.skipped += 1
+                    logger.warning(f"定时任务 {job.name} 上次尚未结束，跳过本次执行")
+                    continue
+                job.running = True
+            started.append(job.name)
+            self._executor.submit(self._execute, job)
+        return started
+
+    def seconds_until_next(self) -> Optional[float]:
+        pending = [job.next_run for job in self.jobs if job.next_run is not None]
+        return max(0.0, min(pending) - self._clock()) if pending else None
+
+    def run_forever(self, max_sleep: float = 60) -> None:
+        """循环执行直到 request_stop() 或 stop() 被调用"""
+        logger.info(f"调度器启动，共 {len(self.jobs)} 个任务")
+        while not self._stop.is_set():
+            self.run_pending()
+            wait = self.seconds_until_next()
+            self._stop.wait(max_sleep if wait is None else min(wait, max_sleep))
+        logger.info("调度器已停止")
+
+    def request_stop(self) -> None:
+        """通知 run_forever 退出，可在信号处理函数中调用"""
+        self._stop.set()
+
+    def stop(self, wait: bool = True) -> None:
+        """停止调度并关闭线程池，wait 为 True 时等待正在执行的任务结束"""
+        self._stop.set()
+        self._executor.shutdown(wait=wait)
+
+    def status(self) -> List[Dict]:
+        return [
+            {
+                "name": job.name,
+                "next_run": job.next_run,
+                "running": job.running,
+                "runs": job.runs,
+                "skipped": job.skipped,
+                "failures": job.failures,
+                "last_error": job.last_error,
+                "last_duration": job.last_duration
+            }
+            for job in self.jobs
+        ]
@@ -0,0 +1,260 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Union, Any
+from config.settings import SESSION_POOL_SIZE, SESSION_IDLE_TIMEOUT
+from utils import get_logger
+from .roxy_client import RoxyAPIClient, RoxyAPIError
+from .registry import get_client
+
+logger = get_logger(__name__)
+
+DirId = Union[str, int]
+
+
+def attach_chrome(debugger_address: str) -> Any:
+    """通过调试地址附加到已打开的浏览器窗口"""
+    from selenium import webdriver
+
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.debugger_address = debugger_address
+    return webdriver.Chrome(options=chrome_options)
+
+
+def driver_is_alive(driver: Any) -> bool:
+    """检查 driver 对应的浏览器是否仍可用"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class BrowserSession:
+    """已打开并附加了 driver 的配置文件窗口"""
+
+    __slots__ = ("dir_id", "driver", "conn_info", "in_use", "last_used")
+
+    def __init__(self, dir_id: DirId, driver: Any, conn_info: Dict):
+        self.dir_id = dir_id
+        self.driver = driver
+        self.conn_info = conn_info
+        self.in_use = False
+        self.last_used = time.monotonic()
+
+
+class BrowserSessionPool:
+    """保持最多 max_sessions 个已打开窗口，租借给登录/自动化任务复用
+
+    同一配置文件连续租借时跳过打开窗口和附加 driver 的冷启动；每次租借前做
+    健康检查，空闲超过 idle_timeout 秒的窗口由后台线程关闭。
+    """
+
+    def __init__(
+        self,
+        client: Optional[RoxyAPIClient] = None,
+        max_sessions: int = SESSION_POOL_SIZE,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        driver_factory: Callable[[str], Any] = attach_chrome,
+        health_check: Callable[[Any], bool] = driver_is_alive
+    ):
+        if max_sessions <= 0:
+            raise ValueError("max_sessions 必须大于0")
+        self.client = client or get_client()
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.driver_factory = driver_factory
+        self.health_check = health_check
+
+        self._sessions: Dict[str, BrowserSession] = {}
+        # 正在打开和正在关闭的窗口也占用名额；关闭完成前同一配置文件不能重新打开，
+        # 否则延迟到达的关闭请求会关掉刚租借出去的窗口
+        self._opening = set()
+        self._closing = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reaper: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "BrowserSessionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @contextmanager
+    def lease(self, dir_id: DirId, timeout: Optional[float] = None) -> Iterator[BrowserSession]:
+        """租借指定配置文件的窗口，退出上下文时归还"""
+        session = self.acquire(dir_id, timeout)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def acquire(self, dir_id: DirId, timeout: Optional[float] = None) -> BrowserSession:
+        """获取指定配置文件的窗口，必要时打开新窗口或淘汰最久未用的空闲窗口"""
+        key = str(dir_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("会话池已关闭")
+
+                session = self._sessions.get(key)
+                if session is not None and not session.in_use:
+                    session.in_use = True
+                    break
+                if session is None and key not in self._opening and key not in self._closing:
+                    if len(self._sessions) + len(self._opening) + len(self._closing) < self.max_sessions:
+                        self._opening.add(key)
+                        break
+                    victim = self._idle_victim()
+                    if victim is not None:
+                        self._detach(victim)
+                        self._cond.release()
+                        try:
+                            self._shutdown(victim)
+                        finally:
+                            self._cond.acquire()
+                            self._closing.discard(str(victim.dir_id))
+                            self._cond.notify_all()
+                        continue
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"等待配置文件 {dir_id} 的会话超时")
+                self._cond.wait(remaining)
+
+        if session is not None:
+            if self.health_check(session.driver):
+                return session
+            logger.warning(f"配置文件 {dir_id} 的会话健康检查失败，重新打开")
+            with self._cond:
+                self._sessions.pop(key, None)
+                self._opening.add(key)
+            self._shutdown(session)
+
+        try:
+            session = self._open(dir_id)
+        except BaseException:
+            with self._cond:
+                self._opening.discard(key)
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._opening.discard(key)
+            session.in_use = True
+            self._sessions[key] = session
+            self._ensure_reaper()
+        return session
+
+    def release(self, session: BrowserSession, discard: bool = False) -> None:
+        """归还会话，discard 为 True 时直接关闭窗口"""
+        with self._cond:
+            session.in_use = False
+            session.last_used = time.monotonic()
+            discard = discard or self._closed
+            pooled = self._sessions.get(str(session.dir_id)) is session
+            if discard and pooled:
+                self._detach(session)
+            self._cond.notify_all()
+        if discard and pooled:
+            self._shutdown_detached([session])
+        elif discard:
+            self._shutdown(session)
+
+    def reap_idle(self) -> int:
+        """关闭空闲超时的会话，返回关闭数量"""
+        now = time.monotonic()
+        with self._cond:
+            expired = [
+                s for s in self._sessions.values()
+                if not s.in_use and now - s.last_used >= self.idle_timeout
+            ]
+            for session in expired:
+                self._detach(session)
+        self._shutdown_detached(expired)
+        return len(expired)
+
+    def close(self) -> None:
+        """关闭所有会话并停止后台线程"""
+        with self._cond:
+            self._closed = True
+            sessions = [s for s in self._sessions.values() if not s.in_use]
+            for session in sessions:
+                self._detach(session)
+            self._cond.notify_all()
+        self._shutdown_detached(sessions)
+
+    def _idle_victim(self) -> Optional[BrowserSession]:
+        idle = [s for s in self._sessions.values() if not s.in_use]
+        return min(idle, key=lambda s: s.last_used) if idle else None
+
+    def _open(self, dir_id: DirId) -> BrowserSession:
+        """打开窗口并附加 driver"""
+        response = self.client.open_profile(dir_id)
+        if response.get("code") != 0:
+            raise RoxyAPIError(f"打开配置文件失败: {response}", response)
+        try:
+            conn_info = self.client.get_connection_info([dir_id])
+            if conn_info.get("code") != 0:
+                raise RoxyAPIError(f"获取连接信息失败: {conn_info}", conn_info)
+            profile_info = conn_info["data"][str(dir_id)]
+            driver = self.driver_factory(f"{profile_info['http']}")
+        except BaseException:
+            self._close_profile(dir_id)
+            raise
+        logger.debug(f"会话池打开配置文件 {dir_id}")
+        return BrowserSession(dir_id, driver, profile_info)
+
+    def _detach(self, session: BrowserSession) -> None:
+        """从池中移除会话并标记为关闭中，调用方需持有 _cond"""
+        del self._sessions[str(session.dir_id)]
+        self._closing.add(str(session.dir_id))
+
+    def _shutdown_detached(self, sessions) -> None:
+        """关闭已 _detach 的会话，完成后唤醒等待重新打开同一配置文件的调用方"""
+        if not sessions:
+            return
+        try:
+            for session in sessions:
+                self._shutdown(session)
+        finally:
+            with self._cond:
+                for session in sessions:
+                    self._closing.discard(str(session.dir_id))
+                self._cond.notify_all()
+
+    def _shutdown(self, session: BrowserSession) -> None:
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+        self._close_profile(session.dir_id)
+        logger.debug(f"会话池关闭配置文件 {session.dir_id}")
+
+    def _close_profile(self, dir_id: DirId) -> None:
+        try:
+            self.client.close_profile(dir_id)
+        except Exception as e:
+            logger.warning(f"关闭配置文件 {dir_id} 失败: {str(e)}")
+
+    def _ensure_reaper(self) -> None:
+        if self.idle_timeout <= 0 or (self._reaper is not None and self._reaper.is_alive()):
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="roxy-session-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        interval = max(0.05, min(self.idle_timeout / 2, 30))
+        while True:
+            with self._cond:
+                if self._closed or not self._sessions:
+                    self._reaper = None
+                    return
+                self._cond.wait(interval)
+            self.reap_idle()
@@ -0,0 +1,379 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from config.settings import API_NODES, PROFILE_INDEX_ENABLED, SHARD_MISS_TTL
+from utils import get_logger
+from .profile_index import ProfileIndex
+from .roxy_client import RoxyAPIClient
+
+logger = get_logger(__name__)
+
+DirId = Union[str, int]
+
+
+def _rows(response: Dict) -> List[Dict]:
+    """从列表类响应中取出记录，兼容 data 为数组或 {"list"/"rows": [...]}"""
+    data = (response or {}).get("data") or []
+    if isinstance(data, dict):
+        data = data.get("list") or data.get("rows") or []
+    return data
+
+
+def _merge(responses: List[Dict]) -> Dict:
+    """合并多个节点的响应：全部成功时 code 为 0，否则返回第一个失败响应"""
+    for response in responses:
+        if not response or response.get("code") != 0:
+            return response
+    return {"code": 0, "msg": "success", "data": None}
+
+
+def _merge_pages(responses: List[Dict]) -> Dict:
+    """合并各节点同一页的分页响应：total 相加，记录按节点顺序拼接"""
+    failed = _merge(responses)
+    if failed.get("code") != 0:
+        return failed
+    total = 0
+    rows: List[Dict] = []
+    for response in responses:
+        data = response.get("data") or {}
+        total += int(data.get("total") or 0) if isinstance(data, dict) else len(data)
+        rows.extend(_rows(response))
+    return {"code": 0, "msg": "success", "data": {"total": total, "rows": rows}}
+
+
+def _unknown(dir_ids: List[DirId]) -> Dict:
+    return {"code": -1, "msg": f"未找到配置文件所在节点: {[str(dir_id) for dir_id in dir_ids]}", "data": None}
+
+
+class ShardedRoxyClient:
+    """把请求分发到多个 Roxy 节点的路由客户端
+
+    创建请求发往在途创建最少的可用节点；每个配置文件的归属节点在创建或遍历时记录，之后的
+    修改、打开、关闭、连接信息等请求固定发往该节点。归属未知时并行扫描各节点的工作区查找，
+    扫描后 SHARD_MISS_TTL 秒内仍未知的 dirId 直接返回 code 为 -1 的响应，不再重复扫描。
+    传入 owner_index（或启用 PROFILE_INDEX_ENABLED）时归属按节点地址持久化，重启后无需重新扫描。
+    各节点使用相同的 workspace_id。接口与 RoxyAPIClient 保持一致，可直接传给批量任务。
+    """
+
+    def __init__(
+        self,
+        nodes: Optional[List[Dict]] = None,
+        clients: Optional[List[RoxyAPIClient]] = None,
+        owner_index: Optional[ProfileIndex] = None
+    ):
+        if clients is None:
+            from .registry import get_client
+            clients = [get_client(node["base_url"], node["token"]) for node in (nodes or API_NODES)]
+        if not clients:
+            raise ValueError("至少需要一个节点")
+        self.clients = list(clients)
+        if owner_index is None and PROFILE_INDEX_ENABLED:
+            owner_index = ProfileIndex()
+        self.owner_index = owner_index
+        self._owners: Dict[str, int] = {}
+        self._last_discover: Optional[float] = None
+        if owner_index is not None:
+            # 按节点地址恢复，节点增删或顺序变化后已不存在的节点的记录被忽略
+            positions = {client.base_url: i for i, client in enumerate(self.clients)}
+            for dir_id, node in owner_index.owners().items():
+                if node in positions:
+                    self._owners[dir_id] = positions[node]
+        self._in_flight = [0] * len(self.clients)
+        self._created = [0] * len(self.clients)
+        self._lock = threading.Lock()
+        self._discover_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="roxy-shard")
+
+    def close(self) -> None:
+        """关闭并行分发线程池，节点客户端由注册表或调用方管理"""
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------ 路由
+
+    def owner_of(self, dir_id: DirId) -> RoxyAPIClient:
+        """返回配置文件所在节点的客户端，找不到时抛出 KeyError"""
+        index = self._owner_index(dir_id)
+        if index is None:
+            raise KeyError(f"未找到配置文件所在节点: {dir_id}")
+        return self.clients[index]
+
+    def _owner_index(self, dir_id: DirId) -> Optional[int]:
+        index = self._owners.get(str(dir_id))
+        if index is not None:
+            return index
+        # 多个线程同时未命中时只扫描一次；刚扫描过仍未找到的视为不存在，避免每个未知 dirId 触发全量扫描
+        with self._discover_lock:
+            fresh = self._last_discover is not None and time.monotonic() - self._last_discover < SHARD_MISS_TTL
+            if str(dir_id) not in self._owners and not fresh:
+                self.discover()
+        return self._owners.get(str(dir_id))
+
+    def discover(self, workspace_id: Optional[int] = None) -> int:
+        """并行遍历各节点的工作区，记录配置文件归属，返回记录数"""
+        def scan(index: int) -> int:
+            client = self.clients[index]
+            if workspace_id is not None:
+                workspace_ids = [workspace_id]
+            else:
+                workspace_ids = [ws["id"] for ws in _rows(client.get_workspaces())]
+            found = {}
+            for ws in workspace_ids:
+                for profile in client.iter_profiles(ws):
+                    found[str(profile["dirId"])] = index
+            self._remember(found)
+            return len(found)
+
+        count = sum(self._map(scan, range(len(self.clients))))
+        if workspace_id is None:
+            self._last_discover = time.monotonic()
+        return count
+
+    def _remember(self, owners: Dict[str, int]) -> None:
+        """记录归属并写入 owner_index，持久化失败只记录日志"""
+        if not owners:
+            return
+        self._owners.update(owners)
+        if self.owner_index is not None:
+            try:
+                self.owner_index.set_owners({dir_id: self.clients[i].base_url for dir_id, i in owners.items()})
+            except Exception as e:
+                logger.error(f"保存配置文件归属失败: {str(e)}")
+
+    def _forget(self, dir_ids: List[DirId]) -> None:
+        for dir_id in dir_ids:
+            self._owners.pop(str(dir_id), None)
+        if self.owner_index is not None:
+            try:
+                self.owner_index.remove_owners(dir_ids)
+            except Exception as e:
+                logger.error(f"删除配置文件归属失败: {str(e)}")
+
+    def _pick_node(self) -> int:
+        """选择在途创建最少的节点，跳过熔断中的节点，相同时选已分配最少的"""
+        with self._lock:
+            candidates = [i for i, client in enumerate(self.clients) if not client.circuit_open]
+            candidates = candidates or list(range(len(self.clients)))
+            index = min(candidates, key=lambda i: (self._in_flight[i], self._created[i]))
+            self._in_flight[index] += 1
+            return index
+
+    def _group(self, dir_ids: List[DirId]) -> Tuple[Dict[int, List[DirId]], List[DirId]]:
+        """按归属节点分组，返回 (分组, 找不到归属的 dirId)"""
+        groups: Dict[int, List[DirId]] = {}
+        unknown: List[DirId] = []
+        for dir_id in dir_ids:
+            index = self._owner_index(dir_id)
+            if index is None:
+                unknown.append(dir_id)
+            else:
+                groups.setdefault(index, []).append(dir_id)
+        return groups, unknown
+
+    def _map(self, func: Callable, items) -> List:
+        items = list(items)
+        if len(items) == 1:
+            return [func(items[0])]
+        return list(self._executor.map(func, items))
+
+    def _per_owner(self, dir_ids: List[DirId], call: Callable[[RoxyAPIClient, List[DirId]], Dict]) -> List[Dict]:
+        """按节点分组并行调用，有找不到归属的 dirId 时追加一个 code 为 -1 的响应"""
+        groups, unknown = self._group(dir_ids)
+        responses = self._map(lambda item: call(self.clients[item[0]], item[1]), groups.items())
+        if unknown:
+            responses.append(_unknown(unknown))
+        return responses
+
+    # ------------------------------------------------------------------ 节点状态
+
+    @property
+    def circuit_open(self) -> bool:
+        """所有节点都处于熔断时为 True"""
+        return all(client.circuit_open for client in self.clients)
+
+    def wait_until_available(self, timeout: Optional[float] = None) -> bool:
+        """等待任一节点恢复"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.circuit_open:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def metrics(self) -> Dict[str, Dict]:
+        """按节点地址返回各节点客户端的指标"""
+        return {client.base_url: client.metrics() for client in self.clients}
+
+    def node_stats(self) -> List[Dict]:
+        """各节点的在途创建数、已创建数和已知配置文件数"""
+        owned = [0] * len(self.clients)
+        for index in list(self._owners.values()):
+            owned[index] += 1
+        return [
+            {"base_url": client.base_url, "in_flight": self._in_flight[i], "created": self._created[i], "owned": owned[i]}
+            for i, client in enumerate(self.clients)
+        ]
+
+    # ------------------------------------------------------------------ API
+
+    def health_check(self) -> Dict:
+        """检查所有节点，全部健康时 code 为 0，data 为各节点的响应"""
+        def check(client: RoxyAPIClient) -> Dict:
+            try:
+                return client.health_check()
+            except Exception as e:
+                return {"code": -1, "msg": str(e)}
+
+        responses = self._map(check, self.clients)
+        code = 0 if all(r.get("code") == 0 for r in responses) else 1
+        return {"code": code, "data": {client.base_url: r for client, r in zip(self.clients, responses)}}
+
+    def get_workspaces(self) -> Dict:
+        """合并各节点的工作区列表（按 id 去重）"""
+        workspaces: Dict = {}
+        for response in self._map(lambda client: client.get_workspaces(), self.clients):
+            if response.get("code") != 0:
+                return response
+            for ws in _rows(response):
+                workspaces.setdefault(ws["id"], ws)
+        return {"code": 0, "msg": "success", "data": list(workspaces.values())}
+
+    def iter_profiles(self, workspace_id: int, **kwargs) -> Iterator[Dict]:
+        """并行遍历所有节点的工作区，按到达顺序产出并记录归属"""
+        results: "queue.Queue" = queue.Queue(maxsize=1000)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(index: int) -> None:
+            try:
+                for profile in self.clients[index].iter_profiles(workspace_id, **kwargs):
+                    if not put((index, profile)):
+                        return
+                put((index, done))
+            except Exception as e:
+                put((index, e))
+
+        # 遍历期间调用方可能继续调用其他接口，生产者使用独立线程，不占用分发线程池
+        for index in range(len(self.clients)):
+            threading.Thread(target=produce, args=(index,), name="roxy-shard-list", daemon=True).start()
+
+        remaining = len(self.clients)
+        pending: Dict[str, int] = {}
+        try:
+            while remaining:
+                index, item = results.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    pending[str(item["dirId"])] = index
+                    if len(pending) >= 500:
+                        self._remember(pending)
+                        pending = {}
+                    yield item
+        finally:
+            stop.set()
+            self._remember(pending)
+
+    def create_profile(self, data: Dict) -> Dict:
+        """在负载最低的节点上创建配置文件"""
+        index = self._pick_node()
+        try:
+            response = self.clients[index].create_profile(data)
+        finally:
+            with self._lock:
+                self._in_flight[index] -= 1
+        if response and response.get("code") == 0:
+            with self._lock:
+                self._created[index] += 1
+            self._remember({str(response["data"]["dirId"]): index})
+        return response
+
+    def _call_owner(self, dir_id: DirId, call: Callable[[RoxyAPIClient], Dict]) -> Dict:
+        index = self._owner_index(dir_id)
+        return _unknown([dir_id]) if index is None else call(self.clients[index])
+
+    def list_profiles(self, workspace_id: int, sort_nums: str = "", page: int = 1, size: int = 20, **kwargs) -> Dict:
+        """并行获取各节点的同一页并合并，遍历全部配置文件请使用 iter_profiles"""
+        responses = self._map(
+            lambda client: client.list_profiles(workspace_id, sort_nums, page, size, **kwargs), self.clients
+        )
+        response = _merge_pages(responses)
+        if response.get("code") == 0:
+            self._remember({
+                str(profile["dirId"]): index
+                for index, item in enumerate(responses)
+                for profile in _rows(item)
+            })
+        return response
+
+    def get_accounts(self, workspace_id: int, account_id: int = 0, page: int = 1, size: int = 15) -> Dict:
+        """并行获取各节点的同一页账号并合并"""
+        return _merge_pages(self._map(
+            lambda client: client.get_accounts(workspace_id, account_id, page, size), self.clients
+        ))
+
+    def get_labels(self, workspace_id: int) -> Dict:
+        """合并各节点的标签（按 id 去重）"""
+        labels: Dict = {}
+        for response in self._map(lambda client: client.get_labels(workspace_id), self.clients):
+            if not response or response.get("code") != 0:
+                return response
+            for label in _rows(response):
+                labels.setdefault(label.get("id"), label)
+        return {"code": 0, "msg": "success", "data": list(labels.values())}
+
+    def modify_profile(self, data: Dict) -> Dict:
+        return self._call_owner(data["dirId"], lambda client: client.modify_profile(data))
+
+    def open_profile(self, dir_id: DirId, args: Optional[Union[str, int]] = None) -> Dict:
+        return self._call_owner(dir_id, lambda client: client.open_profile(dir_id, args))
+
+    def close_profile(self, dir_id: DirId) -> Dict:
+        return self._call_owner(dir_id, lambda client: client.close_profile(dir_id))
+
+    def random_fingerprint(self, workspace_id: int, dir_id: DirId) -> Dict:
+        return self._call_owner(dir_id, lambda client: client.random_fingerprint(workspace_id, dir_id))
+
+    def delete_profile(self, workspace_id: int, dir_ids: List[DirId]) -> Dict:
+        """按节点分组并行删除，删除成功的节点上的 dirId 同时移除归属"""
+        groups, unknown = self._group(dir_ids)
+        items = list(groups.items())
+        responses = self._map(lambda item: self.clients[item[0]].delete_profile(workspace_id, item[1]), items)
+        for (_, ids), response in zip(items, responses):
+            if response and response.get("code") == 0:
+                self._forget(ids)
+        if unknown:
+            responses.append(_unknown(unknown))
+        return _merge(responses)
+
+    def get_connection_info(self, dir_ids: Optional[List[DirId]] = None) -> Dict:
+        """按节点分组并行查询，合并 data"""
+        if dir_ids:
+            responses = self._per_owner(dir_ids, lambda client, ids: client.get_connection_info(ids))
+        else:
+            responses = self._map(lambda client: client.get_connection_info(), self.clients)
+        response = _merge(responses)
+        if response.get("code") != 0:
+            return response
+        data: Dict = {}
+        for item in responses:
+            data.update(item.get("data") or {})
+        return {"code": 0, "msg": "success", "data": data}
+
+    def clear_local_cache(self, dir_ids: List[DirId]) -> Dict:
+        return _merge(self._per_owner(dir_ids, lambda client, ids: client.clear_local_cache(ids)))
+
+    def clear_server_cache(self, workspace_id: int, dir_ids: List[DirId]) -> Dict:
+        return _merge(self._per_owner(dir_ids, lambda client, ids: client.clear_server_cache(workspace_id, ids)))
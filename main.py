@@ -1,28 +1,69 @@
 import argparse
 from utils import get_logger
-from tasks import (
-    create_multiple_profiles,
-    modify_profile_proxies,  # 之前是 modify_proxies
-    run_login_task,         # 之前是 run_login
-    random_fingerprints
-)
+from tasks import CLI_TASKS, load_task
 from config.settings import DEFAULT_WORKSPACE_ID
 
 logger = get_logger(__name__)
 
+def open_journal():
+    """打开任务日志，core 依赖较重，仅在执行批量任务时导入"""
+    from core import JobJournal
+    return JobJournal()
+
+def resume_job(job_id: str) -> int:
+    """按任务日志中保存的参数恢复批量任务，只处理失败或未完成的项"""
+    try:
+        with open_journal() as journal:
+            job = journal.get_job(job_id)
+            logger.info(f"恢复任务 {job_id}: {job['task']}, 进度 {journal.summary(job_id)}")
+            task = load_task(job["task"])
+            result = task(**job["params"], journal=journal, job_id=job_id)
+            summary = journal.summary(job_id)
+    except Exception as e:
+        logger.error(f"恢复任务 {job_id} 时出错: {str(e)}")
+        return 1
+    logger.info(f"任务 {job_id} 结束: {summary}")
+    return 0 if result and summary["failed"] == 0 and summary["pending"] == 0 else 1
+
+def build_proxy_info(args) -> dict:
+    """根据命令行代理参数生成 proxyInfo"""
+    if args.proxy_method in ["custom", "auth"] and not all([args.proxy_host, args.proxy_port]):
+        raise ValueError("自定义代理需要指定主机地址和端口")
+    
+    proxy_info = {
+        "proxyMethod": args.proxy_method or "noproxy"
+    }
+    if args.proxy_method in ["custom", "auth"]:
+        proxy_info.update({
+            "proxyHost": args.proxy_host,
+            "proxyPort": args.proxy_port
+        })
+        if args.proxy_method == "auth":
+            proxy_info.update({
+                "username": args.proxy_username,
+                "password": args.proxy_password
+            })
+    return proxy_info
+
 def main():
     parser = argparse.ArgumentParser(description="RoxyBrowser 自动化工具")
-    parser.add_argument("--task", required=True, choices=[
-        "create", "modify_proxy", "login", "random_fp"
-    ], help="要执行的任务")
+    parser.add_argument("--task", choices=list(CLI_TASKS), help="要执行的任务")
+    parser.add_argument("--resume", metavar="JOB_ID", help="从任务日志恢复中断的批量任务")
     
     # 通用参数
     parser.add_argument("--workspace-id", type=int, default=DEFAULT_WORKSPACE_ID, help="工作区ID")
-    parser.add_argument("--dir-id", help="配置文件ID")
+    parser.add_argument("--dir-id", help="配置文件ID(修改代理、随机指纹、清空缓存时可用逗号分隔多个)")
     
     # 创建配置文件的参数
-    parser.add_argument("--num", type=int, default=1, help="要创建的配置文件数量")
+    parser.add_argument("--num", type=int, help="要创建的配置文件数量(默认1；开通任务给出 --targets 时默认为账号数)")
     parser.add_argument("--base-name", default="AutoProfile", help="配置文件名称前缀")
+    parser.add_argument("--concurrency", type=int, help="批量任务的并发线程数(默认取各任务的默认值)")
+    parser.add_argument("--rate", type=float, default=0, help="每秒最多创建/随机指纹请求数(0为不限速)")
+
+    # 随机指纹/清空缓存/索引查询筛选参数
+    parser.add_argument("--label-id", type=int, help="只处理带有该标签的配置文件")
+    parser.add_argument("--name-prefix", help="只处理窗口名以此开头的配置文件")
+    parser.add_argument("--older-than", type=float, help="只处理超过指定小时数未更新的配置文件")
     
     # 代理设置参数
     parser.add_argument("--proxy-method", choices=["custom", "auth", "noproxy"], help="代理方法")
@@ -30,6 +71,23 @@ def main():
     parser.add_argument("--proxy-port", type=int, help="代理端口")
     parser.add_argument("--proxy-username", help="代理用户名")
     parser.add_argument("--proxy-password", help="代理密码")
+    parser.add_argument("--probe", choices=["tcp", "connect", "socks5"],
+                        help="修改前检测代理可用性(tcp/HTTP CONNECT/SOCKS5 握手)，不可用时不修改")
+    parser.add_argument("--proxy-file", help="代理池文件(每行 host:port[:user:pass] 或 JSON/JSONL/CSV)")
+    parser.add_argument("--policy", choices=["round_robin", "least_used", "sticky_label"],
+                        help="代理池分配策略(默认取配置)")
+    
+    # 开通流水线参数
+    parser.add_argument("--stage-concurrency", default="",
+                        help="开通流水线各阶段并发数，如 create=4,proxy=8,random_fp=8,login=2")
+    parser.add_argument("--skip-random-fp", action="store_true", help="开通时跳过随机指纹阶段")
+    
+    # 清空缓存参数
+    parser.add_argument("--cache", choices=["local", "server", "both"], default="both", help="要清空的缓存")
+    parser.add_argument("--include-open", action="store_true", help="清空缓存时不跳过已打开的配置文件")
+    
+    # 定时任务参数
+    parser.add_argument("--schedule-file", help="定时任务计划文件(JSON)，默认 config/schedule.json")
     
     # 登录任务参数
     parser.add_argument("--url", help="登录页面URL")
@@ -39,25 +97,51 @@ def main():
     parser.add_argument("--password-selector", help="密码输入框的CSS选择器")
     parser.add_argument("--submit-selector", help="提交按钮的CSS选择器")
     parser.add_argument("--success-selector", help="登录成功标志的CSS选择器")
+    parser.add_argument("--backend", choices=["selenium", "cdp"], default="selenium",
+                        help="浏览器自动化后端(cdp 直连 DevTools，不启动 chromedriver)")
+
+    # 批量登录参数
+    parser.add_argument("--targets", help="批量登录/开通任务的账号文件(CSV/JSON/JSONL)，缺少的字段取上面的登录参数")
+    parser.add_argument("--processes", type=int, default=0, help="批量登录的工作进程数(0为CPU核数)")
+    parser.add_argument("--drivers-per-process", type=int, default=4, help="每个工作进程同时运行的浏览器数")
+    parser.add_argument("--max-browsers", type=int, default=0, help="全局同时打开的浏览器上限(0为不额外限制)")
 
     args = parser.parse_args()
+    if not args.task and not args.resume:
+        parser.error("需要指定 --task 或 --resume")
+
+    if args.resume:
+        return resume_job(args.resume)
     
     # 验证工作区ID
     if args.workspace_id <= 0:
         logger.error("工作区ID必须大于0")
         return 1
 
+    # 未指定时不传入，由各任务使用自己的默认并发数
+    if args.concurrency is not None and args.concurrency <= 0:
+        logger.error("并发数必须大于0")
+        return 1
+    concurrency = {"concurrency": args.concurrency} if args.concurrency is not None else {}
+
     try:
         if args.task == "create":
+            if args.num is None:
+                args.num = 1
             if args.num <= 0:
                 raise ValueError("创建数量必须大于0")
             
             logger.info(f"开始创建 {args.num} 个配置文件")
-            created_ids = create_multiple_profiles(
-                args.num,
-                args.workspace_id,
-                args.base_name
-            )
+            create_multiple_profiles = load_task("create")
+            with open_journal() as journal:
+                created_ids = create_multiple_profiles(
+                    args.num,
+                    args.workspace_id,
+                    args.base_name,
+                    rate_limit=args.rate,
+                    **concurrency,
+                    journal=journal
+                )
             if not created_ids:
                 logger.warning("没有成功创建任何配置文件")
                 return 1
@@ -67,32 +151,118 @@ def main():
             if not args.dir_id:
                 raise ValueError("修改代理任务需要指定 --dir-id")
             
-            if args.proxy_method in ["custom", "auth"] and not all([args.proxy_host, args.proxy_port]):
-                raise ValueError("自定义代理需要指定主机地址和端口")
-            
-            proxy_info = {
-                "proxyMethod": args.proxy_method or "noproxy"
-            }
-            if args.proxy_method in ["custom", "auth"]:
-                proxy_info.update({
-                    "proxyHost": args.proxy_host,
-                    "proxyPort": args.proxy_port
-                })
-                if args.proxy_method == "auth":
-                    proxy_info.update({
-                        "username": args.proxy_username,
-                        "password": args.proxy_password
-                    })
+            proxy_info = build_proxy_info(args)
             
-            success = modify_profile_proxies(args.dir_id, proxy_info, args.workspace_id)
+            modify_profile_proxies = load_task("modify_proxy")
+            with open_journal() as journal:
+                success = modify_profile_proxies(
+                    args.dir_id.split(","),
+                    proxy_info,
+                    args.workspace_id,
+                    journal=journal,
+                    probe=bool(args.probe),
+                    probe_check=args.probe,
+                    **concurrency
+                )
             logger.info("代理修改成功" if success else "代理修改失败")
 
+        elif args.task == "assign_proxy":
+            if not args.proxy_file:
+                raise ValueError("代理池分配任务需要指定 --proxy-file")
+
+            assign_pool_proxies = load_task("assign_proxy")
+            kwargs = {"policy": args.policy} if args.policy else {}
+            applied = assign_pool_proxies(
+                args.proxy_file,
+                args.workspace_id,
+                args.dir_id.split(",") if args.dir_id else None,
+                probe=bool(args.probe),
+                probe_check=args.probe,
+                **kwargs,
+                **concurrency
+            )
+            logger.info(f"已为 {len(applied)} 个配置文件分配代理")
+
+        elif args.task == "provision":
+            from config.settings import parse_stage_concurrency
+            kwargs = {}
+            if args.proxy_file:
+                from core import ProxyPool
+                kwargs["proxy_pool"] = ProxyPool.from_file(args.proxy_file, **({"policy": args.policy} if args.policy else {}))
+            elif args.proxy_method:
+                kwargs["proxy_info"] = build_proxy_info(args)
+            if args.targets:
+                from tasks.login_farm import load_targets, TARGET_FIELDS
+                defaults = {
+                    "url": args.url,
+                    "username_selector": args.username_selector,
+                    "password_selector": args.password_selector,
+                    "submit_selector": args.submit_selector,
+                    "success_selector": args.success_selector
+                }
+                kwargs["accounts"] = load_targets(args.targets, defaults, TARGET_FIELDS[1:])
+            num = args.num if args.num is not None else len(kwargs.get("accounts") or [None])
+
+            provision_profiles = load_task("provision")
+            results = provision_profiles(
+                num,
+                args.workspace_id,
+                args.base_name,
+                random_fp=not args.skip_random_fp,
+                concurrency=parse_stage_concurrency(args.stage_concurrency),
+                backend=args.backend,
+                **kwargs
+            )
+            # 结果为空的槽位说明该配置文件未走完流水线，按流水线的命名规则补出名称
+            failed = [
+                result["name"] if result else f"{args.base_name}_{i + 1}"
+                for i, result in enumerate(results) if not result or not result["ok"]
+            ]
+            if failed:
+                logger.warning(f"{len(failed)} 个配置文件开通失败: {failed}")
+                return 1
+
+        elif args.task == "clear_cache":
+            clear_profile_caches = load_task("clear_cache")
+            summary = clear_profile_caches(
+                args.workspace_id,
+                args.dir_id.split(",") if args.dir_id else None,
+                label_id=args.label_id,
+                name_prefix=args.name_prefix,
+                older_than=args.older_than * 3600 if args.older_than else None,
+                local=args.cache in ("local", "both"),
+                server=args.cache in ("server", "both"),
+                skip_open=not args.include_open,
+                **concurrency
+            )
+            if summary["failed"]:
+                logger.warning(f"{len(summary['failed'])} 个配置文件清空缓存失败: {summary['failed']}")
+                return 1
+
+        elif args.task == "index_sync":
+            sync_profile_index = load_task("index_sync")
+            sync_profile_index(args.workspace_id)
+
+        elif args.task == "index_query":
+            query_profile_index = load_task("index_query")
+            query_profile_index(
+                args.workspace_id,
+                label_id=args.label_id,
+                name_prefix=args.name_prefix,
+                older_than=args.older_than * 3600 if args.older_than else None
+            )
+
+        elif args.task == "schedule":
+            run_scheduler = load_task("schedule")
+            run_scheduler(*([args.schedule_file] if args.schedule_file else []))
+
         elif args.task == "login":
             if not all([args.dir_id, args.url, args.username, args.password,
                        args.username_selector, args.password_selector,
                        args.submit_selector, args.success_selector]):
                 raise ValueError("登录任务缺少必要参数")
             
+            run_login_task = load_task("login")
             success = run_login_task(
                 args.dir_id,
                 args.url,
@@ -101,14 +271,50 @@ def main():
                 args.username_selector,
                 args.password_selector,
                 args.submit_selector,
-                args.success_selector
+                args.success_selector,
+                backend=args.backend
             )
             logger.info("登录成功" if success else "登录失败")
 
+        elif args.task == "login_farm":
+            if not args.targets:
+                raise ValueError("批量登录任务需要指定 --targets")
+
+            from tasks.login_farm import load_targets
+            defaults = {
+                "url": args.url,
+                "username_selector": args.username_selector,
+                "password_selector": args.password_selector,
+                "submit_selector": args.submit_selector,
+                "success_selector": args.success_selector
+            }
+            targets = load_targets(args.targets, defaults)
+            run_login_farm = load_task("login_farm")
+            results = run_login_farm(
+                targets,
+                processes=args.processes,
+                drivers_per_process=args.drivers_per_process,
+                max_browsers=args.max_browsers,
+                backend=args.backend
+            )
+            failed = [
+                result["dir_id"] if result else targets[i]["dir_id"]
+                for i, result in enumerate(results) if not result or not result["ok"]
+            ]
+            if failed:
+                logger.warning(f"{len(failed)} 个配置文件登录失败: {failed}")
+                return 1
+
         elif args.task == "random_fp":
+            random_fingerprints = load_task("random_fp")
             success = random_fingerprints(
                 args.workspace_id,
-                [args.dir_id] if args.dir_id else None
+                args.dir_id.split(",") if args.dir_id else None,
+                label_id=args.label_id,
+                name_prefix=args.name_prefix,
+                older_than=args.older_than * 3600 if args.older_than else None,
+                rate_limit=args.rate,
+                **concurrency
             )
             logger.info("随机指纹应用成功" if success else "随机指纹应用失败")
 
@@ -1,11 +1,67 @@
-from .create_profiles import create_multiple_profiles
-from .modify_proxies import modify_profile_proxies
-from .run_login import run_login_task
-from .random_all_fp import random_fingerprints
+import importlib
+from typing import Callable, Dict, Tuple
+
+# 任务注册表: 名称 -> (模块, 函数名)，仅在首次使用时导入对应模块
+_TASK_FUNCTIONS: Dict[str, Tuple[str, str]] = {
+    'create_multiple_profiles': ('.create_profiles', 'create_multiple_profiles'),
+    'modify_profile_proxies': ('.modify_proxies', 'modify_profile_proxies'),
+    'run_login_task': ('.run_login', 'run_login_task'),
+    'random_fingerprints': ('.random_all_fp', 'random_fingerprints'),
+    'run_login_farm': ('.login_farm', 'run_login_farm'),
+    'assign_pool_proxies': ('.proxy_pool', 'assign_pool_proxies'),
+    'provision_profiles': ('.provision', 'provision_profiles'),
+    'run_scheduler': ('.scheduler', 'run_scheduler'),
+    'clear_profile_caches': ('.clear_cache', 'clear_profile_caches'),
+    'sync_profile_index': ('.profile_index', 'sync_profile_index'),
+    'query_profile_index': ('.profile_index', 'query_profile_index')
+}
+
+# 命令行任务名 -> 任务函数名
+CLI_TASKS: Dict[str, str] = {
+    'create': 'create_multiple_profiles',
+    'modify_proxy': 'modify_profile_proxies',
+    'login': 'run_login_task',
+    'random_fp': 'random_fingerprints',
+    'login_farm': 'run_login_farm',
+    'assign_proxy': 'assign_pool_proxies',
+    'provision': 'provision_profiles',
+    'schedule': 'run_scheduler',
+    'clear_cache': 'clear_profile_caches',
+    'index_sync': 'sync_profile_index',
+    'index_query': 'query_profile_index'
+}
+
+
+def load_task(name: str) -> Callable:
+    """按任务函数名或命令行任务名导入并返回任务函数"""
+    name = CLI_TASKS.get(name, name)
+    if name not in _TASK_FUNCTIONS:
+        raise KeyError(f"未注册的任务: {name}")
+    module_name, attr = _TASK_FUNCTIONS[name]
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, attr)
+
+
+def __getattr__(name: str):
+    if name in _TASK_FUNCTIONS:
+        func = load_task(name)
+        globals()[name] = func
+        return func
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'create_multiple_profiles',
     'modify_profile_proxies',
     'run_login_task',
-    'random_fingerprints'
+    'random_fingerprints',
+    'run_login_farm',
+    'assign_pool_proxies',
+    'provision_profiles',
+    'run_scheduler',
+    'clear_profile_caches',
+    'sync_profile_index',
+    'query_profile_index',
+    'CLI_TASKS',
+    'load_task'
 ]
\ No newline at end of file
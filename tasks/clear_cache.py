@@ -0,0 +1,98 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from core import RoxyAPIClient, get_client, call_with_pause
+from config.settings import DEFAULT_WORKSPACE_ID, CACHE_CLEAR_BATCH_SIZE, CACHE_CLEAR_CONCURRENCY
+from .random_all_fp import _select_profiles
+
+
+def _chunks(items: List, batch_size: int) -> List[List]:
+    """按不超过 batch_size 的大小均匀分批，避免最后一批过小"""
+    if not items:
+        return []
+    count = -(-len(items) // batch_size)
+    size = -(-len(items) // count)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def clear_profile_caches(
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    dir_ids: Optional[List[str]] = None,
+    label_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    older_than: Optional[float] = None,
+    local: bool = True,
+    server: bool = True,
+    skip_open: bool = True,
+    batch_size: int = CACHE_CLEAR_BATCH_SIZE,
+    concurrency: int = CACHE_CLEAR_CONCURRENCY,
+    client: Optional[RoxyAPIClient] = None
+) -> Dict:
+    """批量清空配置文件的本地和/或服务器缓存
+
+    未指定 dir_ids 时选取工作区（启用本地索引时从索引查询），按标签、窗口名前缀或距最后更新的
+    秒数筛选，筛选条件不能与 dir_ids 同时使用。dirId 去重后分成大小均匀、不超过 batch_size
+    的批次，本地和服务器清理请求在 concurrency 个线程中并发执行。skip_open 为 True 时用一次
+    get_connection_info 查询所有已打开的窗口并跳过。
+    返回 {"selected", "skipped_open", "cleared", "failed"}，failed 为清理失败的 dirId。
+    """
+    if not local and not server:
+        raise ValueError("至少需要清理本地或服务器缓存之一")
+    if batch_size <= 0 or concurrency <= 0:
+        raise ValueError("批大小和并发数必须大于0")
+    if dir_ids is not None and (label_id is not None or name_prefix or older_than):
+        raise ValueError("指定 dir_ids 时不能同时按标签、名称前缀或更新时间筛选")
+    client = client or get_client()
+    start = time.monotonic()
+
+    if dir_ids is None:
+        cutoff = time.time() - older_than if older_than else None
+        dir_ids = [profile["dirId"] for profile in _select_profiles(client, workspace_id, label_id, name_prefix, cutoff)]
+    selected = list(dict.fromkeys(str(dir_id) for dir_id in dir_ids))
+
+    skipped: List[str] = []
+    if skip_open and selected:
+        response = call_with_pause(client, client.get_connection_info)
+        if not response or response.get("code") != 0:
+            raise RuntimeError(f"获取已打开窗口失败: {response}")
+        opened = {str(dir_id) for dir_id in (response.get("data") or {})}
+        skipped = [dir_id for dir_id in selected if dir_id in opened]
+        selected = [dir_id for dir_id in selected if dir_id not in opened]
+
+    batches = _chunks(selected, batch_size)
+    requests = []
+    for batch in batches:
+        if local:
+            requests.append(("本地", batch, lambda ids: client.clear_local_cache(ids)))
+        if server:
+            requests.append(("服务器", batch, lambda ids: client.clear_server_cache(workspace_id, ids)))
+
+    def execute(request) -> List[str]:
+        kind, batch, func = request
+        try:
+            response = call_with_pause(client, func, batch)
+        except Exception as e:
+            response = str(e)
+        if isinstance(response, dict) and response.get("code") == 0:
+            return []
+        print(f"清空{kind}缓存失败({len(batch)} 个配置文件): {response}")
+        return batch
+
+    failed = set()
+    if requests:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(requests)), thread_name_prefix="clear-cache") as executor:
+            for batch_failed in executor.map(execute, requests):
+                failed.update(batch_failed)
+
+    summary = {
+        "selected": len(selected) + len(skipped),
+        "skipped_open": len(skipped),
+        "cleared": len(selected) - len(failed),
+        "failed": [dir_id for dir_id in selected if dir_id in failed]
+    }
+    print(
+        f"缓存清理完成: 选中 {summary['selected']}, 跳过已打开 {summary['skipped_open']}, "
+        f"成功 {summary['cleared']}, 失败 {len(summary['failed'])}, "
+        f"{len(requests)} 次请求, 耗时 {time.monotonic() - start:.1f}s"
+    )
+    return summary
@@ -1,6 +1,8 @@
-from typing import List, Dict, Optional
-from core import RoxyAPIClient
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from core import RoxyAPIClient, JobJournal, get_client, call_with_pause
 from config.settings import DEFAULT_WORKSPACE_ID
+from utils import TokenBucket
 import random
 
 def create_multiple_profiles(
@@ -8,17 +10,64 @@ def create_multiple_profiles(
     workspace_id: int = DEFAULT_WORKSPACE_ID,
     base_name: str = "AutoProfile",
     proxy_info: Optional[Dict] = None,
-    finger_info: Optional[Dict] = None
+    finger_info: Optional[Dict] = None,
+    concurrency: int = 1,
+    rate_limit: float = 0,
+    client: Optional[RoxyAPIClient] = None,
+    journal: Optional[JobJournal] = None,
+    job_id: Optional[str] = None
 ) -> List[str]:
-    """批量创建配置文件"""
-    client = RoxyAPIClient()
-    created_ids = []
+    """批量创建配置文件
+
+    concurrency 为并发创建的工作线程数，rate_limit 为每秒最多发起的创建请求数
+    （0 表示不限速）。窗口编号与返回的 ID 顺序始终与串行创建一致。
+
+    传入 journal 时每个窗口的结果写入任务日志：发出创建请求前先落盘"已尝试"标记，创建成功后
+    dirId 立即落盘。同时指定 job_id 则恢复该任务：跳过已完成的窗口，按落盘的 dirId 认领中断前
+    已创建但未标记完成的窗口；已尝试但结果未知（中断或请求异常）的窗口只在工作区中恰好有一个
+    同名窗口时按名称认领。从未尝试过的窗口直接创建，不会认领其他任务留下的同名窗口。
+    """
+    if concurrency <= 0:
+        raise ValueError("并发数必须大于0")
+
+    client = client or get_client()
+    bucket = TokenBucket(rate_limit)
 
     default_proxy = proxy_info or {"proxyMethod": "noproxy"}
     default_finger = finger_info or {"randomFingerprint": True}
 
-    for i in range(num_profiles):
-        profile_name = f"{base_name}_{i+1}"
+    indexes = list(range(num_profiles))
+    done: Dict[int, str] = {}
+    if journal is not None:
+        resuming = job_id is not None
+        params = {
+            "num_profiles": num_profiles,
+            "workspace_id": workspace_id,
+            "base_name": base_name,
+            "proxy_info": proxy_info,
+            "finger_info": finger_info,
+            "concurrency": concurrency,
+            "rate_limit": rate_limit
+        }
+        job_id = journal.open_job("create_multiple_profiles", params, map(str, indexes), job_id)
+        print(f"任务ID: {job_id}")
+        done = {int(key): dir_id for key, dir_id in journal.results(job_id).items()}
+        indexes = [int(key) for key in journal.pending(job_id)]
+        if resuming and indexes:
+            pending = set(indexes)
+            marks = {int(key): mark for key, mark in journal.checkpoints(job_id).items() if int(key) in pending}
+            recorded = {i: str(mark["dir_id"]) for i, mark in marks.items() if mark.get("dir_id")}
+            names = {f"{base_name}_{i+1}": i for i, mark in marks.items() if not mark.get("dir_id")}
+            if recorded or names:
+                claimed = {str(dir_id) for dir_id in done.values()}
+                for index, dir_id in _find_existing(client, workspace_id, recorded, names, claimed).items():
+                    journal.record(job_id, str(index), True, dir_id)
+                    done[index] = dir_id
+                indexes = [i for i in indexes if i not in done]
+            print(f"恢复任务 {job_id}: 已完成 {len(done)}，待处理 {len(indexes)}")
+
+    def create_one(index: int) -> Tuple[str, Optional[str], object]:
+        profile_name = f"{base_name}_{index+1}"
         create_data = {
             "workspaceId": workspace_id,
             "windowName": profile_name,
@@ -27,12 +76,84 @@ def create_multiple_profiles(
             "fingerInfo": default_finger
         }
 
-        response = client.create_profile(create_data)
-        if response and response.get("code") == 0:
-            dir_id = response["data"]["dirId"]
-            created_ids.append(dir_id)
-            print(f"成功创建窗口: {profile_name} (ID: {dir_id})")
+        bucket.acquire()
+        if journal is not None:
+            # 请求发出后服务端可能已创建，恢复时只有带此标记的窗口才允许按名称认领
+            journal.checkpoint(job_id, str(index), {"dir_id": None})
+        # 请求异常时服务端是否已创建未知，失败记录中保留"已尝试"标记
+        unknown = None
+        try:
+            response = call_with_pause(client, client.create_profile, create_data)
+        except Exception as e:
+            result = (profile_name, None, str(e))
+            unknown = {"dir_id": None}
+        else:
+            if response and response.get("code") == 0:
+                result = (profile_name, response["data"]["dirId"], response)
+                if journal is not None:
+                    # 完成状态按批落盘，dirId 先立即保存，中断后恢复时据此认领
+                    journal.checkpoint(job_id, str(index), {"dir_id": result[1]})
+            else:
+                result = (profile_name, None, response)
+
+        if journal is not None:
+            dir_id = result[1]
+            if dir_id is not None:
+                journal.record(job_id, str(index), True, dir_id)
+            else:
+                journal.record(job_id, str(index), False, unknown, str(result[2]))
+        return result
+
+    try:
+        if concurrency == 1:
+            results = [create_one(i) for i in indexes]
         else:
-            print(f"创建窗口 {profile_name} 失败: {response}")
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(create_one, indexes))
+    finally:
+        # 中断时也要把缓冲中的结果落盘
+        if journal is not None:
+            journal.flush()
+
+    for index, (_, dir_id, _) in zip(indexes, results):
+        if dir_id is not None:
+            done[index] = dir_id
+    created_ids = [done[i] for i in range(num_profiles) if i in done]
+    failed = [(name, detail) for name, dir_id, detail in results if dir_id is None]
+
+    print(f"批量创建完成: 成功 {len(created_ids)}/{num_profiles}, 失败 {len(failed)}")
+    for name, detail in failed:
+        print(f"创建窗口 {name} 失败: {detail}")
+
+    return created_ids
+
+
+def _find_existing(
+    client: RoxyAPIClient,
+    workspace_id: int,
+    recorded: Dict[int, str],
+    names: Dict[str, int],
+    claimed: set
+) -> Dict[int, str]:
+    """查找中断前已创建的配置文件，返回 序号 -> dirId
+
+    recorded 中的 dirId 仍存在即认领；names 为已尝试但结果未知的窗口，其窗口名只有恰好对应
+    一个未被认领的配置文件时才认领，同名窗口有多个时无法判断归属，交由重新创建。
+    """
+    existing = set()
+    by_name: Dict[str, List[str]] = {}
+    for profile in client.iter_profiles(workspace_id):
+        dir_id = str(profile["dirId"])
+        existing.add(dir_id)
+        if profile.get("windowName") in names:
+            by_name.setdefault(profile["windowName"], []).append(dir_id)
 
-    return created_ids
\ No newline at end of file
+    found = {index: dir_id for index, dir_id in recorded.items() if dir_id in existing}
+    claimed = claimed | set(found.values())
+    for name, index in names.items():
+        candidates = by_name.get(name, [])
+        if len(candidates) == 1 and candidates[0] not in claimed:
+            found[index] = candidates[0]
+        elif len(candidates) > 1:
+            print(f"工作区中有 {len(candidates)} 个名为 {name} 的窗口，无法确定归属，将重新创建")
+    return found
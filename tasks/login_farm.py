@@ -0,0 +1,210 @@
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from config.settings import (
+    LOGIN_FARM_PROCESSES,
+    LOGIN_FARM_DRIVERS_PER_PROCESS,
+    LOGIN_FARM_MAX_BROWSERS
+)
+
+# 目标文件中每一行需要提供（或由默认值补齐）的字段
+TARGET_FIELDS = (
+    "dir_id",
+    "url",
+    "username",
+    "password",
+    "username_selector",
+    "password_selector",
+    "submit_selector",
+    "success_selector"
+)
+
+
+def load_targets(path: str, defaults: Optional[Dict] = None, fields: Tuple[str, ...] = TARGET_FIELDS) -> List[Dict]:
+    """读取登录目标文件
+
+    支持带表头的 CSV、JSON 数组和每行一个对象的 JSONL。缺少的字段使用 defaults
+    补齐（例如所有账号登录同一站点时只在命令行给出 url 和选择器）。fields 为需要的字段，
+    开通流水线读取账号时配置文件尚未创建，不需要 dir_id。
+    """
+    defaults = {k: v for k, v in (defaults or {}).items() if v is not None}
+    with open(path, encoding="utf-8-sig") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        elif path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = json.load(f)
+
+    targets = []
+    for line_no, row in enumerate(rows, 1):
+        target = dict(defaults)
+        target.update({k: v for k, v in row.items() if k in fields and v not in (None, "")})
+        missing = [field for field in fields if not target.get(field)]
+        if missing:
+            raise ValueError(f"{path} 第 {line_no} 条缺少字段: {', '.join(missing)}")
+        targets.append(target)
+    return targets
+
+
+def _login(target: Dict, backend: str, client) -> bool:
+    """执行单个登录，失败时抛出异常，由工作进程把原因写入结果的 error 字段"""
+    from tasks.run_login import run_login_task
+    return run_login_task(**target, client=client, backend=backend, raise_on_error=True)
+
+
+def _worker_main(
+    tasks: "multiprocessing.Queue",
+    results: "multiprocessing.Queue",
+    browsers: "multiprocessing.Semaphore",
+    drivers: int,
+    backend: str,
+    base_url: Optional[str],
+    token: Optional[str],
+    login_func: Callable
+) -> None:
+    """工作进程：drivers 个线程从共享队列取目标，打开浏览器前先获取全局名额
+
+    未指定 base_url 时使用默认配置，配置了多个节点时按配置文件归属路由。
+    """
+    from core import get_client
+    client = get_client(base_url, token)
+    pid = os.getpid()
+
+    def loop() -> None:
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            index, target = item
+            start = time.monotonic()
+            error = None
+            with browsers:
+                try:
+                    ok = bool(login_func(target, backend, client))
+                except Exception as e:
+                    ok = False
+                    error = str(e)
+            results.put({
+                "index": index,
+                "dir_id": target["dir_id"],
+                "ok": ok,
+                "error": error,
+                "elapsed": round(time.monotonic() - start, 3),
+                "worker": pid
+            })
+
+    threads = [threading.Thread(target=loop, name=f"login-{i}") for i in range(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def iter_login_farm(
+    targets: List[Dict],
+    processes: int = LOGIN_FARM_PROCESSES,
+    drivers_per_process: int = LOGIN_FARM_DRIVERS_PER_PROCESS,
+    max_browsers: int = LOGIN_FARM_MAX_BROWSERS,
+    backend: str = "selenium",
+    base_url: Optional[str] = None,
+    token: Optional[str] = None,
+    login_func: Callable = _login
+) -> Iterator[Dict]:
+    """在多进程中并行登录，按完成顺序逐条产出结果
+
+    processes 为 0 时按 CPU 核数启动工作进程，每个进程运行 drivers_per_process 个浏览器
+    线程；所有进程共享一个信号量，同时打开的浏览器不超过 max_browsers。目标放在共享队列中
+    由空闲线程领取，各进程负载自动均衡。工作进程异常退出时，未完成的目标产出失败结果。
+    """
+    if drivers_per_process <= 0:
+        raise ValueError("每个进程的浏览器数必须大于0")
+    if not targets:
+        return
+    processes = processes or os.cpu_count() or 1
+    # 进程数不超过需要的数量，避免空转
+    processes = max(1, min(processes, -(-len(targets) // drivers_per_process)))
+    max_browsers = max_browsers or processes * drivers_per_process
+
+    # spawn 避免在已有线程的父进程中 fork
+    ctx = multiprocessing.get_context("spawn")
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    browsers = ctx.BoundedSemaphore(max_browsers)
+
+    for item in enumerate(targets):
+        task_queue.put(item)
+    for _ in range(processes * drivers_per_process):
+        task_queue.put(None)
+
+    workers = [
+        ctx.Process(
+            target=_worker_main,
+            args=(task_queue, result_queue, browsers, drivers_per_process, backend, base_url, token, login_func),
+            daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    remaining = set(range(len(targets)))
+    try:
+        while remaining:
+            try:
+                result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+            remaining.discard(result["index"])
+            yield result
+
+        for index in sorted(remaining):
+            yield {
+                "index": index,
+                "dir_id": targets[index]["dir_id"],
+                "ok": False,
+                "error": "工作进程异常退出",
+                "elapsed": 0.0,
+                "worker": None
+            }
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+
+def run_login_farm(
+    targets: List[Dict],
+    processes: int = LOGIN_FARM_PROCESSES,
+    drivers_per_process: int = LOGIN_FARM_DRIVERS_PER_PROCESS,
+    max_browsers: int = LOGIN_FARM_MAX_BROWSERS,
+    backend: str = "selenium",
+    on_result: Optional[Callable[[Dict], None]] = None,
+    **kwargs
+) -> List[Dict]:
+    """批量登录并汇总结果，返回按目标顺序排列的结果列表
+
+    每条结果完成时立即打印并回调 on_result。
+    """
+    start = time.monotonic()
+    results: List[Optional[Dict]] = [None] * len(targets)
+    for result in iter_login_farm(targets, processes, drivers_per_process, max_browsers, backend, **kwargs):
+        results[result["index"]] = result
+        status = "成功" if result["ok"] else f"失败 {result['error'] or ''}".rstrip()
+        print(f"[{result['worker']}] 配置文件 {result['dir_id']} 登录{status} ({result['elapsed']}s)")
+        if on_result is not None:
+            on_result(result)
+
+    elapsed = time.monotonic() - start
+    succeeded = sum(1 for result in results if result and result["ok"])
+    rate = len(targets) / elapsed * 3600 if elapsed else 0.0
+    print(f"批量登录完成: 成功 {succeeded}/{len(targets)}, 耗时 {elapsed:.1f}s, 约 {rate:.0f} 个/小时")
+    return results
@@ -1,31 +1,74 @@
-from typing import Union, List, Dict
-from core import RoxyAPIClient
+from typing import Union, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from core import RoxyAPIClient, JobJournal, get_client, call_with_pause
 from config.settings import DEFAULT_WORKSPACE_ID
+from utils import probe_proxy
 
 def modify_profile_proxies(
     dir_ids: Union[str, List[str]],
     proxy_info: Dict,
-    workspace_id: int = DEFAULT_WORKSPACE_ID
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    client: Optional[RoxyAPIClient] = None,
+    journal: Optional[JobJournal] = None,
+    job_id: Optional[str] = None,
+    concurrency: int = 1,
+    probe: bool = False,
+    probe_check: Optional[str] = None
 ) -> bool:
-    """修改指定配置文件的代理设置"""
-    client = RoxyAPIClient()
-    
+    """修改指定配置文件的代理设置
+
+    concurrency 为并发修改的工作线程数，使用多节点客户端时请求按归属分散到各节点并行执行。
+    传入 journal 时每个配置文件的结果写入任务日志；同时指定 job_id 则恢复该任务，
+    只重试失败或中断时未完成的配置文件。
+    probe 为 True 时先检测代理（probe_check 见 utils.probe_proxy），不可用则不做任何修改。
+    """
+    if concurrency <= 0:
+        raise ValueError("并发数必须大于0")
+
+    if probe:
+        result = probe_proxy(proxy_info, probe_check)
+        if not result["alive"]:
+            print(f"代理 {proxy_info.get('proxyHost')}:{proxy_info.get('proxyPort')} 不可用，未修改: {result['error']}")
+            return False
+
+    client = client or get_client()
+
     if isinstance(dir_ids, str):
         dir_ids = [dir_ids]
 
-    success_count = 0
-    for dir_id in dir_ids:
+    if journal is not None:
+        params = {"dir_ids": dir_ids, "proxy_info": proxy_info, "workspace_id": workspace_id, "concurrency": concurrency}
+        job_id = journal.open_job("modify_profile_proxies", params, dir_ids, job_id)
+        print(f"任务ID: {job_id}")
+        dir_ids = journal.pending(job_id)
+
+    def modify_one(dir_id: str) -> bool:
         modify_data = {
             "workspaceId": workspace_id,
             "dirId": dir_id,
             "proxyInfo": proxy_info
         }
-        
-        response = client.modify_profile(modify_data)
-        if response and response.get("code") == 0:
-            success_count += 1
+
+        response = call_with_pause(client, client.modify_profile, modify_data)
+        ok = bool(response and response.get("code") == 0)
+        if ok:
             print(f"成功修改配置文件 {dir_id} 的代理设置")
         else:
             print(f"修改配置文件 {dir_id} 的代理设置失败: {response}")
+        if journal is not None:
+            journal.record(job_id, dir_id, ok, error=None if ok else str(response))
+        return ok
+
+    try:
+        if concurrency == 1:
+            results = [modify_one(dir_id) for dir_id in dir_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(modify_one, dir_ids))
+    finally:
+        # 中断时也要把缓冲中的结果落盘
+        if journal is not None:
+            journal.flush()
+
+    return all(results)
 
-    return success_count == len(dir_ids)
\ No newline at end of file
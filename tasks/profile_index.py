@@ -0,0 +1,56 @@
+import time
+from typing import Dict, List, Optional
+from core import RoxyAPIClient, ProfileIndex, get_client
+from config.settings import DEFAULT_WORKSPACE_ID, PROFILE_INDEX_ENABLED
+from .random_all_fp import _select_profiles
+
+
+def sync_profile_index(
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    client: Optional[RoxyAPIClient] = None,
+    max_age: Optional[float] = None
+) -> Dict:
+    """把工作区增量同步到本地索引
+
+    客户端未配置索引（未启用 PROFILE_INDEX_ENABLED）时写入默认路径的索引文件，
+    启用后批量任务即可直接从该索引选取目标。
+    """
+    client = client or get_client()
+    index = getattr(client, "profile_index", None)
+    owned = not isinstance(index, ProfileIndex)
+    if owned:
+        index = ProfileIndex()
+    try:
+        start = time.monotonic()
+        result = index.sync(client, workspace_id, max_age)
+    finally:
+        if owned:
+            index.close()
+    print(
+        f"工作区 {workspace_id} 索引同步完成: 新增 {result['added']}, 更新 {result['updated']}, "
+        f"删除 {result['removed']}, 共 {result['total']}, 耗时 {time.monotonic() - start:.1f}s"
+    )
+    if not PROFILE_INDEX_ENABLED:
+        print("提示: 设置 ROXY_PROFILE_INDEX_ENABLED=true 后批量任务才会使用本地索引")
+    return result
+
+
+def query_profile_index(
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    label_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    older_than: Optional[float] = None,
+    client: Optional[RoxyAPIClient] = None
+) -> List[str]:
+    """按标签、窗口名前缀或距最后更新的秒数查询配置文件，返回 dirId 列表
+
+    与批量任务使用相同的选取逻辑：启用索引时查询索引，否则遍历工作区。
+    """
+    client = client or get_client()
+    start = time.monotonic()
+    cutoff = time.time() - older_than if older_than else None
+    dir_ids = [str(profile["dirId"]) for profile in _select_profiles(client, workspace_id, label_id, name_prefix, cutoff)]
+    print(f"共 {len(dir_ids)} 个配置文件，耗时 {(time.monotonic() - start) * 1000:.0f}ms")
+    for dir_id in dir_ids:
+        print(dir_id)
+    return dir_ids
@@ -0,0 +1,114 @@
+import random
+import time
+from typing import Dict, List, Optional
+from core import RoxyAPIClient, ProxyPool, Pipeline, Stage, get_client, call_with_pause
+from config.settings import DEFAULT_WORKSPACE_ID, PIPELINE_QUEUE_SIZE, PROVISION_CONCURRENCY
+
+STAGES = ("create", "proxy", "random_fp", "login")
+
+# 创建失败重试可能产生重复窗口，默认不重试；修改类请求幂等，可以重试
+DEFAULT_RETRIES = {"create": 0, "proxy": 2, "random_fp": 2, "login": 0}
+
+
+def _checked(response: Dict, action: str) -> Dict:
+    if not response or response.get("code") != 0:
+        raise RuntimeError(f"{action}失败: {response}")
+    return response
+
+
+def provision_profiles(
+    num_profiles: int,
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    base_name: str = "AutoProfile",
+    proxy_info: Optional[Dict] = None,
+    proxy_pool: Optional[ProxyPool] = None,
+    random_fp: bool = True,
+    accounts: Optional[List[Dict]] = None,
+    concurrency: Optional[Dict[str, int]] = None,
+    retries: Optional[Dict[str, int]] = None,
+    backend: str = "selenium",
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    client: Optional[RoxyAPIClient] = None
+) -> List[Dict]:
+    """按流水线批量开通配置文件：创建 → 设置代理 → 随机指纹 → 登录
+
+    每个配置文件完成一个阶段后立即进入下一阶段，各阶段并行处理不同的配置文件。
+    代理阶段在给出 proxy_pool（按池的策略分配）或 proxy_info（所有配置文件相同）时执行，
+    登录阶段在给出 accounts 时执行，第 i 个配置文件使用 accounts[i]（字段同 run_login_task，
+    不含 dir_id）。concurrency / retries 按阶段名覆盖默认值。某阶段失败的配置文件不再进入
+    后续阶段。返回按编号排列的结果，含 dir_id、ok、failed_stage、errors、timings。
+    """
+    if num_profiles <= 0:
+        raise ValueError("创建数量必须大于0")
+    if accounts is not None and len(accounts) < num_profiles:
+        raise ValueError(f"账号数量 {len(accounts)} 少于配置文件数量 {num_profiles}")
+    unknown = set(concurrency or {}) | set(retries or {}) | set(PROVISION_CONCURRENCY)
+    unknown -= set(STAGES)
+    if unknown:
+        raise ValueError(f"未知的阶段: {', '.join(sorted(unknown))}")
+    client = client or get_client()
+    concurrency = {**{name: 1 for name in STAGES}, **PROVISION_CONCURRENCY, **(concurrency or {})}
+    retries = dict(DEFAULT_RETRIES, **(retries or {}))
+
+    def create(item: Dict) -> Dict:
+        data = {
+            "workspaceId": workspace_id,
+            "windowName": item["name"],
+            "os": random.choice(["Windows", "macOS"]),
+            "proxyInfo": {"proxyMethod": "noproxy"},
+            "fingerInfo": {"randomFingerprint": True}
+        }
+        response = _checked(call_with_pause(client, client.create_profile, data), "创建配置文件")
+        return {"dir_id": response["data"]["dirId"]}
+
+    def set_proxy(item: Dict) -> Dict:
+        proxy = proxy_pool.assign([item["dir_id"]])[item["dir_id"]] if proxy_pool is not None else proxy_info
+        data = {"workspaceId": workspace_id, "dirId": item["dir_id"], "proxyInfo": proxy}
+        try:
+            _checked(call_with_pause(client, client.modify_profile, data), "设置代理")
+        except Exception:
+            if proxy_pool is not None:
+                # 接口拒绝修改不说明代理不可用，不计失败分数，只释放分配以免占用名额
+                proxy_pool.release([item["dir_id"]])
+            raise
+        return {"proxy": proxy}
+
+    def refresh_fingerprint(item: Dict) -> Dict:
+        _checked(call_with_pause(client, client.random_fingerprint, workspace_id, item["dir_id"]), "随机指纹")
+        return item
+
+    def login(item: Dict) -> bool:
+        from tasks.run_login import run_login_task
+        return run_login_task(item["dir_id"], **accounts[item["index"]], client=client, backend=backend)
+
+    funcs = {"create": create, "proxy": set_proxy, "random_fp": refresh_fingerprint, "login": login}
+    enabled = {
+        "create": True,
+        "proxy": proxy_pool is not None or proxy_info is not None,
+        "random_fp": random_fp,
+        "login": accounts is not None
+    }
+    stages = [
+        Stage(name, funcs[name], concurrency[name], retries[name])
+        for name in STAGES if enabled[name]
+    ]
+    print(f"开通流水线: {' → '.join(f'{s.name}×{s.concurrency}' for s in stages)}")
+
+    start = time.monotonic()
+    items = ({"index": i, "name": f"{base_name}_{i + 1}", "dir_id": None} for i in range(num_profiles))
+    results: List[Optional[Dict]] = [None] * num_profiles
+    for result in Pipeline(stages, queue_size).run(items):
+        results[result["index"]] = result
+        if result["ok"]:
+            print(f"配置文件 {result['name']} ({result['dir_id']}) 开通完成")
+        else:
+            print(f"配置文件 {result['name']} 在阶段 {result['failed_stage']} 失败: {result['errors']}")
+
+    elapsed = time.monotonic() - start
+    succeeded = sum(1 for result in results if result and result["ok"])
+    print(f"开通完成: 成功 {succeeded}/{num_profiles}, 耗时 {elapsed:.1f}s")
+    for stage in stages:
+        timings = [r["timings"][stage.name] for r in results if r and stage.name in r["timings"]]
+        if timings:
+            print(f"  {stage.name}: 平均 {sum(timings) / len(timings):.2f}s × {len(timings)}")
+    return results
@@ -0,0 +1,50 @@
+from typing import Dict, List, Optional
+from core import RoxyAPIClient, ProxyPool, get_client
+from core.proxy_pool import proxy_key
+from config.settings import DEFAULT_WORKSPACE_ID, PROXY_POOL_POLICY
+from .random_all_fp import _select_profiles
+
+
+def assign_pool_proxies(
+    proxy_file: str,
+    workspace_id: int = DEFAULT_WORKSPACE_ID,
+    dir_ids: Optional[List[str]] = None,
+    policy: str = PROXY_POOL_POLICY,
+    concurrency: int = 8,
+    probe: bool = False,
+    probe_check: Optional[str] = None,
+    client: Optional[RoxyAPIClient] = None,
+    pool: Optional[ProxyPool] = None
+) -> Dict[str, Dict]:
+    """从代理文件建立代理池，为工作区内的配置文件分配代理
+
+    先按配置文件当前的 proxyInfo 接管已有分配，只修改尚未使用池中代理、或所用代理已停用
+    的配置文件。probe 为 True 时先检测全部代理并停用不可用的。dir_ids 为 None 时处理
+    整个工作区。返回成功修改的 dirId -> proxyInfo。
+    """
+    client = client or get_client()
+    pool = pool or ProxyPool.from_file(proxy_file, policy=policy)
+    print(f"代理池: {len(pool)} 个代理, 策略 {pool.policy}")
+
+    if probe:
+        result = pool.check(probe_check)
+        print(f"代理检测: 可用 {result['alive']}, 不可用 {result['dead']}")
+
+    profiles = list(_select_profiles(client, workspace_id))
+    if dir_ids is not None:
+        wanted = {str(dir_id) for dir_id in dir_ids}
+        profiles = [profile for profile in profiles if str(profile["dirId"]) in wanted]
+        missing = wanted - {str(profile["dirId"]) for profile in profiles}
+        if missing:
+            print(f"工作区中不存在的配置文件: {sorted(missing)}")
+
+    before = {str(profile["dirId"]): proxy_key(profile.get("proxyInfo") or {}) for profile in profiles}
+    pool.adopt(profiles)
+    assignments = pool.assign(profiles)
+    changed = {dir_id: proxy for dir_id, proxy in assignments.items() if before.get(dir_id) != proxy_key(proxy)}
+    print(f"共 {len(assignments)} 个配置文件，需要修改 {len(changed)} 个")
+
+    current = {str(profile["dirId"]): profile.get("proxyInfo") for profile in profiles}
+    applied = pool.apply(client, workspace_id, changed, concurrency, previous=current)
+    print(f"代理分配完成: 成功 {len(applied)}/{len(changed)}")
+    return applied
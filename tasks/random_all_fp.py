@@ -1,35 +1,164 @@
-from typing import List, Optional
-from core import RoxyAPIClient
-from config.settings import DEFAULT_WORKSPACE_ID
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from core import RoxyAPIClient, ProfileIndex, get_client, call_with_pause
+from config.settings import (
+    DEFAULT_WORKSPACE_ID,
+    FP_REFRESH_CONCURRENCY,
+    FP_REFRESH_PROGRESS_INTERVAL,
+    PROFILE_INDEX_MAX_AGE
+)
+from utils import TokenBucket
+
+
+def _timestamp(value) -> Optional[float]:
+    """把接口返回的时间（秒/毫秒时间戳或 "YYYY-mm-dd HH:MM:SS"）转换为秒级时间戳"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    try:
+        return _timestamp(float(value))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+
+def _matches(profile: Dict, label_id: Optional[int], name_prefix: Optional[str], cutoff: Optional[float]) -> bool:
+    if label_id is not None and label_id not in (profile.get("labelIds") or ()):
+        return False
+    if name_prefix and not str(profile.get("windowName") or "").startswith(name_prefix):
+        return False
+    if cutoff is not None:
+        # 接口没有单独的指纹刷新时间，以配置文件最后更新时间为准；无法判断时不跳过
+        updated = _timestamp(profile.get("updateTime") or profile.get("createTime"))
+        if updated is not None and updated > cutoff:
+            return False
+    return True
+
+
+def _select_profiles(
+    client: RoxyAPIClient,
+    workspace_id: int,
+    label_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    cutoff: Optional[float] = None,
+    max_age: Optional[float] = PROFILE_INDEX_MAX_AGE
+) -> Iterable[Dict]:
+    """选出工作区内符合条件的配置文件
+
+    客户端配置了本地索引时先增量同步（max_age 秒内同步过则跳过，None 为总是同步），再按标签和
+    名称前缀查询索引，不再分页遍历整个工作区；否则遍历 iter_profiles 逐条筛选。
+    """
+    index = getattr(client, "profile_index", None)
+    if not isinstance(index, ProfileIndex):
+        return (profile for profile in client.iter_profiles(workspace_id) if _matches(profile, label_id, name_prefix, cutoff))
+    index.sync(client, workspace_id, max_age)
+    return [
+        profile for profile in index.query(workspace_id, name_prefix=name_prefix, label_id=label_id)
+        if _matches(profile, label_id, name_prefix, cutoff)
+    ]
+
+
+class _Progress:
+    """统计完成数，每隔 interval 秒打印一次进度和速率"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.done = 0
+        self.succeeded = 0
+        self.start = time.monotonic()
+        self._last = self.start
+        self._lock = threading.Lock()
+
+    def add(self, ok: bool) -> None:
+        with self._lock:
+            self.done += 1
+            self.succeeded += ok
+            now = time.monotonic()
+            if self.interval and now - self._last >= self.interval:
+                self._last = now
+                print(f"随机指纹进度: 已处理 {self.done}, 成功 {self.succeeded}, {self.rate():.1f} 个/秒")
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.start
+        return self.done / elapsed if elapsed else 0.0
+
 
 def random_fingerprints(
     workspace_id: int = DEFAULT_WORKSPACE_ID,
-    dir_ids: Optional[List[str]] = None
+    dir_ids: Optional[List[str]] = None,
+    client: Optional[RoxyAPIClient] = None,
+    concurrency: int = FP_REFRESH_CONCURRENCY,
+    label_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    older_than: Optional[float] = None,
+    rate_limit: float = 0,
+    progress_interval: float = FP_REFRESH_PROGRESS_INTERVAL
 ) -> bool:
-    """为所有或指定的配置文件应用随机指纹"""
-    client = RoxyAPIClient()
-    
+    """为所有或指定的配置文件应用随机指纹
+
+    未指定 dir_ids 时选取整个工作区（启用本地索引时从索引查询，否则分页遍历），可按标签、
+    窗口名前缀或距最后更新的秒数（older_than）筛选；筛选条件不能与 dir_ids 同时使用。请求由 concurrency 个线程并发发出，
+    在途请求数有上限，rate_limit 为每秒最多请求数（0 表示不限速）。每隔 progress_interval
+    秒打印进度和速率。
+    """
+    if concurrency <= 0:
+        raise ValueError("并发数必须大于0")
+    if dir_ids is not None and (label_id is not None or name_prefix or older_than):
+        raise ValueError("指定 dir_ids 时不能同时按标签、名称前缀或更新时间筛选")
+    client = client or get_client()
+    bucket = TokenBucket(rate_limit)
+    progress = _Progress(progress_interval)
+
+    def refresh(dir_id: str) -> bool:
+        bucket.acquire()
+        try:
+            response = call_with_pause(client, client.random_fingerprint, workspace_id, dir_id)
+        except Exception as e:
+            response = str(e)
+        ok = bool(isinstance(response, dict) and response.get("code") == 0)
+        if not ok:
+            print(f"为配置文件 {dir_id} 应用随机指纹失败: {response}")
+        progress.add(ok)
+        return ok
+
     try:
         if dir_ids is None:
-            # 如果没有指定配置文件，获取工作区所有配置文件
-            response = client.list_profiles(workspace_id)
-            if response.get("code") != 0:
-                print(f"获取配置文件列表失败: {response}")
-                return False
-            
-            dir_ids = [profile["dirId"] for profile in response["data"]["list"]]
-
-        success_count = 0
-        for dir_id in dir_ids:
-            response = client.random_fingerprint(workspace_id, dir_id)
-            if response and response.get("code") == 0:
-                success_count += 1
-                print(f"成功为配置文件 {dir_id} 应用随机指纹")
-            else:
-                print(f"为配置文件 {dir_id} 应用随机指纹失败: {response}")
-
-        return success_count == len(dir_ids)
+            cutoff = time.time() - older_than if older_than else None
+            dir_ids = (profile["dirId"] for profile in _select_profiles(client, workspace_id, label_id, name_prefix, cutoff))
+
+        if concurrency == 1:
+            for dir_id in dir_ids:
+                refresh(dir_id)
+        else:
+            _run_bounded(refresh, dir_ids, concurrency)
 
     except Exception as e:
         print(f"随机指纹过程出错: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+    print(
+        f"随机指纹完成: 成功 {progress.succeeded}/{progress.done}, "
+        f"耗时 {time.monotonic() - progress.start:.1f}s, {progress.rate():.1f} 个/秒"
+    )
+    return progress.succeeded == progress.done
+
+
+def _run_bounded(func, items: Iterable, concurrency: int) -> None:
+    """边遍历边提交，在途任务不超过 concurrency 的两倍，避免一次性展开整个工作区"""
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="random-fp") as executor:
+        pending = set()
+        for item in items:
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(func, item))
+        for future in wait(pending)[0]:
+            future.result()
@@ -1,13 +1,14 @@
-from typing import Union
-from core import RoxyAPIClient
+from typing import Union, Optional
+from core import RoxyAPIClient, BrowserSessionPool, get_client
+from core.cdp_driver import CDPDriver
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-def run_login_task(
-    dir_id: Union[str, int],
+def _perform_login(
+    driver,
     url: str,
     username: str,
     password: str,
@@ -15,58 +16,134 @@ def run_login_task(
     password_selector: str,
     submit_selector: str,
     success_selector: str
-) -> bool:
-    """使用指定配置文件登录特定网站"""
-    client = RoxyAPIClient()
-    
+) -> None:
+    """在已附加的浏览器中执行登录流程，失败时抛出异常"""
+    wait = WebDriverWait(driver, 20)
+
+    driver.get(url)
+
+    username_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, username_selector)))
+    username_input.send_keys(username)
+
+    password_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, password_selector)))
+    password_input.send_keys(password)
+
+    submit_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, submit_selector)))
+    submit_button.click()
+
+    # 等待登录成功标志
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, success_selector)))
+
+def _perform_login_cdp(
+    driver: CDPDriver,
+    url: str,
+    username: str,
+    password: str,
+    username_selector: str,
+    password_selector: str,
+    submit_selector: str,
+    success_selector: str
+) -> None:
+    """通过 CDP 直连执行登录流程，失败时抛出异常"""
+    timeout = 20
+
+    driver.navigate(url, timeout)
+    driver.type(username_selector, username, timeout)
+    driver.type(password_selector, password, timeout)
+    driver.click(submit_selector, timeout)
+
+    # 等待登录成功标志
+    driver.wait_for_selector(success_selector, timeout)
+
+def _login_with_profile(
+    dir_id: Union[str, int],
+    login_args: tuple,
+    client: RoxyAPIClient,
+    backend: str
+) -> None:
+    """打开配置文件并执行登录，结束后退出 driver 并关闭窗口，失败时抛出异常"""
+    driver = None
+
     try:
         # 打开浏览器配置文件
         response = client.open_profile(dir_id)
         if response.get("code") != 0:
-            print(f"打开配置文件失败: {response}")
-            return False
+            raise RuntimeError(f"打开配置文件失败: {response}")
 
         # 获取连接信息
         conn_info = client.get_connection_info([dir_id])
         if conn_info.get("code") != 0:
-            print(f"获取连接信息失败: {conn_info}")
-            return False
+            raise RuntimeError(f"获取连接信息失败: {conn_info}")
 
         profile_info = conn_info["data"][str(dir_id)]
         debugger_address = f"{profile_info['http']}"
 
+        if backend == "cdp":
+            driver = CDPDriver.connect(profile_info.get("ws") or debugger_address)
+            _perform_login_cdp(driver, *login_args)
+            return
+
         # 配置 Chrome 选项
         chrome_options = webdriver.ChromeOptions()
         chrome_options.debugger_address = debugger_address
 
         # 创建 driver
         driver = webdriver.Chrome(options=chrome_options)
-        wait = WebDriverWait(driver, 20)
 
         # 执行登录流程
-        driver.get(url)
-        
-        username_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, username_selector)))
-        username_input.send_keys(username)
-        
-        password_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, password_selector)))
-        password_input.send_keys(password)
-        
-        submit_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, submit_selector)))
-        submit_button.click()
-        
-        # 等待登录成功标志
-        success_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, success_selector)))
-        
-        print(f"配置文件 {dir_id} 成功登录到 {url}")
-        return True
-
-    except Exception as e:
-        print(f"登录过程出错: {str(e)}")
-        return False
+        _perform_login(driver, *login_args)
 
     finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
         try:
             client.close_profile(dir_id)
         except:
-            pass
\ No newline at end of file
+            pass
+
+def run_login_task(
+    dir_id: Union[str, int],
+    url: str,
+    username: str,
+    password: str,
+    username_selector: str,
+    password_selector: str,
+    submit_selector: str,
+    success_selector: str,
+    client: Optional[RoxyAPIClient] = None,
+    pool: Optional[BrowserSessionPool] = None,
+    backend: str = "selenium",
+    raise_on_error: bool = False
+) -> bool:
+    """使用指定配置文件登录特定网站
+
+    backend 为 "selenium" 时通过 chromedriver 附加浏览器，为 "cdp" 时直接连接
+    DevTools WebSocket。传入 pool 时从会话池租借已打开的窗口，结束后归还而不关闭，
+    此时使用的后端由会话池的 driver_factory 决定。raise_on_error 为 True 时登录失败
+    抛出异常而不是返回 False，便于调用方记录失败原因。
+    """
+    if backend not in ("selenium", "cdp"):
+        raise ValueError(f"不支持的自动化后端: {backend}")
+
+    login_args = (url, username, password, username_selector, password_selector, submit_selector, success_selector)
+
+    try:
+        if pool is not None:
+            with pool.lease(dir_id) as session:
+                if isinstance(session.driver, CDPDriver):
+                    _perform_login_cdp(session.driver, *login_args)
+                else:
+                    _perform_login(session.driver, *login_args)
+        else:
+            _login_with_profile(dir_id, login_args, client or get_client(), backend)
+    except Exception as e:
+        if raise_on_error:
+            raise
+        print(f"登录过程出错: {str(e)}")
+        return False
+
+    print(f"配置文件 {dir_id} 成功登录到 {url}")
+    return True
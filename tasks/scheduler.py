@@ -0,0 +1,170 @@
+import json
+import signal
+import threading
+import time
+from functools import partial
+from typing import Dict, List, Optional
+from core import RoxyAPIClient, CronSchedule, IntervalSchedule, Job, Scheduler, get_client, call_with_pause
+from core.scheduler import parse_interval
+from config.settings import SCHEDULER_DEFAULT_JITTER, SCHEDULE_PATH, STALE_DELETE_BATCH_SIZE
+from .random_all_fp import random_fingerprints, _matches, _select_profiles, _timestamp
+from .clear_cache import clear_profile_caches, _chunks
+
+
+def _random_fp_job(client: RoxyAPIClient, workspace_id: int, **params) -> None:
+    if "older_than" in params:
+        params["older_than"] = parse_interval(params["older_than"])
+    if not random_fingerprints(workspace_id, client=client, **params):
+        raise RuntimeError("部分配置文件随机指纹失败")
+
+
+def _clear_cache_job(client: RoxyAPIClient, workspace_id: int, **params) -> None:
+    if "older_than" in params:
+        params["older_than"] = parse_interval(params["older_than"])
+    summary = clear_profile_caches(workspace_id, client=client, **params)
+    if summary["failed"]:
+        raise RuntimeError(f"{len(summary['failed'])} 个配置文件清空缓存失败")
+
+
+def _is_stale(profile: Dict, label_id: Optional[int], name_prefix: Optional[str], cutoff: float) -> bool:
+    # 删除不可恢复，与随机指纹的筛选不同，无法判断更新时间的配置文件一律保留
+    if not _matches(profile, label_id, name_prefix, None):
+        return False
+    updated = _timestamp(profile.get("updateTime") or profile.get("createTime"))
+    return updated is not None and updated <= cutoff
+
+
+def _cleanup_stale_job(
+    client: RoxyAPIClient,
+    workspace_id: int,
+    older_than,
+    name_prefix: Optional[str] = None,
+    label_id: Optional[int] = None,
+    dry_run: bool = False,
+    batch_size: int = STALE_DELETE_BATCH_SIZE
+) -> None:
+    """删除超过 older_than 未更新的配置文件，正在打开或无法判断更新时间的配置文件不删除"""
+    if batch_size <= 0:
+        raise ValueError("批大小必须大于0")
+    cutoff = time.time() - parse_interval(older_than)
+    # 删除依据更新时间，使用索引时总是先增量同步，不使用可能过期的索引数据
+    stale = [
+        str(profile["dirId"]) for profile in _select_profiles(client, workspace_id, label_id, name_prefix, max_age=None)
+        if _is_stale(profile, label_id, name_prefix, cutoff)
+    ]
+    if not stale:
+        return
+    response = call_with_pause(client, client.get_connection_info)
+    if not response or response.get("code") != 0:
+        raise RuntimeError(f"获取已打开窗口失败: {response}")
+    opened = {str(dir_id) for dir_id in (response.get("data") or {})}
+    stale = [dir_id for dir_id in stale if dir_id not in opened]
+    if dry_run:
+        print(f"工作区 {workspace_id} 有 {len(stale)} 个过期配置文件(试运行，未删除): {stale}")
+        return
+    deleted = 0
+    for batch in _chunks(stale, batch_size):
+        response = call_with_pause(client, client.delete_profile, workspace_id, batch)
+        if not response or response.get("code") != 0:
+            raise RuntimeError(f"删除过期配置文件失败(已删除 {deleted} 个): {response}")
+        deleted += len(batch)
+    print(f"工作区 {workspace_id} 已删除 {deleted} 个过期配置文件")
+
+
+def _health_check_job(client: RoxyAPIClient) -> None:
+    response = client.health_check()
+    if not response or response.get("code") != 0:
+        raise RuntimeError(f"健康检查失败: {response}")
+
+
+# 任务类型 -> (函数, 是否按工作区分别执行)
+JOB_TYPES: Dict[str, tuple] = {
+    "random_fp": (_random_fp_job, True),
+    "clear_cache": (_clear_cache_job, True),
+    "cleanup_stale": (_cleanup_stale_job, True),
+    "health_check": (_health_check_job, False)
+}
+
+
+def _schedule(spec: Dict):
+    return CronSchedule(spec["cron"]) if "cron" in spec else IntervalSchedule(spec["every"])
+
+
+def build_jobs(config: Dict, client: Optional[RoxyAPIClient] = None) -> List[Job]:
+    """根据计划配置生成任务
+
+    配置格式::
+
+        {
+            "workspaces": [1, 2],
+            "jobs": [
+                {"task": "random_fp", "cron": "0 3 * * *", "jitter": 600, "params": {"concurrency": 16}},
+                {"task": "health_check", "every": "5m"},
+                {"task": "cleanup_stale", "every": "1d", "params": {"older_than": "90d", "name_prefix": "Auto"}}
+            ]
+        }
+
+    按工作区执行的任务为每个工作区生成一个实例（名称为 "名称@工作区"），各实例独立计算
+    随机偏移并互不阻塞。jitter 缺省为 SCHEDULER_DEFAULT_JITTER 秒。
+    """
+    client = client or get_client()
+    default_workspaces = config.get("workspaces") or []
+    jobs = []
+    for spec in config.get("jobs", []):
+        task = spec["task"]
+        if task not in JOB_TYPES:
+            raise ValueError(f"不支持的定时任务: {task}")
+        if ("cron" in spec) == ("every" in spec):
+            raise ValueError(f"定时任务 {task} 需要且只能指定 cron 或 every 之一")
+        func, per_workspace = JOB_TYPES[task]
+        name = spec.get("name", task)
+        jitter = float(spec.get("jitter", SCHEDULER_DEFAULT_JITTER))
+        params = spec.get("params") or {}
+
+        if not per_workspace:
+            jobs.append(Job(name, partial(func, client, **params), _schedule(spec), jitter, spec.get("run_at_start", False)))
+            continue
+        workspaces = spec.get("workspaces") or default_workspaces
+        if not workspaces:
+            raise ValueError(f"定时任务 {name} 需要指定 workspaces")
+        for workspace_id in workspaces:
+            jobs.append(Job(
+                f"{name}@{workspace_id}",
+                partial(func, client, workspace_id, **params),
+                _schedule(spec),
+                jitter,
+                spec.get("run_at_start", False)
+            ))
+    return jobs
+
+
+def run_scheduler(
+    schedule_file: str = SCHEDULE_PATH,
+    client: Optional[RoxyAPIClient] = None,
+    stop_event: Optional[threading.Event] = None
+) -> bool:
+    """以常驻进程运行计划文件中的定时任务，收到 SIGINT/SIGTERM 或 stop_event 置位时退出"""
+    with open(schedule_file, encoding="utf-8") as f:
+        config = json.load(f)
+    scheduler = Scheduler(build_jobs(config, client))
+
+    def shutdown(*_) -> None:
+        print("收到退出信号，等待正在执行的任务结束")
+        scheduler.request_stop()
+
+    previous = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, shutdown)
+    if stop_event is not None:
+        threading.Thread(target=lambda: (stop_event.wait(), shutdown()), daemon=True).start()
+
+    try:
+        scheduler.run_forever()
+    finally:
+        scheduler.stop()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    for item in scheduler.status():
+        print(f"{item['name']}: 执行 {item['runs']} 次, 失败 {item['failures']} 次, 跳过 {item['skipped']} 次")
+    return True
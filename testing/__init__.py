@@ -0,0 +1,3 @@
+from .fake_roxy_server import FakeRoxyServer
+
+__all__ = ['FakeRoxyServer']
\ No newline at end of file
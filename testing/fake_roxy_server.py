@@ -0,0 +1,450 @@
+"""本地 Roxy API 替身服务
+
+实现 config.settings.API_ENDPOINTS 中的全部接口，数据保存在内存中，可配置延迟分布、
+HTTP 错误率、code != 0 的业务错误率以及限流，用于离线压测和集成测试。
+
+用法: python -m testing.fake_roxy_server --port 40004 --latency uniform:0.005:0.02
+"""
+import argparse
+import json
+import math
+import random
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+from config.settings import API_ENDPOINTS, API_TOKEN
+from utils import TokenBucket
+
+LatencySpec = Union[None, float, Tuple, Callable[[], float]]
+
+
+def make_latency(spec: LatencySpec, rng: random.Random) -> Callable[[], float]:
+    """把延迟配置转换为采样函数
+
+    支持: None/0 无延迟; 数值为固定延迟; ("fixed", s); ("uniform", a, b);
+    ("normal", mean, stddev); ("lognormal", median, sigma); ("exponential", mean); 或任意可调用对象。
+    """
+    if spec is None or spec == 0:
+        return lambda: 0.0
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda: float(spec)
+
+    kind, *args = spec
+    if kind == "fixed":
+        return lambda: float(args[0])
+    if kind == "uniform":
+        return lambda: rng.uniform(args[0], args[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(args[0], args[1]))
+    if kind == "lognormal":
+        mu = math.log(args[0])
+        return lambda: rng.lognormvariate(mu, args[1])
+    if kind == "exponential":
+        return lambda: rng.expovariate(1.0 / args[0])
+    raise ValueError(f"不支持的延迟分布: {kind}")
+
+
+def parse_latency(text: str) -> LatencySpec:
+    """解析命令行延迟参数，如 "0.01"、"uniform:0.005:0.02"、"lognormal:0.01:0.5" """
+    parts = text.split(":")
+    if len(parts) == 1:
+        return float(parts[0])
+    return (parts[0], *(float(p) for p in parts[1:]))
+
+
+class FakeRoxyServer:
+    """内存中的 Roxy API 服务"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: Optional[str] = API_TOKEN,
+        workspaces: Optional[Dict[int, str]] = None,
+        latency: LatencySpec = None,
+        route_latency: Optional[Dict[str, LatencySpec]] = None,
+        error_rate: float = 0.0,
+        api_error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        rate_burst: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.token = token
+        self.error_rate = error_rate
+        self.api_error_rate = api_error_rate
+        self._rng = random.Random(seed)
+        self._latency = make_latency(latency, self._rng)
+        self._route_latency = {
+            name: make_latency(spec, self._rng) for name, spec in (route_latency or {}).items()
+        }
+        self._bucket = TokenBucket(rate_limit, rate_burst) if rate_limit > 0 else None
+
+        self._lock = threading.Lock()
+        self.workspaces: Dict[int, str] = dict(workspaces or {1: "默认工作区"})
+        # workspace_id -> {dirId: profile}，dict 保持插入顺序用于分页
+        self.profiles: Dict[int, Dict[str, Dict]] = {ws: {} for ws in self.workspaces}
+        self.opened: Dict[str, Dict] = {}
+        # 已分配的调试端口数，端口按顺序分配，关闭窗口后不复用
+        self._ports_allocated = 0
+        self.labels: Dict[int, List[Dict]] = {ws: [] for ws in self.workspaces}
+        self.accounts: Dict[int, List[Dict]] = {ws: [] for ws in self.workspaces}
+        self.cache_clears: Dict[str, int] = {"local": 0, "server": 0}
+
+        self._requests: Dict[str, int] = {}
+        self._in_flight = 0
+        self.peak_in_flight = 0
+        self._connections: Set[socket.socket] = set()
+
+        self._routes = {path: name for name, path in API_ENDPOINTS.items()}
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 1024
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ 生命周期
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRoxyServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-roxy", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务并断开已建立的长连接，模拟服务宕机"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "FakeRoxyServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------ 数据准备
+
+    def add_profiles(self, workspace_id: int, count: int, prefix: str = "Seed", **fields) -> List[str]:
+        """批量预置配置文件，返回 dirId 列表"""
+        with self._lock:
+            self._ensure_workspace(workspace_id)
+            base = len(self.profiles[workspace_id])
+            created = []
+            for i in range(count):
+                profile = self._new_profile(workspace_id, {"windowName": f"{prefix}_{base + i + 1}", **fields})
+                created.append(profile["dirId"])
+            return created
+
+    def stats(self) -> Dict:
+        """返回各接口请求次数和峰值并发数"""
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "total_requests": sum(self._requests.values()),
+                "peak_in_flight": self.peak_in_flight,
+                "profiles": sum(len(p) for p in self.profiles.values()),
+                "opened": len(self.opened)
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self.peak_in_flight = 0
+
+    # ------------------------------------------------------------------ 请求处理
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 头部和正文分两次写出，关闭 Nagle 避免与延迟 ACK 叠加出 40ms 停顿
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server._connections.add(self.connection)
+
+            def finish(self):
+                with server._lock:
+                    server._connections.discard(self.connection)
+                super().finish()
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+                server._dispatch(self, parsed.path, params)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    self._send(400, {"code": 400, "msg": "invalid json"})
+                    return
+                server._dispatch(self, urlparse(self.path).path, body)
+
+            def _send(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def _dispatch(self, handler, path: str, payload: Dict) -> None:
+        name = self._routes.get(path)
+        with self._lock:
+            self._requests[name or path] = self._requests.get(name or path, 0) + 1
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            fail_http = self._rng.random() < self.error_rate
+            fail_api = self._rng.random() < self.api_error_rate
+        try:
+            if name is None:
+                handler._send(404, {"code": 404, "msg": "not found"})
+                return
+            if self.token and handler.headers.get("Authorization") != self.token:
+                handler._send(401, {"code": 401, "msg": "unauthorized"})
+                return
+            if self._bucket is not None and not self._bucket.try_acquire():
+                handler._send(429, {"code": 429, "msg": "too many requests"}, {"Retry-After": "1"})
+                return
+
+            delay = self._route_latency.get(name, self._latency)()
+            if delay > 0:
+                time.sleep(delay)
+
+            if fail_http:
+                handler._send(500, {"code": 500, "msg": "injected error"})
+                return
+            if fail_api:
+                handler._send(200, {"code": 500, "msg": "injected api error", "data": None})
+                return
+
+            with self._lock:
+                body = getattr(self, f"_handle_{name}")(payload)
+            handler._send(200, body)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    # ------------------------------------------------------------------ 接口实现（持有锁）
+
+    @staticmethod
+    def _ok(data=None) -> Dict:
+        return {"code": 0, "msg": "success", "data": data}
+
+    @staticmethod
+    def _fail(msg: str, code: int = 1) -> Dict:
+        return {"code": code, "msg": msg, "data": None}
+
+    def _ensure_workspace(self, workspace_id: int) -> None:
+        if workspace_id not in self.workspaces:
+            self.workspaces[workspace_id] = f"Workspace_{workspace_id}"
+            self.profiles[workspace_id] = {}
+            self.labels[workspace_id] = []
+            self.accounts[workspace_id] = []
+
+    def _new_profile(self, workspace_id: int, data: Dict) -> Dict:
+        now = time.time()
+        dir_id = uuid.UUID(int=self._rng.getrandbits(128)).hex
+        profile = {
+            "dirId": dir_id,
+            "workspaceId": workspace_id,
+            "windowName": data.get("windowName", dir_id[:8]),
+            "windowSortNum": len(self.profiles[workspace_id]) + 1,
+            "os": data.get("os", "Windows"),
+            "labelIds": list(data.get("labelIds", [])),
+            "proxyInfo": data.get("proxyInfo", {"proxyMethod": "noproxy"}),
+            "fingerInfo": data.get("fingerInfo", {}),
+            "createTime": now,
+            "updateTime": now
+        }
+        self.profiles[workspace_id][dir_id] = profile
+        return profile
+
+    def _find(self, dir_id) -> Optional[Dict]:
+        dir_id = str(dir_id)
+        for profiles in self.profiles.values():
+            if dir_id in profiles:
+                return profiles[dir_id]
+        return None
+
+    def _workspace_id(self, value) -> Optional[int]:
+        try:
+            workspace_id = int(value)
+        except (TypeError, ValueError):
+            return None
+        return workspace_id if workspace_id in self.workspaces else None
+
+    def _handle_health_check(self, params: Dict) -> Dict:
+        return self._ok()
+
+    def _handle_workspaces(self, params: Dict) -> Dict:
+        return self._ok([{"id": ws, "name": name} for ws, name in self.workspaces.items()])
+
+    def _handle_list_profiles(self, params: Dict) -> Dict:
+        workspace_id = self._workspace_id(params.get("workspaceId"))
+        if workspace_id is None:
+            return self._fail("工作区不存在")
+        page = max(1, int(params.get("page") or 1))
+        size = max(1, int(params.get("size") or 20))
+        profiles = list(self.profiles[workspace_id].values())
+        start = (page - 1) * size
+        rows = [dict(p) for p in profiles[start:start + size]]
+        return self._ok({"total": len(profiles), "list": rows})
+
+    def _handle_create_profile(self, data: Dict) -> Dict:
+        workspace_id = self._workspace_id(data.get("workspaceId"))
+        if workspace_id is None:
+            return self._fail("工作区不存在")
+        profile = self._new_profile(workspace_id, data)
+        return self._ok({"dirId": profile["dirId"]})
+
+    def _handle_modify_profile(self, data: Dict) -> Dict:
+        profile = self._find(data.get("dirId"))
+        if profile is None:
+            return self._fail("配置文件不存在")
+        for key, value in data.items():
+            if key not in ("dirId", "workspaceId"):
+                profile[key] = value
+        profile["updateTime"] = time.time()
+        return self._ok()
+
+    def _allocate_port(self) -> int:
+        """分配调试端口：按计数依次递增，40000 个后回绕并跳过仍在使用的端口"""
+        in_use = {info["port"] for info in self.opened.values()}
+        while True:
+            port = 20000 + self._ports_allocated % 40000
+            self._ports_allocated += 1
+            if port not in in_use:
+                return port
+
+    def _handle_open_profile(self, data: Dict) -> Dict:
+        dir_id = str(data.get("dirId"))
+        if self._find(dir_id) is None:
+            return self._fail("配置文件不存在")
+        port = self.opened.get(dir_id, {}).get("port") or self._allocate_port()
+        info = {
+            "port": port,
+            "http": f"127.0.0.1:{port}",
+            "ws": f"ws://127.0.0.1:{port}/devtools/browser/{dir_id}",
+            "driver": ""
+        }
+        self.opened[dir_id] = info
+        return self._ok({k: info[k] for k in ("http", "ws", "driver")})
+
+    def _handle_close_profile(self, data: Dict) -> Dict:
+        self.opened.pop(str(data.get("dirId")), None)
+        return self._ok()
+
+    def _handle_random_fingerprint(self, data: Dict) -> Dict:
+        profile = self._find(data.get("dirId"))
+        if profile is None:
+            return self._fail("配置文件不存在")
+        profile["fingerInfo"] = {"seed": self._rng.getrandbits(32)}
+        profile["updateTime"] = time.time()
+        return self._ok()
+
+    def _handle_delete_profile(self, data: Dict) -> Dict:
+        workspace_id = self._workspace_id(data.get("workspaceId"))
+        if workspace_id is None:
+            return self._fail("工作区不存在")
+        for dir_id in data.get("dirIds") or []:
+            self.profiles[workspace_id].pop(str(dir_id), None)
+            self.opened.pop(str(dir_id), None)
+        return self._ok()
+
+    def _handle_connection_info(self, data: Dict) -> Dict:
+        dir_ids = data.get("dirIds")
+        wanted = self.opened.keys() if not dir_ids else [str(d) for d in dir_ids if str(d) in self.opened]
+        return self._ok({
+            dir_id: {k: self.opened[dir_id][k] for k in ("http", "ws", "driver")} for dir_id in wanted
+        })
+
+    def _handle_clear_local_cache(self, data: Dict) -> Dict:
+        self.cache_clears["local"] += len(data.get("dirIds") or [])
+        return self._ok()
+
+    def _handle_clear_server_cache(self, data: Dict) -> Dict:
+        self.cache_clears["server"] += len(data.get("dirIds") or [])
+        return self._ok()
+
+    def _handle_accounts(self, params: Dict) -> Dict:
+        workspace_id = self._workspace_id(params.get("workspaceId"))
+        if workspace_id is None:
+            return self._fail("工作区不存在")
+        accounts = self.accounts[workspace_id]
+        page = max(1, int(params.get("page_index") or 1))
+        size = max(1, int(params.get("page_size") or 15))
+        return self._ok({"total": len(accounts), "rows": accounts[(page - 1) * size:page * size]})
+
+    def _handle_labels(self, params: Dict) -> Dict:
+        workspace_id = self._workspace_id(params.get("workspaceId"))
+        if workspace_id is None:
+            return self._fail("工作区不存在")
+        return self._ok(self.labels[workspace_id])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="本地 Roxy API 替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=50000)
+    parser.add_argument("--token", default=API_TOKEN, help="要求的 Authorization 值(空字符串不校验)")
+    parser.add_argument("--latency", type=parse_latency, default=None, help="延迟分布，如 0.01 或 uniform:0.005:0.02")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 注入比例")
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="code != 0 注入比例")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="每秒请求上限(超出返回 429)")
+    parser.add_argument("--profiles", type=int, default=0, help="在工作区 1 预置的配置文件数量")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeRoxyServer(
+        args.host,
+        args.port,
+        token=args.token or None,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        api_error_rate=args.api_error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    if args.profiles:
+        server.add_profiles(1, args.profiles)
+    print(f"Fake Roxy API 运行于 {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
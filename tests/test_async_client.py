@@ -0,0 +1,101 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core import AsyncRoxyAPIClient
+from config.settings import API_ENDPOINTS
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """最小化的本地 API 服务，记录并发请求数"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._reply({"code": 0, "path": self.path, "auth": self.headers.get("Authorization")})
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        self._reply({"code": 0, "data": data})
+
+
+class TestAsyncRoxyAPIClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.lock = threading.Lock()
+        cls.server.in_flight = 0
+        cls.server.peak = 0
+        cls.server.delay = 0.0
+        cls.server.handle_error = lambda request, address: None
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.peak = 0
+        self.server.delay = 0.0
+
+    def test_get_with_shared_headers(self):
+        """测试 GET 请求使用配置中的端点和令牌"""
+        async def run():
+            async with AsyncRoxyAPIClient(self.base_url, token="tok") as client:
+                return await client.list_profiles(1, page=2, size=50)
+
+        response = asyncio.run(run())
+        self.assertEqual(response["code"], 0)
+        self.assertTrue(response["path"].startswith(API_ENDPOINTS["list_profiles"]))
+        self.assertIn("page=2", response["path"])
+        self.assertEqual(response["auth"], "tok")
+
+    def test_in_flight_limit(self):
+        """测试并发请求数不超过 max_in_flight"""
+        self.server.delay = 0.05
+
+        async def run():
+            async with AsyncRoxyAPIClient(self.base_url, max_in_flight=3) as client:
+                return await asyncio.gather(*(client.open_profile(f"dir_{i}") for i in range(12)))
+
+        responses = asyncio.run(run())
+        self.assertEqual([r["data"]["dirId"] for r in responses], [f"dir_{i}" for i in range(12)])
+        self.assertLessEqual(self.server.peak, 3)
+
+    def test_per_call_timeout(self):
+        """测试单次请求超时"""
+        self.server.delay = 0.5
+
+        async def run():
+            async with AsyncRoxyAPIClient(self.base_url, max_retries=0) as client:
+                await client.close_profile("dir_1", timeout=0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from core import RoxyAPIClient
+from core.batcher import RequestCoalescer, split_by_dir_id
+
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_concurrent_calls_merged(self):
+        """测试并发的单 dirId 调用被合并并按 dirId 拆分"""
+        calls = []
+        lock = threading.Lock()
+
+        def fake_post(endpoint, data):
+            with lock:
+                calls.append(list(data["dirIds"]))
+            time.sleep(0.01)
+            return {"code": 0, "data": {str(d): {"http": f"127.0.0.1:{d}"} for d in data["dirIds"]}}
+
+        client = RoxyAPIClient(coalesce_window=0.05, coalesce_max_batch=100)
+        with patch.object(client, "_post", side_effect=fake_post):
+            with ThreadPoolExecutor(max_workers=40) as executor:
+                results = list(executor.map(lambda i: client.get_connection_info([i]), range(40)))
+
+        self.assertLess(len(calls), 5)
+        self.assertEqual(sorted(d for batch in calls for d in batch), list(range(40)))
+        for i, response in enumerate(results):
+            self.assertEqual(response["data"], {str(i): {"http": f"127.0.0.1:{i}"}})
+
+    def test_max_batch(self):
+        """测试批次达到上限后立即发送"""
+        sizes = []
+        coalescer = RequestCoalescer(window=5, max_batch=4)
+
+        def execute(ids):
+            sizes.append(len(ids))
+            return {"code": 0, "data": {str(i): {} for i in ids}}
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: coalescer.submit("k", [i], execute, split_by_dir_id), range(8)))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(sizes, [4, 4])
+
+    def test_large_call_split_into_chunks(self):
+        """测试单个调用方的 dirId 超过 max_batch 时按上限分块发送"""
+        calls = []
+        coalescer = RequestCoalescer(window=0.01, max_batch=3)
+
+        def execute(ids):
+            calls.append(list(ids))
+            return {"code": 0, "data": {str(i): {"n": i} for i in ids}}
+
+        response = coalescer.submit("k", list(range(7)), execute, split_by_dir_id)
+        self.assertEqual([len(ids) for ids in calls], [3, 3, 1])
+        self.assertEqual(response["data"], {str(i): {"n": i} for i in range(7)})
+
+    def test_error_propagates_to_all_callers(self):
+        """测试合并请求失败时所有调用方都收到异常"""
+        coalescer = RequestCoalescer(window=0.05, max_batch=10)
+
+        def execute(ids):
+            raise ConnectionError("down")
+
+        def call(i):
+            try:
+                coalescer.submit("k", [i], execute, split_by_dir_id)
+            except ConnectionError:
+                return True
+            return False
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            self.assertTrue(all(executor.map(call, range(5))))
+
+    def test_disabled_by_default(self):
+        """测试未开启合并时直接发送请求"""
+        client = RoxyAPIClient(coalesce_window=0)
+        with patch.object(client, "_post", return_value={"code": 0}) as mock_post:
+            client.clear_server_cache(1, ["a", "b"])
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[1], {"workspaceId": 1, "dirIds": ["a", "b"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
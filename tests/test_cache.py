@@ -0,0 +1,82 @@
+import time
+import unittest
+from unittest.mock import patch
+from core import RoxyAPIClient
+from core.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_expiry(self):
+        """测试条目过期后不再返回"""
+        cache = TTLCache(ttl=0.05)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a"))
+
+    def test_lru_bound(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+
+class TestConnectionInfoCache(unittest.TestCase):
+    def setUp(self):
+        self.client = RoxyAPIClient(connection_cache_ttl=60)
+
+    @staticmethod
+    def _fake_post(endpoint, data):
+        ids = data.get("dirIds", [])
+        return {"code": 0, "data": {str(d): {"http": f"127.0.0.1:{d}", "ws": f"ws://{d}"} for d in ids}}
+
+    def test_repeated_lookup_served_from_cache(self):
+        """测试重复查询不再发送请求"""
+        with patch.object(self.client, "_post", side_effect=self._fake_post) as mock_post:
+            first = self.client.get_connection_info([1, 2])
+            second = self.client.get_connection_info([2, 1])
+            self.assertEqual(mock_post.call_count, 1)
+            self.assertEqual(second["data"]["1"]["http"], first["data"]["1"]["http"])
+
+            self.client.get_connection_info([1, 3])
+            self.assertEqual(mock_post.call_args.args[1], {"dirIds": [3]})
+
+    def test_cache_hit_returns_raw_entry(self):
+        """测试命中缓存时返回的条目与直接请求时相同"""
+        def fake_post(endpoint, data):
+            ids = data.get("dirIds", [])
+            return {"code": 0, "data": {str(d): {"http": f"127.0.0.1:{d}", "pid": d} for d in ids}}
+
+        with patch.object(self.client, "_post", side_effect=fake_post) as mock_post:
+            first = self.client.get_connection_info([1, 2])
+            second = self.client.get_connection_info([1, 2])
+            self.assertEqual(mock_post.call_count, 1)
+            self.assertEqual(second["data"], first["data"])
+
+    def test_invalidated_by_open_close_delete(self):
+        """测试打开/关闭/删除配置文件后缓存失效"""
+        with patch.object(self.client, "_post", side_effect=self._fake_post) as mock_post:
+            self.client.get_connection_info([1, 2, 3])
+            self.client.open_profile(1)
+            self.client.close_profile(2)
+            self.client.delete_profile(1, [3])
+            mock_post.reset_mock()
+
+            self.client.get_connection_info([1, 2, 3])
+            self.assertEqual(mock_post.call_args.args[1], {"dirIds": [1, 2, 3]})
+
+    def test_error_not_cached(self):
+        """测试错误响应不写入缓存"""
+        with patch.object(self.client, "_post", return_value={"code": 1, "msg": "fail"}) as mock_post:
+            self.client.get_connection_info([1])
+            self.client.get_connection_info([1])
+        self.assertEqual(mock_post.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
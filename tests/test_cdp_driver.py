@@ -0,0 +1,108 @@
+import json
+import unittest
+from core import CDPDriver, CDPError
+
+
+class FakeConnection:
+    """模拟 DevTools WebSocket，按方法名返回预设结果"""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.sent = []
+        self._pending = []
+
+    def send(self, payload):
+        message = json.loads(payload)
+        self.sent.append(message)
+        # 先推送一条无关事件，驱动应忽略
+        self._pending.append({"method": "Page.frameNavigated", "params": {}})
+        handler = self.handlers.get(message["method"], lambda params: {})
+        result = handler(message["params"])
+        if isinstance(result, Exception):
+            self._pending.append({"id": message["id"], "error": {"message": str(result)}})
+        else:
+            self._pending.append({"id": message["id"], "result": result})
+
+    def recv(self):
+        return json.dumps(self._pending.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+class TestCDPDriver(unittest.TestCase):
+    def setUp(self):
+        self.dom = set()
+        self.loaders = ["L2"]
+        self.context_errors = 0
+
+        def evaluate(params):
+            expression = params["expression"]
+            if self.context_errors:
+                self.context_errors -= 1
+                return RuntimeError("Execution context was destroyed.")
+            if expression == "document.readyState":
+                return {"result": {"value": "complete"}}
+            if expression.endswith("!== null"):
+                selector = json.loads(expression[len("document.querySelector("):-len(") !== null")])
+                return {"result": {"value": selector in self.dom}}
+            if "getBoundingClientRect" in expression:
+                return {"result": {"value": {"x": 10, "y": 20}}}
+            if expression == "throw":
+                return {"exceptionDetails": {"text": "boom"}}
+            return {"result": {"value": None}}
+
+        self.conn = FakeConnection({
+            "Runtime.evaluate": evaluate,
+            "Page.navigate": lambda params: {"frameId": "f", "loaderId": "L2"},
+            "Page.getFrameTree": lambda params: {"frameTree": {"frame": {
+                "id": "f", "loaderId": self.loaders.pop(0) if len(self.loaders) > 1 else self.loaders[0]
+            }}},
+            "Target.getTargets": lambda params: {"targetInfos": [{"type": "page", "targetId": "t1"}]},
+            "Target.attachToTarget": lambda params: {"sessionId": "s1"},
+            "Bad.method": lambda params: RuntimeError("unknown"),
+        })
+        self.driver = CDPDriver(self.conn, timeout=0.3)
+
+    def test_login_flow_commands(self):
+        """测试输入和点击发送对应的 CDP 命令"""
+        self.dom.update({"#user", "#submit"})
+        self.driver.attach_to_page()
+        self.driver.navigate("https://example.com")
+        self.driver.type("#user", "alice")
+        self.driver.click("#submit")
+
+        methods = [m["method"] for m in self.conn.sent]
+        self.assertIn("Page.navigate", methods)
+        self.assertIn({"text": "alice"}, [m["params"] for m in self.conn.sent if m["method"] == "Input.insertText"])
+        clicks = [m["params"]["type"] for m in self.conn.sent if m["method"] == "Input.dispatchMouseEvent"]
+        self.assertEqual(clicks, ["mousePressed", "mouseReleased"])
+        self.assertTrue(all(m.get("sessionId") == "s1" for m in self.conn.sent if not m["method"].startswith("Target.")))
+
+    def test_navigate_waits_for_new_document(self):
+        """测试跳转等待新文档提交，旧文档 complete 或上下文销毁时继续等待"""
+        self.loaders = ["L1", "L1", "L2"]
+        self.context_errors = 1
+        self.driver.navigate("https://example.com/next")
+        frame_trees = [m for m in self.conn.sent if m["method"] == "Page.getFrameTree"]
+        self.assertEqual(len(frame_trees), 4)
+
+        self.loaders = ["L1"]
+        with self.assertRaises(TimeoutError):
+            self.driver.navigate("https://example.com/stuck", timeout=0.2)
+
+    def test_wait_for_selector_timeout(self):
+        """测试元素不存在时超时"""
+        with self.assertRaises(TimeoutError):
+            self.driver.wait_for_selector("#missing", timeout=0.2)
+
+    def test_errors(self):
+        """测试命令错误和脚本异常"""
+        with self.assertRaises(CDPError):
+            self.driver.send("Bad.method")
+        with self.assertRaises(CDPError):
+            self.driver.evaluate("throw")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from urllib3.util.retry import Retry
+from core import RoxyAPIClient, CircuitBreaker, CircuitOpenError, call_with_pause
+from testing import FakeRoxyServer
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_closes_on_probe(self):
+        """测试连续失败打开熔断，探测成功后关闭"""
+        healthy = threading.Event()
+        breaker = CircuitBreaker(healthy.is_set, failure_threshold=3, probe_interval=0.02)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+
+        self.assertFalse(breaker.wait_until_closed(0.1))
+        healthy.set()
+        self.assertTrue(breaker.wait_until_closed(2))
+        breaker.before_request()
+
+    def test_success_resets_failures(self):
+        """测试成功请求清零连续失败计数"""
+        breaker = CircuitBreaker(lambda: True, failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open)
+
+    def test_pause_skipped_when_never_reachable(self):
+        """测试服务从未连通或已等待超时时不再暂停"""
+        breaker = CircuitBreaker(lambda: False, failure_threshold=1, probe_interval=0.02)
+        breaker.record_failure()
+        start = time.monotonic()
+        self.assertFalse(breaker.pause(5))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        breaker = CircuitBreaker(lambda: False, failure_threshold=1, probe_interval=0.02)
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertFalse(breaker.pause(0.05))
+        start = time.monotonic()
+        self.assertFalse(breaker.pause(5))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class TestClientCircuitBreaker(unittest.TestCase):
+    def test_fail_fast_and_resume(self):
+        """测试服务中断时快速失败，恢复后暂停中的调用继续执行"""
+        server = FakeRoxyServer(token=None).start()
+        port = int(server.base_url.rsplit(":", 1)[1])
+        client = RoxyAPIClient(server.base_url, "")
+        client.session.get_adapter(server.base_url).max_retries = Retry(0)
+        client._breaker.failure_threshold = 2
+        client._breaker.probe_interval = 0.05
+        self.assertEqual(client.health_check()["code"], 0)
+        server.stop()
+
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                client.health_check()
+        self.assertTrue(client.circuit_open)
+
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            client.health_check()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.update(call_with_pause(client, client.health_check, max_wait=5))
+        )
+        worker.start()
+        time.sleep(0.1)
+        self.assertTrue(worker.is_alive())
+
+        restarted = FakeRoxyServer(port=port, token=None).start()
+        try:
+            worker.join(5)
+            self.assertEqual(result.get("code"), 0)
+            self.assertFalse(client.circuit_open)
+        finally:
+            client.close()
+            restarted.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
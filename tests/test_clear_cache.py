@@ -0,0 +1,73 @@
+import unittest
+from core import RoxyAPIClient
+from tasks.clear_cache import clear_profile_caches, _chunks
+from testing import FakeRoxyServer
+
+
+class TestClearCache(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token=None, route_latency={"clear_local_cache": 0.01}).start()
+        self.client = RoxyAPIClient(self.server.base_url, "")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_chunks(self):
+        """测试均匀分批"""
+        self.assertEqual([len(c) for c in _chunks(list(range(450)), 200)], [150, 150, 150])
+        self.assertEqual([len(c) for c in _chunks(list(range(200)), 200)], [200])
+        self.assertEqual([len(c) for c in _chunks(list(range(7)), 3)], [3, 3, 1])
+        self.assertEqual(_chunks([], 10), [])
+
+    def test_batches_and_skips_open(self):
+        """测试按批清理、跳过已打开的配置文件，且只查询一次连接信息"""
+        dir_ids = self.server.add_profiles(1, 450)
+        for dir_id in dir_ids[:3]:
+            self.client.open_profile(dir_id)
+        self.server.reset_stats()
+
+        summary = clear_profile_caches(1, client=self.client, batch_size=200, concurrency=4)
+        self.assertEqual(summary, {"selected": 450, "skipped_open": 3, "cleared": 447, "failed": []})
+        requests = self.server.stats()["requests"]
+        self.assertEqual(requests["connection_info"], 1)
+        self.assertEqual(requests["clear_local_cache"], 3)
+        self.assertEqual(requests["clear_server_cache"], 3)
+
+    def test_dedupe_and_filters(self):
+        """测试 dirId 去重和按标签筛选"""
+        labelled = self.server.add_profiles(1, 5, "Shop", labelIds=[3])
+        self.server.add_profiles(1, 5)
+
+        summary = clear_profile_caches(1, labelled + labelled[:2], client=self.client, server=False)
+        self.assertEqual(summary["selected"], 5)
+        self.assertNotIn("clear_server_cache", self.server.stats()["requests"])
+
+        self.server.reset_stats()
+        summary = clear_profile_caches(1, client=self.client, label_id=3, local=False, skip_open=False)
+        self.assertEqual(summary["cleared"], 5)
+        requests = self.server.stats()["requests"]
+        self.assertNotIn("connection_info", requests)
+        self.assertNotIn("clear_local_cache", requests)
+
+    def test_failed_batches_reported(self):
+        """测试失败批次的 dirId 被报告"""
+        dir_ids = self.server.add_profiles(1, 10)
+        self.server.api_error_rate = 1.0
+        summary = clear_profile_caches(1, dir_ids, client=self.client, skip_open=False, server=False)
+        self.server.api_error_rate = 0.0
+        self.assertEqual(summary["cleared"], 0)
+        self.assertEqual(sorted(summary["failed"]), sorted(dir_ids))
+
+    def test_invalid_arguments(self):
+        """测试参数校验"""
+        with self.assertRaises(ValueError):
+            clear_profile_caches(1, [], client=self.client, local=False, server=False)
+        with self.assertRaises(ValueError):
+            clear_profile_caches(1, [], client=self.client, batch_size=0)
+        with self.assertRaises(ValueError):
+            clear_profile_caches(1, ["a"], client=self.client, name_prefix="Auto")
+
+
+if __name__ == "__main__":
+    unittest.main()
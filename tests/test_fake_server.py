@@ -0,0 +1,92 @@
+import unittest
+import requests
+from core import RoxyAPIClient
+from testing import FakeRoxyServer
+from tasks.create_profiles import create_multiple_profiles
+from tasks.random_all_fp import random_fingerprints
+
+
+class TestFakeRoxyServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token="tok", seed=1).start()
+        self.client = RoxyAPIClient(self.server.base_url, "tok")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_profile_lifecycle(self):
+        """测试创建、分页、打开、连接信息、关闭和删除"""
+        self.assertEqual(self.client.health_check()["code"], 0)
+        created = create_multiple_profiles(25, 1, "T", concurrency=4, client=self.client)
+        self.assertEqual(len(created), 25)
+
+        names = [p["windowName"] for p in self.client.iter_profiles(1, page_size=10)]
+        self.assertEqual(sorted(names), sorted(f"T_{i}" for i in range(1, 26)))
+        self.assertTrue(random_fingerprints(1, client=self.client))
+
+        dir_id = created[0]
+        self.assertEqual(self.client.open_profile(dir_id)["code"], 0)
+        info = self.client.get_connection_info([dir_id])
+        self.assertIn("http", info["data"][dir_id])
+        self.client.close_profile(dir_id)
+        self.assertEqual(self.client.get_connection_info([dir_id])["data"], {})
+
+        self.client.delete_profile(1, created[:5])
+        self.assertEqual(self.client.list_profiles(1)["data"]["total"], 20)
+
+    def test_open_ports_not_reused(self):
+        """测试关闭窗口后再打开其他窗口不会拿到仍在使用的端口"""
+        dir_ids = self.server.add_profiles(1, 3)
+        self.client.open_profile(dir_ids[0])
+        self.client.open_profile(dir_ids[1])
+        self.client.close_profile(dir_ids[0])
+        self.client.open_profile(dir_ids[2])
+        ports = [self.server.opened[d]["port"] for d in dir_ids[1:]]
+        self.assertEqual(len(set(ports)), 2)
+
+    def test_every_endpoint_routed(self):
+        """测试 API_ENDPOINTS 中每个接口都有实现"""
+        stats_before = self.server.stats()["requests"]
+        self.assertEqual(stats_before, {})
+        dir_id = self.server.add_profiles(1, 1)[0]
+        self.client.health_check()
+        self.client.get_workspaces()
+        self.client.list_profiles(1)
+        self.client.create_profile({"workspaceId": 1, "windowName": "x"})
+        self.client.modify_profile({"workspaceId": 1, "dirId": dir_id, "os": "macOS"})
+        self.client.open_profile(dir_id)
+        self.client.get_connection_info([dir_id])
+        self.client.close_profile(dir_id)
+        self.client.random_fingerprint(1, dir_id)
+        self.client.clear_local_cache([dir_id])
+        self.client.clear_server_cache(1, [dir_id])
+        self.client.get_accounts(1)
+        self.client.get_labels(1)
+        self.client.delete_profile(1, [dir_id])
+
+        from config.settings import API_ENDPOINTS
+        self.assertEqual(set(self.server.stats()["requests"]), set(API_ENDPOINTS))
+
+    def test_fault_injection(self):
+        """测试业务错误注入、鉴权和限流"""
+        self.server.api_error_rate = 1.0
+        self.assertNotEqual(self.client.health_check()["code"], 0)
+        self.server.api_error_rate = 0.0
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            RoxyAPIClient(self.server.base_url, "wrong").health_check()
+
+        limited = FakeRoxyServer(token=None, rate_limit=1).start()
+        try:
+            response = requests.get(f"{limited.base_url}/health")
+            self.assertEqual(response.status_code, 200)
+            response = requests.get(f"{limited.base_url}/health")
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["Retry-After"], "1")
+        finally:
+            limited.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from core import RoxyAPIClient, JobJournal
+from tasks.create_profiles import create_multiple_profiles
+from tasks.modify_proxies import modify_profile_proxies
+from testing import FakeRoxyServer
+
+
+class TestJobJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _stored_states(self, job_id):
+        conn = sqlite3.connect(self.path)
+        try:
+            return dict(conn.execute("SELECT item_key, state FROM job_items WHERE job_id = ?", (job_id,)))
+        finally:
+            conn.close()
+
+    def test_records_are_batched(self):
+        """测试结果按批量大小落盘"""
+        with JobJournal(self.path, batch_size=3, flush_interval=3600) as journal:
+            job_id = journal.open_job("demo", {"n": 5}, map(str, range(5)))
+            for i in range(5):
+                journal.record(job_id, str(i), True, i)
+            states = self._stored_states(job_id)
+            self.assertEqual(sum(state == "done" for state in states.values()), 3)
+            journal.flush()
+            self.assertEqual(journal.summary(job_id), {"pending": 0, "done": 5, "failed": 0})
+            self.assertEqual(journal.results(job_id), {str(i): i for i in range(5)})
+
+    def test_resume_create_without_duplicates(self):
+        """测试恢复创建任务时只重试失败项，不产生重复窗口"""
+        with FakeRoxyServer(token=None, api_error_rate=0.5, seed=3) as server, JobJournal(self.path) as journal:
+            client = RoxyAPIClient(server.base_url, "")
+            first = create_multiple_profiles(10, 1, "Job", client=client, journal=journal)
+            self.assertLess(len(first), 10)
+            job_id = journal_job_id(self.path)
+
+            server.api_error_rate = 0.0
+            resumed = create_multiple_profiles(10, 1, "Job", client=client, journal=journal, job_id=job_id)
+            self.assertEqual(len(resumed), 10)
+            self.assertEqual(len(server.profiles[1]), 10)
+            self.assertEqual(journal.summary(job_id)["done"], 10)
+            client.close()
+
+    def test_resume_adopts_in_flight_items(self):
+        """测试创建成功但未记录的窗口在恢复时被认领而不是重复创建"""
+        with FakeRoxyServer(token=None) as server, JobJournal(self.path) as journal:
+            client = RoxyAPIClient(server.base_url, "")
+            params = {"num_profiles": 3, "workspace_id": 1, "base_name": "Job"}
+            job_id = journal.open_job("create_multiple_profiles", params, ["0", "1", "2"])
+            adopted = server.add_profiles(1, 1, prefix="Job")[0]
+            # 模拟请求已发出、结果尚未落盘时中断
+            journal.checkpoint(job_id, "0", {"dir_id": None})
+
+            created = create_multiple_profiles(3, 1, "Job", client=client, journal=journal, job_id=job_id)
+            self.assertEqual(created[0], adopted)
+            self.assertEqual(len(server.profiles[1]), 3)
+            client.close()
+
+    def test_resume_prefers_recorded_dir_id(self):
+        """测试恢复时按落盘的 dirId 认领，同名窗口有多个且无记录时不按名称认领"""
+        with FakeRoxyServer(token=None) as server, JobJournal(self.path) as journal:
+            client = RoxyAPIClient(server.base_url, "")
+            params = {"num_profiles": 2, "workspace_id": 1, "base_name": "Job"}
+            job_id = journal.open_job("create_multiple_profiles", params, ["0", "1"])
+            first, second = server.add_profiles(1, 2, prefix="Other")
+            for dir_id in (first, second):
+                server.profiles[1][dir_id]["windowName"] = "Job_1"
+            duplicate = server.add_profiles(1, 2, prefix="Other")
+            for dir_id in duplicate:
+                server.profiles[1][dir_id]["windowName"] = "Job_2"
+            journal.checkpoint(job_id, "0", {"dir_id": second})
+            journal.checkpoint(job_id, "1", {"dir_id": None})
+
+            created = create_multiple_profiles(2, 1, "Job", client=client, journal=journal, job_id=job_id)
+            self.assertEqual(created[0], second)
+            self.assertNotIn(created[1], duplicate)
+            self.assertEqual(len(server.profiles[1]), 5)
+            client.close()
+
+    def test_resume_ignores_names_of_unattempted_items(self):
+        """测试从未尝试创建的窗口不会认领之前任务留下的同名窗口"""
+        with FakeRoxyServer(token=None) as server, JobJournal(self.path) as journal:
+            client = RoxyAPIClient(server.base_url, "")
+            earlier = server.add_profiles(1, 2, prefix="Job")
+            params = {"num_profiles": 2, "workspace_id": 1, "base_name": "Job"}
+            job_id = journal.open_job("create_multiple_profiles", params, ["0", "1"])
+
+            created = create_multiple_profiles(2, 1, "Job", client=client, journal=journal, job_id=job_id)
+            self.assertEqual(len(created), 2)
+            self.assertFalse(set(created) & set(earlier))
+            self.assertEqual(len(server.profiles[1]), 4)
+            client.close()
+
+    def test_resume_modify_retries_failed_only(self):
+        """测试恢复修改任务时只重试失败项"""
+        with FakeRoxyServer(token=None, api_error_rate=0.5, seed=5) as server, JobJournal(self.path) as journal:
+            client = RoxyAPIClient(server.base_url, "")
+            dir_ids = server.add_profiles(1, 20)
+            proxy = {"proxyMethod": "noproxy"}
+            self.assertFalse(modify_profile_proxies(dir_ids, proxy, 1, client=client, journal=journal))
+            job_id = journal_job_id(self.path)
+            failed = len(journal.pending(job_id))
+
+            server.api_error_rate = 0.0
+            server.reset_stats()
+            self.assertTrue(modify_profile_proxies(dir_ids, proxy, 1, client=client, journal=journal, job_id=job_id))
+            self.assertEqual(server.stats()["requests"]["modify_profile"], failed)
+            client.close()
+
+
+def journal_job_id(path):
+    """读取日志中唯一的任务ID"""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT job_id FROM jobs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+from core import RoxyAPIClient
+from core.limiter import AdaptiveLimiter, parse_retry_after
+from testing import FakeRoxyServer
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_additive_increase_when_saturated(self):
+        """测试额度用满且延迟健康时逐步扩张"""
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=10)
+        for _ in range(200):
+            for _ in range(limiter.limit):
+                limiter.acquire()
+            for _ in range(limiter.limit):
+                limiter.release(0.01)
+        self.assertEqual(limiter.limit, 10)
+
+    def test_no_increase_when_idle(self):
+        """测试串行调用不会抬高上限"""
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=100)
+        for _ in range(500):
+            limiter.acquire()
+            limiter.release(0.01)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_multiplicative_decrease_once_per_window(self):
+        """测试同一往返时间内的多次失败只收缩一次"""
+        limiter = AdaptiveLimiter(initial_limit=20, max_limit=20)
+        limiter.acquire()
+        limiter.release(0.05)
+        for _ in range(5):
+            limiter.acquire()
+        for _ in range(5):
+            limiter.release(0.05, overloaded=True)
+        self.assertEqual(limiter.limit, 14)
+
+    def test_retry_after_pauses_acquire(self):
+        """测试 Retry-After 期间暂停发放额度"""
+        limiter = AdaptiveLimiter(initial_limit=4)
+        limiter.acquire()
+        limiter.release(0.01, overloaded=True, retry_after=0.2)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        limiter.release(0.01)
+
+    def test_parse_retry_after(self):
+        """测试解析 Retry-After 头"""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+class TestClientBackpressure(unittest.TestCase):
+    def test_throttled_requests_retried(self):
+        """测试 429 响应在 Retry-After 后重试成功，且上限收缩"""
+        with FakeRoxyServer(token=None, rate_limit=20, rate_burst=5) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            results = []
+
+            def call():
+                results.append(client.health_check()["code"])
+
+            threads = [threading.Thread(target=call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(results, [0] * 8)
+            self.assertIn(429, client.metrics()["health_check"]["http_errors"])
+            self.assertLess(client.concurrency_limit, 8)
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from tasks.login_farm import iter_login_farm, run_login_farm, load_targets
+
+
+def _fake_login(target, backend, client):
+    """模拟登录：占用浏览器一段时间，用户名为 bad 时失败，为 crash 时抛出异常"""
+    time.sleep(0.05)
+    if target["username"] == "crash":
+        raise RuntimeError("driver crashed")
+    return target["username"] != "bad"
+
+
+def _make_targets(count):
+    targets = []
+    for i in range(count):
+        targets.append({
+            "dir_id": f"dir{i}",
+            "url": "https://example.com/login",
+            "username": "bad" if i == 3 else "crash" if i == 5 else f"user{i}",
+            "password": "pw",
+            "username_selector": "#u",
+            "password_selector": "#p",
+            "submit_selector": "#s",
+            "success_selector": "#ok"
+        })
+    return targets
+
+
+class TestLoginFarm(unittest.TestCase):
+    def test_results_streamed_from_multiple_processes(self):
+        """测试结果逐条返回，并按目标顺序汇总"""
+        targets = _make_targets(24)
+        streamed = []
+        results = run_login_farm(
+            targets,
+            processes=2,
+            drivers_per_process=3,
+            max_browsers=4,
+            on_result=streamed.append,
+            login_func=_fake_login
+        )
+        self.assertEqual(len(streamed), 24)
+        self.assertEqual([r["dir_id"] for r in results], [t["dir_id"] for t in targets])
+        self.assertEqual([r["dir_id"] for r in results if not r["ok"]], ["dir3", "dir5"])
+        self.assertEqual(results[5]["error"], "driver crashed")
+        self.assertTrue(all(r["worker"] for r in results))
+
+    def test_global_browser_cap(self):
+        """测试全局浏览器上限限制总吞吐"""
+        targets = _make_targets(8)
+        start = time.monotonic()
+        list(iter_login_farm(targets, processes=2, drivers_per_process=4, max_browsers=1, login_func=_fake_login))
+        # 同时只能有一个浏览器，8 次登录至少串行 0.4s
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+
+    def test_load_targets_with_defaults(self):
+        """测试目标文件缺少的字段由默认值补齐"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "targets.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("dir_id,username,password\nd1,alice,secret\n")
+            defaults = {field: "x" for field in ("url", "username_selector", "password_selector",
+                                                  "submit_selector", "success_selector")}
+            targets = load_targets(path, defaults)
+            self.assertEqual(targets[0]["username"], "alice")
+            self.assertEqual(targets[0]["url"], "x")
+
+            path = os.path.join(tmp, "targets.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump([{"dir_id": "d1"}], f)
+            with self.assertRaises(ValueError):
+                load_targets(path, defaults)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch, Mock
+import requests
+from core import RoxyAPIClient
+from core.metrics import ClientMetrics
+
+
+class TestClientMetrics(unittest.TestCase):
+    def test_percentiles(self):
+        """测试分位数由直方图估算且落在正确的量级"""
+        metrics = ClientMetrics()
+        for _ in range(90):
+            metrics.record("list_profiles", 0.010)
+        for _ in range(10):
+            metrics.record("list_profiles", 1.0)
+
+        latency = metrics.snapshot()["list_profiles"]["latency"]
+        self.assertTrue(0.008 <= latency["p50"] <= 0.016)
+        self.assertTrue(0.5 <= latency["p95"] <= 1.1)
+        self.assertAlmostEqual(latency["mean"], 0.109, places=3)
+
+    def test_prometheus_format(self):
+        """测试 Prometheus 文本格式输出"""
+        metrics = ClientMetrics()
+        metrics.record("open_profile", 0.02, status=200, api_code=101, retries=2)
+        metrics.record("open_profile", 0.03, status=503)
+        text = metrics.to_prometheus()
+
+        self.assertIn('roxy_client_requests_total{endpoint="open_profile"} 2', text)
+        self.assertIn('roxy_client_errors_total{endpoint="open_profile",kind="api",reason="101"} 1', text)
+        self.assertIn('roxy_client_errors_total{endpoint="open_profile",kind="http",reason="503"} 1', text)
+        self.assertIn('roxy_client_retries_total{endpoint="open_profile"} 2', text)
+        self.assertIn('roxy_client_request_duration_seconds_bucket{endpoint="open_profile",le="+Inf"} 2', text)
+
+
+class TestClientInstrumentation(unittest.TestCase):
+    @staticmethod
+    def _response(status, body, retries=0):
+        response = Mock()
+        response.status_code = status
+        response.json.return_value = body
+        response.raw.retries.history = tuple(range(retries))
+        if status >= 400:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status}")
+        else:
+            response.raise_for_status.return_value = None
+        return response
+
+    def test_client_records_per_endpoint(self):
+        """测试客户端按 API_ENDPOINTS 键记录调用、错误码和重试"""
+        client = RoxyAPIClient()
+        responses = [
+            self._response(200, {"code": 0}, retries=1),
+            self._response(200, {"code": 500, "msg": "busy"}),
+            self._response(502, {}),
+            requests.exceptions.ConnectionError("refused"),
+        ]
+        with patch.object(client.session, "request", side_effect=responses):
+            client.health_check()
+            client.open_profile("a")
+            with self.assertRaises(requests.exceptions.HTTPError):
+                client.open_profile("b")
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.close_profile("c")
+
+        snapshot = client.metrics()
+        self.assertEqual(snapshot["health_check"]["calls"], 1)
+        self.assertEqual(snapshot["health_check"]["retries"], 1)
+        self.assertEqual(snapshot["open_profile"]["calls"], 2)
+        self.assertEqual(snapshot["open_profile"]["api_errors"], {"500": 1})
+        self.assertEqual(snapshot["open_profile"]["http_errors"], {502: 1})
+        # HTTP 错误只按状态码计一次，不再同时计为异常
+        self.assertEqual(snapshot["open_profile"]["exceptions"], {})
+        self.assertEqual(snapshot["open_profile"]["errors"], 2)
+        self.assertEqual(snapshot["close_profile"]["exceptions"], {"ConnectionError": 1})
+        self.assertIn("roxy_client_requests_total", client.metrics_prometheus())
+
+    def test_metrics_disabled(self):
+        """测试关闭指标时返回空结果"""
+        client = RoxyAPIClient(enable_metrics=False)
+        with patch.object(client.session, "request", return_value=self._response(200, {"code": 0})):
+            client.health_check()
+        self.assertEqual(client.metrics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
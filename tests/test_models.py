@@ -0,0 +1,55 @@
+import unittest
+from core import RoxyAPIClient, Profile, Workspace, ConnectionInfo
+from core.models import loads
+from testing import FakeRoxyServer
+
+
+class TestModels(unittest.TestCase):
+    def test_projection_keeps_requested_fields(self):
+        """测试解码只保留请求的字段"""
+        row = {"dirId": "abc", "windowName": "w1", "os": "Windows", "proxyInfo": {"proxyMethod": "noproxy"}}
+        profile = Profile.from_api(row, ["dir_id", "window_name"])
+        self.assertEqual(profile.dir_id, "abc")
+        self.assertEqual(profile.window_name, "w1")
+        self.assertIsNone(profile.os)
+        self.assertFalse(hasattr(profile, "__dict__"))
+        with self.assertRaises(ValueError):
+            Profile.decoder(["missing"])
+
+    def test_round_trip(self):
+        """测试记录与 API 字典互相转换"""
+        row = {"dirId": "abc", "windowName": "w1", "labelIds": [1]}
+        profile = Profile.from_api(row)
+        self.assertEqual(profile.to_dict(), row)
+        self.assertEqual(profile, Profile(dir_id="abc", window_name="w1", label_ids=[1]))
+        with self.assertRaises(TypeError):
+            Profile(name="x")
+        self.assertEqual(loads(b'{"code": 0}'), {"code": 0})
+
+
+class TestTypedClient(unittest.TestCase):
+    def test_typed_methods(self):
+        """测试客户端的类型化接口"""
+        with FakeRoxyServer(token=None) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            dir_ids = server.add_profiles(1, 25, prefix="Typed")
+
+            page = client.list_profile_records(1, page=2, size=10, fields=["dir_id"])
+            self.assertEqual([p.dir_id for p in page], dir_ids[10:20])
+            self.assertIsNone(page[0].window_name)
+
+            records = list(client.iter_profile_records(1, fields=["dir_id", "window_name"], page_size=10))
+            self.assertEqual([p.window_name for p in records], [f"Typed_{i}" for i in range(1, 26)])
+
+            self.assertEqual(client.get_workspace_records()[0], Workspace(id=1, name="默认工作区"))
+
+            client.open_profile(dir_ids[0])
+            info = client.get_connection_records([dir_ids[0]])[dir_ids[0]]
+            self.assertIsInstance(info, ConnectionInfo)
+            self.assertEqual(info.dir_id, dir_ids[0])
+            self.assertTrue(info.ws.startswith("ws://"))
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from core import RoxyAPIClient, ProxyPool, Pipeline, Stage
+from tasks.provision import provision_profiles
+from testing import FakeRoxyServer
+
+
+def _sleeper(name, delay):
+    def func(item):
+        time.sleep(delay)
+        item.setdefault("seen", []).append(name)
+        return item
+    return func
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_overlap(self):
+        """测试各阶段重叠执行，总耗时接近最慢阶段而不是各阶段之和"""
+        stages = [Stage("a", _sleeper("a", 0.02)), Stage("b", _sleeper("b", 0.05)), Stage("c", _sleeper("c", 0.02))]
+        start = time.monotonic()
+        results = list(Pipeline(stages, queue_size=2).run({"id": i} for i in range(20)))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(r["id"] for r in results), list(range(20)))
+        self.assertTrue(all(r["ok"] and r["seen"] == ["a", "b", "c"] for r in results))
+        # 串行需要 20 × 0.09 = 1.8 秒，流水线约 20 × 0.05 = 1 秒
+        self.assertLess(elapsed, 1.5)
+
+    def test_stage_concurrency(self):
+        """测试阶段并发数限制同时执行的数量"""
+        active = [0, 0]
+        lock = threading.Lock()
+
+        def slow(item):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return item
+
+        results = list(Pipeline([Stage("fast", lambda item: item), Stage("slow", slow, concurrency=3)]).run(
+            {"id": i} for i in range(30)
+        ))
+        self.assertEqual(len(results), 30)
+        self.assertEqual(active[1], 3)
+
+    def test_failure_handling(self):
+        """测试重试、失败后停止和失败后继续"""
+        attempts = {}
+
+        def flaky(item):
+            attempts[item["id"]] = attempts.get(item["id"], 0) + 1
+            if item["id"] == 1 and attempts[item["id"]] < 2:
+                raise RuntimeError("temporary")
+            if item["id"] == 2:
+                return False
+            return item
+
+        def optional(item):
+            if item["id"] == 3:
+                raise RuntimeError("optional failed")
+            return item
+
+        stages = [
+            Stage("flaky", flaky, retries=1),
+            Stage("optional", optional, on_failure="continue"),
+            Stage("last", _sleeper("last", 0))
+        ]
+        results = {r["id"]: r for r in Pipeline(stages).run({"id": i} for i in range(5))}
+
+        self.assertTrue(results[1]["ok"])
+        self.assertEqual(attempts[1], 2)
+        self.assertEqual(results[2]["failed_stage"], "flaky")
+        self.assertNotIn("seen", results[2])
+        self.assertFalse(results[3]["ok"])
+        self.assertIsNone(results[3]["failed_stage"])
+        self.assertEqual(results[3]["seen"], ["last"])
+        self.assertIn("optional", results[3]["errors"])
+
+    def test_early_exit(self):
+        """测试调用方提前停止迭代时流水线退出"""
+        before = threading.active_count()
+        run = Pipeline([Stage("a", _sleeper("a", 0.01), concurrency=2)], queue_size=2).run({"id": i} for i in range(1000))
+        next(run)
+        run.close()
+        time.sleep(0.5)
+        self.assertLessEqual(threading.active_count(), before)
+
+
+class TestProvision(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token=None, route_latency={"create_profile": 0.02, "modify_profile": 0.02}).start()
+        self.client = RoxyAPIClient(self.server.base_url, "")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_provision_with_proxy_pool(self):
+        """测试开通流水线依次创建、分配代理并随机指纹"""
+        proxies = [{"proxyMethod": "custom", "proxyHost": f"10.0.0.{i}", "proxyPort": 80} for i in range(3)]
+        pool = ProxyPool(proxies, policy="round_robin")
+        results = provision_profiles(
+            9, 1, "P", proxy_pool=pool, client=self.client,
+            concurrency={"create": 2, "proxy": 2, "random_fp": 2}
+        )
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual([r["name"] for r in results], [f"P_{i}" for i in range(1, 10)])
+        self.assertEqual(self.server.stats()["requests"]["random_fingerprint"], 9)
+        for result in results:
+            self.assertEqual(self.server.profiles[1][result["dir_id"]]["proxyInfo"], result["proxy"])
+        self.assertEqual([item["usage"] for item in pool.stats()], [3, 3, 3])
+
+    def test_provision_login_stage(self):
+        """测试登录阶段使用对应账号，失败的配置文件单独报告"""
+        accounts = [{"url": "https://example.com", "username": f"user{i}", "password": "pw"} for i in range(4)]
+        calls = []
+
+        def fake_login(dir_id, client=None, backend=None, **account):
+            calls.append((dir_id, account["username"]))
+            return account["username"] != "user2"
+
+        with patch("tasks.run_login.run_login_task", side_effect=fake_login):
+            results = provision_profiles(4, 1, "L", random_fp=False, accounts=accounts, client=self.client)
+
+        self.assertEqual(sorted(user for _, user in calls), [f"user{i}" for i in range(4)])
+        self.assertEqual([r["ok"] for r in results], [True, True, False, True])
+        self.assertEqual(results[2]["failed_stage"], "login")
+        self.assertIn((results[1]["dir_id"], "user1"), calls)
+
+    def test_unknown_stage(self):
+        """测试未知阶段名报错"""
+        with self.assertRaises(ValueError):
+            provision_profiles(1, 1, client=self.client, concurrency={"bogus": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
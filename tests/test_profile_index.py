@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from core import RoxyAPIClient, ProfileIndex
+from tasks.clear_cache import clear_profile_caches
+from tasks.profile_index import query_profile_index
+from tasks.random_all_fp import random_fingerprints
+from testing import FakeRoxyServer
+
+
+class TestProfileIndex(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token=None, seed=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = ProfileIndex(os.path.join(self.tmp.name, "index.db"))
+        self.client = RoxyAPIClient(self.server.base_url, "", profile_index=self.index)
+
+    def tearDown(self):
+        self.client.close()
+        self.index.close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_sync_is_incremental(self):
+        """测试同步只写入变化的行并删除服务端已不存在的行"""
+        dir_ids = self.server.add_profiles(1, 30, prefix="AutoProfile_")
+        self.server.add_profiles(1, 10, prefix="Manual_")
+        result = self.client.sync_profile_index(1)
+        self.assertEqual((result["added"], result["total"]), (40, 40))
+
+        result = self.client.sync_profile_index(1)
+        self.assertEqual((result["added"], result["updated"], result["removed"]), (0, 0, 0))
+
+        self.server.profiles[1][dir_ids[0]]["os"] = "macOS"
+        del self.server.profiles[1][dir_ids[1]]
+        result = self.client.sync_profile_index(1)
+        self.assertEqual((result["added"], result["updated"], result["removed"]), (0, 1, 1))
+        self.assertEqual(self.index.count(1), 39)
+
+        self.assertTrue(self.client.sync_profile_index(1, max_age=60)["skipped"])
+
+    def test_query_by_prefix_label_and_proxy(self):
+        """测试按名称前缀、标签和代理查询"""
+        proxy = {"proxyMethod": "custom", "proxyHost": "10.0.0.1", "proxyPort": 8080}
+        tagged = self.server.add_profiles(1, 5, prefix="AutoProfile_", labelIds=[7], proxyInfo=proxy)
+        self.server.add_profiles(1, 5, prefix="AutoProfile_")
+        self.server.add_profiles(1, 5, prefix="Other_", labelIds=[7])
+        self.client.sync_profile_index(1)
+
+        self.assertEqual(len(self.index.dir_ids(1, name_prefix="AutoProfile_")), 10)
+        self.assertEqual(sorted(self.index.dir_ids(1, name_prefix="AutoProfile_", label_id=7)), sorted(tagged))
+        self.assertEqual(len(self.index.query(proxy_host="10.0.0.1")), 5)
+        self.assertEqual(self.index.query(1, name_prefix="Other_", limit=1)[0]["labelIds"], [7])
+
+    def test_bulk_tasks_select_from_index(self):
+        """测试启用索引时批量任务从索引选取目标，不再分页遍历工作区"""
+        tagged = self.server.add_profiles(1, 4, prefix="Shop", labelIds=[7])
+        self.server.add_profiles(1, 6, prefix="Other")
+        self.client.sync_profile_index(1)
+        self.server.reset_stats()
+
+        self.assertEqual(sorted(query_profile_index(1, label_id=7, client=self.client)), sorted(tagged))
+        self.assertTrue(random_fingerprints(1, client=self.client, label_id=7, progress_interval=0))
+        summary = clear_profile_caches(1, client=self.client, name_prefix="Shop", skip_open=False)
+        self.assertEqual(summary["cleared"], 4)
+
+        requests = self.server.stats()["requests"]
+        self.assertNotIn("list_profiles", requests)
+        self.assertEqual(requests["random_fingerprint"], 4)
+
+    def test_write_through(self):
+        """测试创建、修改、删除成功后同步更新索引"""
+        response = self.client.create_profile({"workspaceId": 1, "windowName": "AutoProfile_new", "os": "Windows"})
+        dir_id = response["data"]["dirId"]
+        self.assertEqual(self.index.dir_ids(1, name_prefix="AutoProfile_"), [dir_id])
+
+        self.client.modify_profile({"workspaceId": 1, "dirId": dir_id, "labelIds": [3], "os": "Linux"})
+        self.assertEqual(self.index.dir_ids(1, label_id=3, os_name="Linux"), [dir_id])
+
+        self.client.delete_profile(1, [dir_id])
+        self.assertIsNone(self.index.get(dir_id))
+        self.assertEqual(self.index.dir_ids(1, label_id=3), [])
+
+    def test_write_through_errors_not_raised(self):
+        """测试接口成功后索引写入失败不影响返回结果"""
+        self.index.close()
+        response = self.client.create_profile({"workspaceId": 1, "windowName": "AutoProfile_new"})
+        self.assertEqual(response["code"], 0)
+        dir_id = response["data"]["dirId"]
+        self.assertEqual(self.client.modify_profile({"workspaceId": 1, "dirId": dir_id, "os": "Linux"})["code"], 0)
+        self.assertEqual(self.client.delete_profile(1, [dir_id])["code"], 0)
+        self.assertNotIn(dir_id, self.server.profiles[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
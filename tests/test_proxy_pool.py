@@ -0,0 +1,182 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from core import RoxyAPIClient, ProxyPool, load_proxies
+from core.proxy_pool import parse_proxy_line, proxy_key
+from tasks.proxy_pool import assign_pool_proxies
+from testing import FakeRoxyServer
+
+
+def _proxies(count):
+    return [{"proxyMethod": "custom", "proxyHost": f"10.0.{i // 256}.{i % 256}", "proxyPort": 8000} for i in range(count)]
+
+
+class TestProxyLoading(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_parse_proxy_line(self):
+        """测试文本代理格式"""
+        self.assertEqual(parse_proxy_line("1.2.3.4:8080"), {"proxyMethod": "custom", "proxyHost": "1.2.3.4", "proxyPort": 8080})
+        self.assertEqual(
+            parse_proxy_line("1.2.3.4:8080:user:pa"),
+            {"proxyMethod": "auth", "proxyHost": "1.2.3.4", "proxyPort": 8080, "username": "user", "password": "pa"}
+        )
+        self.assertEqual(parse_proxy_line("socks5://u:p%40ss@h:1080")["proxyCategory"], "SOCKS5")
+        self.assertEqual(parse_proxy_line("socks5://u:p%40ss@h:1080")["password"], "p@ss")
+        with self.assertRaises(ValueError):
+            parse_proxy_line("bad")
+
+    def test_load_formats(self):
+        """测试文本、JSON 和 CSV 文件并去重"""
+        text = self._write("p.txt", "# comment\n1.1.1.1:80\n1.1.1.1:80\n2.2.2.2:81:u:p\n")
+        self.assertEqual(len(load_proxies(text)), 2)
+        data = self._write("p.json", json.dumps(_proxies(3)))
+        self.assertEqual(load_proxies(data), _proxies(3))
+        table = self._write("p.csv", "proxyHost,proxyPort,username,password\n3.3.3.3,90,,\n4.4.4.4,91,u,p\n")
+        proxies = load_proxies(table)
+        self.assertEqual(proxies[0], {"proxyHost": "3.3.3.3", "proxyPort": 90, "proxyMethod": "custom"})
+        self.assertEqual(proxies[1]["proxyMethod"], "auth")
+
+
+class TestProxyPool(unittest.TestCase):
+    def test_round_robin(self):
+        """测试轮流分配并跳过停用的代理"""
+        pool = ProxyPool(_proxies(3), policy="round_robin")
+        pool.disable(_proxies(3)[1])
+        result = pool.assign([f"d{i}" for i in range(4)])
+        self.assertEqual([proxy["proxyHost"] for proxy in result.values()], ["10.0.0.0", "10.0.0.2", "10.0.0.0", "10.0.0.2"])
+
+    def test_least_used_balances(self):
+        """测试最少使用策略均匀分配，已分配的配置文件保持原代理"""
+        pool = ProxyPool(_proxies(4), policy="least_used")
+        first = pool.assign([f"d{i}" for i in range(10)])
+        self.assertEqual(sorted(item["usage"] for item in pool.stats()), [2, 2, 3, 3])
+        self.assertEqual(pool.assign(["d0"]), {"d0": first["d0"]})
+        self.assertEqual(sum(item["usage"] for item in pool.stats()), 10)
+
+        pool.release([f"d{i}" for i in range(5)])
+        pool.assign([f"n{i}" for i in range(3)])
+        usage = [item["usage"] for item in pool.stats()]
+        self.assertLessEqual(max(usage) - min(usage), 1)
+
+    def test_sticky_label(self):
+        """测试相同标签组合共用代理"""
+        pool = ProxyPool(_proxies(5), policy="sticky_label")
+        profiles = [{"dirId": f"d{i}", "labelIds": [i % 2, 9]} for i in range(6)] + [{"dirId": "x", "labelIds": []}]
+        result = pool.assign(profiles)
+        self.assertEqual(len({proxy_key(result[f"d{i}"]) for i in range(0, 6, 2)}), 1)
+        self.assertEqual(len({proxy_key(result[f"d{i}"]) for i in range(1, 6, 2)}), 1)
+        self.assertNotEqual(proxy_key(result["d0"]), proxy_key(result["d1"]))
+        self.assertNotIn(proxy_key(result["x"]), {proxy_key(result["d0"]), proxy_key(result["d1"])})
+
+    def test_failure_score_disables(self):
+        """测试成功使失败分数衰减，分数达到上限时停用"""
+        pool = ProxyPool(_proxies(2), max_failures=1.5, failure_decay=0.5)
+        proxy = _proxies(2)[0]
+        self.assertFalse(pool.record_failure(proxy))
+        pool.record_success(proxy)
+        self.assertTrue(pool.record_failure(proxy))
+        self.assertTrue(pool.stats()[0]["disabled"])
+
+        pool.disable(_proxies(2)[1])
+        with self.assertRaises(RuntimeError):
+            pool.assign(["d"])
+        pool.enable(proxy)
+        self.assertEqual(pool.assign(["d"])["d"], proxy)
+
+    def test_assign_100k_profiles(self):
+        """测试 10 万个配置文件的分配耗时"""
+        profiles = [{"dirId": f"d{i}", "labelIds": [i % 500]} for i in range(100000)]
+        for policy in ("round_robin", "least_used", "sticky_label"):
+            pool = ProxyPool(_proxies(5000), policy=policy)
+            start = time.perf_counter()
+            result = pool.assign(profiles)
+            elapsed = time.perf_counter() - start
+            self.assertEqual(len(result), 100000)
+            self.assertLess(elapsed, 1.0, policy)
+
+
+class TestProxyPoolTask(unittest.TestCase):
+    def test_assign_and_rotate(self):
+        """测试接管已有分配、只修改需要变化的配置文件，并轮换停用代理上的配置文件"""
+        proxies = _proxies(3)
+        with FakeRoxyServer(token=None) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            dir_ids = server.add_profiles(1, 9)
+            server.profiles[1][dir_ids[0]]["proxyInfo"] = proxies[2]
+
+            pool = ProxyPool(proxies, policy="least_used")
+            applied = assign_pool_proxies(None, 1, client=client, pool=pool)
+            self.assertEqual(len(applied), 8)
+            self.assertNotIn(dir_ids[0], applied)
+            self.assertEqual([item["usage"] for item in pool.stats()], [3, 3, 3])
+
+            server.reset_stats()
+            self.assertEqual(assign_pool_proxies(None, 1, client=client, pool=pool), {})
+            self.assertEqual(server.stats()["requests"].get("modify_profile", 0), 0)
+
+            for _ in range(3):
+                pool.record_failure(proxies[2])
+            rotated = pool.rotate(client, 1, concurrency=4, batch_size=2)
+            self.assertEqual(len(rotated), 3)
+            for dir_id in dir_ids:
+                self.assertNotEqual(proxy_key(server.profiles[1][dir_id]["proxyInfo"]), proxy_key(proxies[2]))
+            self.assertEqual([item["usage"] for item in pool.stats()], [5, 4, 0])
+            client.close()
+
+    def test_rotate_keeps_label_groups(self):
+        """测试轮换后相同标签组合仍共用一个代理"""
+        proxies = _proxies(4)
+        with FakeRoxyServer(token=None) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            shop = server.add_profiles(1, 3, "Shop", labelIds=[7])
+            other = server.add_profiles(1, 2, "Other", labelIds=[8])
+            pool = ProxyPool(proxies, policy="sticky_label")
+            assign_pool_proxies(None, 1, client=client, pool=pool)
+            pool.disable(pool.proxy_of(shop[0]))
+
+            pool.rotate(client, 1)
+            keys = {proxy_key(server.profiles[1][dir_id]["proxyInfo"]) for dir_id in shop}
+            self.assertEqual(len(keys), 1)
+            self.assertNotIn(proxy_key(pool.proxy_of(other[0])), keys)
+            client.close()
+
+    def test_failed_apply_restores_binding(self):
+        """测试修改失败时恢复原分配，且接口层失败不计入代理失败分数"""
+        proxies = _proxies(2)
+        with FakeRoxyServer(token=None) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            dir_ids = server.add_profiles(1, 4)
+            pool = ProxyPool(proxies, policy="least_used", max_failures=100)
+            assign_pool_proxies(None, 1, client=client, pool=pool)
+            pool.disable(proxies[0])
+
+            server.api_error_rate = 1.0
+            self.assertEqual(pool.rotate(client, 1), {})
+            server.api_error_rate = 0.0
+            stats = pool.stats()
+            self.assertEqual([item["usage"] for item in stats], [2, 2])
+            self.assertEqual([item["failures"] for item in stats], [0, 0])
+            for dir_id in dir_ids:
+                self.assertEqual(proxy_key(pool.proxy_of(dir_id)), proxy_key(server.profiles[1][dir_id]["proxyInfo"]))
+
+            self.assertEqual(len(pool.rotate(client, 1)), 2)
+            self.assertEqual([item["usage"] for item in pool.stats()], [0, 4])
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import socket
+import socketserver
+import struct
+import threading
+import unittest
+from core import RoxyAPIClient, ProxyPool
+from tasks.modify_proxies import modify_profile_proxies
+from tasks.proxy_pool import assign_pool_proxies
+from testing import FakeRoxyServer
+from utils import probe_proxy, probe_proxies, healthy_proxies
+
+TARGET = ("example.com", 443)
+
+
+class _ConnectHandler(socketserver.BaseRequestHandler):
+    """HTTP CONNECT 代理替身，要求 Proxy-Authorization 时校验是否存在"""
+
+    def handle(self):
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = self.request.recv(1024)
+            if not chunk:
+                return
+            data += chunk
+        if self.server.require_auth and b"Proxy-Authorization: Basic" not in data:
+            self.request.sendall(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+        else:
+            self.request.sendall(b"HTTP/1.1 200 Connection established\r\n\r\n")
+
+
+class _Socks5Handler(socketserver.BaseRequestHandler):
+    """SOCKS5 代理替身，支持用户名密码认证"""
+
+    def handle(self):
+        sock = self.request
+        _, count = sock.recv(2)
+        methods = sock.recv(count)
+        if 2 in methods:
+            sock.sendall(b"\x05\x02")
+            _, ulen = sock.recv(2)
+            user = sock.recv(ulen)
+            plen = sock.recv(1)[0]
+            password = sock.recv(plen)
+            sock.sendall(b"\x01\x00" if (user, password) == (b"u", b"p") else b"\x01\x01")
+        else:
+            sock.sendall(b"\x05\x00")
+        header = sock.recv(5)
+        sock.recv(header[4] + 2)
+        sock.sendall(b"\x05\x00\x00\x01" + socket.inet_aton("127.0.0.1") + struct.pack(">H", 1080))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # 默认的 backlog 为 5，并发检测时会拒绝连接
+    request_queue_size = 128
+
+
+def _serve(handler, **attrs):
+    server = _Server(("127.0.0.1", 0), handler)
+    for key, value in attrs.items():
+        setattr(server, key, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _proxy(port, **extra):
+    return dict({"proxyMethod": "custom", "proxyHost": "127.0.0.1", "proxyPort": port}, **extra)
+
+
+class TestProxyProbe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.connect = _serve(_ConnectHandler, require_auth=False)
+        cls.connect_auth = _serve(_ConnectHandler, require_auth=True)
+        cls.socks = _serve(_Socks5Handler)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in (cls.connect, cls.connect_auth, cls.socks):
+            server.shutdown()
+            server.server_close()
+
+    def test_tcp_check(self):
+        """测试 TCP 连接检测"""
+        alive = probe_proxy(_proxy(self.connect.server_address[1]), "tcp")
+        self.assertTrue(alive["alive"])
+        self.assertGreater(alive["latency"], 0)
+        dead = probe_proxy(_proxy(_closed_port()), "tcp", timeout=1)
+        self.assertFalse(dead["alive"])
+        self.assertTrue(dead["error"])
+
+    def test_http_connect_check(self):
+        """测试 HTTP CONNECT 握手及认证"""
+        port = self.connect_auth.server_address[1]
+        self.assertFalse(probe_proxy(_proxy(port), "connect", target=TARGET)["alive"])
+        with_auth = _proxy(port, proxyMethod="auth", username="u", password="p", proxyCategory="HTTP")
+        self.assertTrue(probe_proxy(with_auth, target=TARGET)["alive"])
+
+    def test_socks5_check(self):
+        """测试 SOCKS5 握手及用户名密码认证"""
+        port = self.socks.server_address[1]
+        self.assertTrue(probe_proxy(_proxy(port), "socks5", target=TARGET)["alive"])
+        self.assertTrue(probe_proxy(_proxy(port, username="u", password="p"), "socks5", target=TARGET)["alive"])
+        self.assertFalse(probe_proxy(_proxy(port, username="u", password="x"), "socks5", target=TARGET)["alive"])
+        # 对 HTTP 代理做 SOCKS5 握手应失败而不是挂起
+        self.assertFalse(probe_proxy(_proxy(self.connect.server_address[1]), "socks5", timeout=1, target=TARGET)["alive"])
+
+    def test_probe_many_concurrently(self):
+        """测试并发检测保持输入顺序，健康代理按延迟排序"""
+        good = _proxy(self.connect.server_address[1])
+        bad = _proxy(_closed_port())
+        proxies = [good if i % 3 else bad for i in range(60)]
+        results = probe_proxies(proxies, "connect", timeout=1, concurrency=20, target=TARGET)
+        self.assertEqual([r["alive"] for r in results], [bool(i % 3) for i in range(60)])
+        healthy = healthy_proxies(results)
+        self.assertEqual(len(healthy), 40)
+        self.assertNotIn(bad, healthy)
+
+    def test_only_healthy_proxies_assigned(self):
+        """测试修改任务只使用可用代理"""
+        good = _proxy(self.connect.server_address[1])
+        bad = _proxy(_closed_port())
+        with FakeRoxyServer(token=None) as server:
+            client = RoxyAPIClient(server.base_url, "")
+            dir_ids = server.add_profiles(1, 6)
+
+            self.assertFalse(modify_profile_proxies(dir_ids, bad, 1, client=client, probe=True, probe_check="tcp"))
+            self.assertEqual(server.stats()["requests"].get("modify_profile", 0), 0)
+
+            pool = ProxyPool([bad, good])
+            assigned = assign_pool_proxies("", 1, concurrency=3, probe=True, probe_check="tcp", client=client, pool=pool)
+            self.assertEqual(set(assigned), set(dir_ids))
+            self.assertTrue(all(server.profiles[1][d]["proxyInfo"] == good for d in dir_ids))
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import time
+import unittest
+from core import RoxyAPIClient
+from tasks.random_all_fp import random_fingerprints, _timestamp
+from testing import FakeRoxyServer
+
+
+class TestRandomFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token=None, route_latency={"random_fingerprint": 0.02}).start()
+        self.client = RoxyAPIClient(self.server.base_url, "")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_concurrent_refresh(self):
+        """测试并发遍历整个工作区，在途请求数受并发数限制"""
+        self.server.add_profiles(1, 120)
+        start = time.monotonic()
+        self.assertTrue(random_fingerprints(1, client=self.client, concurrency=8, progress_interval=0))
+        elapsed = time.monotonic() - start
+
+        stats = self.server.stats()
+        self.assertEqual(stats["requests"]["random_fingerprint"], 120)
+        self.assertLessEqual(stats["peak_in_flight"], 8)
+        # 串行至少需要 120 × 0.02 = 2.4 秒
+        self.assertLess(elapsed, 1.5)
+
+    def test_filters(self):
+        """测试按标签、名称前缀和更新时间筛选"""
+        labelled = self.server.add_profiles(1, 5, "Shop", labelIds=[7])
+        self.server.add_profiles(1, 5, "Other")
+        stale = self.server.add_profiles(1, 3, "Old")
+        for dir_id in stale:
+            self.server.profiles[1][dir_id]["updateTime"] = time.time() - 7200
+
+        self.assertTrue(random_fingerprints(1, client=self.client, label_id=7, progress_interval=0))
+        self.assertEqual(self.server.stats()["requests"]["random_fingerprint"], len(labelled))
+
+        self.server.reset_stats()
+        random_fingerprints(1, client=self.client, name_prefix="Other", progress_interval=0)
+        self.assertEqual(self.server.stats()["requests"]["random_fingerprint"], 5)
+
+        self.server.reset_stats()
+        random_fingerprints(1, client=self.client, older_than=3600, progress_interval=0)
+        self.assertEqual(self.server.stats()["requests"]["random_fingerprint"], len(stale))
+
+        with self.assertRaises(ValueError):
+            random_fingerprints(1, labelled, client=self.client, label_id=7)
+
+    def test_failures_reported(self):
+        """测试部分失败时返回 False 且其余配置文件继续处理"""
+        dir_ids = self.server.add_profiles(1, 10)
+        self.assertFalse(random_fingerprints(1, dir_ids + ["missing"], client=self.client, concurrency=4))
+        self.assertEqual(self.server.stats()["requests"]["random_fingerprint"], 11)
+
+    def test_timestamp(self):
+        """测试时间格式解析"""
+        self.assertEqual(_timestamp(1700000000), 1700000000.0)
+        self.assertEqual(_timestamp(1700000000000), 1700000000.0)
+        self.assertEqual(_timestamp("1700000000"), 1700000000.0)
+        self.assertIsNotNone(_timestamp("2024-01-02 03:04:05"))
+        self.assertIsNone(_timestamp("later"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import time
+import unittest
+from utils import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_unlimited(self):
+        """测试 rate 为 0 时不限速"""
+        bucket = TokenBucket(0)
+        start = time.monotonic()
+        for _ in range(1000):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_burst_then_throttle(self):
+        """测试突发容量用尽后按速率放行"""
+        bucket = TokenBucket(rate=50, capacity=5)
+        for _ in range(5):
+            self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.07)
+
+
+if __name__ == "__main__":
+    unittest.main()
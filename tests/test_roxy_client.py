@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch, Mock
-from core import RoxyAPIClient
+from core import RoxyAPIClient, RoxyAPIError, get_client, close_all_clients
 from config.settings import API_ENDPOINTS
 
 class TestRoxyAPIClient(unittest.TestCase):
@@ -75,6 +75,62 @@ class TestRoxyAPIClient(unittest.TestCase):
         close_response = self.client.close_profile(self.test_dir_id)
         self.assertEqual(close_response["code"], 0)
 
+    def _fake_pages(self, total, with_total=True):
+        """按页切分 total 条假数据的 list_profiles 替身"""
+        calls = []
+
+        def list_profiles(workspace_id, sort_nums="", page=1, size=20):
+            calls.append(page)
+            start = (page - 1) * size
+            rows = [{"dirId": f"d{i}"} for i in range(start, min(start + size, total))]
+            data = {"list": rows}
+            if with_total:
+                data["total"] = total
+            return {"code": 0, "data": data}
+
+        return list_profiles, calls
+
+    def test_iter_profiles_all_pages(self):
+        """测试分页遍历返回全部配置文件且不越过最后一页"""
+        for prefetch in (0, 1, 3):
+            fake, calls = self._fake_pages(45)
+            with patch.object(self.client, "list_profiles", side_effect=fake):
+                ids = [p["dirId"] for p in self.client.iter_profiles(1, page_size=10, prefetch=prefetch)]
+            self.assertEqual(ids, [f"d{i}" for i in range(45)])
+            self.assertEqual(sorted(calls), [1, 2, 3, 4, 5])
+
+    def test_iter_profiles_without_total(self):
+        """测试响应不含 total 时以短页判断结束"""
+        fake, calls = self._fake_pages(20, with_total=False)
+        with patch.object(self.client, "list_profiles", side_effect=fake):
+            ids = [p["dirId"] for p in self.client.iter_profiles(1, page_size=10, prefetch=2)]
+        self.assertEqual(len(ids), 20)
+
+    def test_iter_profiles_error(self):
+        """测试分页返回错误码时抛出 RoxyAPIError"""
+        with patch.object(self.client, "list_profiles", return_value={"code": 1, "msg": "fail"}):
+            with self.assertRaises(RoxyAPIError):
+                list(self.client.iter_profiles(1))
+
+    def test_pool_settings(self):
+        """测试连接池参数作用于 HTTPAdapter"""
+        client = RoxyAPIClient(pool_connections=4, pool_maxsize=64)
+        adapter = client.session.get_adapter("http://127.0.0.1")
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 64)
+        client.close()
+
+    def test_shared_client_registry(self):
+        """测试共享客户端按 (base_url, token) 复用"""
+        try:
+            first = get_client("http://127.0.0.1:1", "a")
+            self.assertIs(get_client("http://127.0.0.1:1", "a"), first)
+            self.assertIsNot(get_client("http://127.0.0.1:1", "b"), first)
+        finally:
+            close_all_clients()
+        self.assertIsNot(get_client("http://127.0.0.1:1", "a"), first)
+        close_all_clients()
+
     def test_api_endpoints_mapping(self):
         """测试所有API端点是否都有对应的方法"""
         method_mapping = {
@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from core import RoxyAPIClient, CronSchedule, IntervalSchedule, Job, Scheduler
+from core.scheduler import parse_interval
+from tasks.scheduler import build_jobs, run_scheduler, _cleanup_stale_job
+from testing import FakeRoxyServer
+
+
+def _ts(*args) -> float:
+    return datetime(*args).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSchedules(unittest.TestCase):
+    def test_parse_interval(self):
+        """测试间隔格式"""
+        self.assertEqual(parse_interval("30s"), 30)
+        self.assertEqual(parse_interval("15m"), 900)
+        self.assertEqual(parse_interval("2h"), 7200)
+        self.assertEqual(parse_interval("1d"), 86400)
+        self.assertEqual(parse_interval(5), 5)
+        for bad in ("0", "abc", "5w"):
+            with self.assertRaises(ValueError):
+                parse_interval(bad)
+
+    def test_cron_next_after(self):
+        """测试 cron 下次触发时间"""
+        start = _ts(2026, 1, 1, 10, 7, 30)
+        self.assertEqual(CronSchedule("*/15 * * * *").next_after(start), _ts(2026, 1, 1, 10, 15))
+        self.assertEqual(CronSchedule("0 3 * * *").next_after(start), _ts(2026, 1, 2, 3, 0))
+        # 2026-01-01 为周四，下一个周日为 01-04
+        self.assertEqual(CronSchedule("30 4 * * 0").next_after(start), _ts(2026, 1, 4, 4, 30))
+        self.assertEqual(CronSchedule("0 0 1 3 *").next_after(start), _ts(2026, 3, 1, 0, 0))
+        self.assertEqual(CronSchedule("0 9-17/4 * * 1-5").next_after(start), _ts(2026, 1, 1, 13, 0))
+        # 日和周同时指定时满足任一即可
+        self.assertEqual(CronSchedule("0 0 15 * 6").next_after(start), _ts(2026, 1, 3, 0, 0))
+
+    def test_cron_invalid(self):
+        """测试非法 cron 表达式"""
+        for expr in ("* * * *", "60 * * * *", "0 0 31 2 *"):
+            with self.assertRaises(ValueError):
+                CronSchedule(expr).next_after(time.time())
+
+
+class TestScheduler(unittest.TestCase):
+    def test_runs_due_jobs(self):
+        """测试到期任务被执行并计划下一次"""
+        clock = FakeClock()
+        ran = []
+        scheduler = Scheduler([Job("a", lambda: ran.append("a"), IntervalSchedule(10))], clock=clock)
+        self.assertEqual(scheduler.run_pending(), [])
+        clock.now += 10
+        self.assertEqual(scheduler.run_pending(), ["a"])
+        scheduler.stop()
+        self.assertEqual(ran, ["a"])
+        self.assertEqual(scheduler.jobs[0].next_run, clock.now + 10)
+
+    def test_no_overlap(self):
+        """测试上一次未结束时跳过本次执行"""
+        clock = FakeClock()
+        release = threading.Event()
+        scheduler = Scheduler([Job("slow", release.wait, IntervalSchedule(1))], clock=clock)
+        clock.now += 1
+        self.assertEqual(scheduler.run_pending(), ["slow"])
+        clock.now += 1
+        self.assertEqual(scheduler.run_pending(), [])
+        release.set()
+        scheduler.stop()
+        status = scheduler.status()[0]
+        self.assertEqual((status["runs"], status["skipped"]), (1, 1))
+
+    def test_failures_recorded(self):
+        """测试任务异常被记录且不影响后续执行"""
+        clock = FakeClock()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        scheduler = Scheduler([Job("bad", fail, IntervalSchedule(1), run_at_start=True)], clock=clock)
+        scheduler.run_pending()
+        time.sleep(0.1)
+        clock.now += 1
+        scheduler.run_pending()
+        scheduler.stop()
+        status = scheduler.status()[0]
+        self.assertEqual((status["runs"], status["failures"], status["last_error"]), (2, 2, "boom"))
+
+    def test_jitter_spreads_jobs(self):
+        """测试抖动使同一计划的任务错开"""
+        clock = FakeClock()
+        jobs = [Job(f"j{i}", lambda: None, IntervalSchedule(60), jitter=30) for i in range(10)]
+        scheduler = Scheduler(jobs, clock=clock, seed=1)
+        times = [job.next_run for job in scheduler.jobs]
+        scheduler.stop()
+        self.assertTrue(all(clock.now + 60 <= t < clock.now + 90 for t in times))
+        self.assertGreater(len(set(times)), 5)
+
+    def test_jitter_does_not_accumulate(self):
+        """测试固定间隔的计划时间不随抖动漂移"""
+        clock = FakeClock()
+        scheduler = Scheduler([Job("j", lambda: None, IntervalSchedule(60), jitter=30)], clock=clock, seed=1)
+        job = scheduler.jobs[0]
+        for i in range(1, 6):
+            self.assertTrue(1000 + 60 * i <= job.next_run < 1000 + 60 * i + 30)
+            clock.now = job.next_run
+            self.assertEqual(scheduler.run_pending(), ["j"])
+            time.sleep(0.05)
+        scheduler.stop()
+
+
+class TestSchedulerTasks(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRoxyServer(token=None).start()
+        self.client = RoxyAPIClient(self.server.base_url, "")
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_build_jobs(self):
+        """测试按工作区生成任务实例"""
+        config = {
+            "workspaces": [1, 2],
+            "jobs": [
+                {"task": "health_check", "every": "5m"},
+                {"name": "fp", "task": "random_fp", "cron": "0 3 * * *", "workspaces": [3]},
+                {"task": "clear_cache", "every": "1d"}
+            ]
+        }
+        names = [job.name for job in build_jobs(config, self.client)]
+        self.assertEqual(names, ["health_check", "fp@3", "clear_cache@1", "clear_cache@2"])
+        with self.assertRaises(ValueError):
+            build_jobs({"jobs": [{"task": "unknown", "every": 1}]}, self.client)
+        with self.assertRaises(ValueError):
+            build_jobs({"jobs": [{"task": "health_check"}]}, self.client)
+
+    def test_cleanup_stale(self):
+        """测试删除过期配置文件，跳过正在打开的"""
+        old = self.server.add_profiles(1, 4, "Auto")
+        self.server.add_profiles(1, 2, "Auto")
+        self.server.add_profiles(1, 2, "Keep")
+        for dir_id in old:
+            self.server.profiles[1][dir_id]["updateTime"] = time.time() - 10 * 86400
+        self.client.open_profile(old[0])
+
+        config = {"jobs": [{"task": "cleanup_stale", "every": 1, "workspaces": [1],
+                            "params": {"older_than": "7d", "name_prefix": "Auto"}}]}
+        build_jobs(config, self.client)[0].func()
+        self.assertEqual(set(old) & set(self.server.profiles[1]), {old[0]})
+        self.assertEqual(len(self.server.profiles[1]), 5)
+
+    def test_cleanup_stale_safety(self):
+        """测试无更新时间的配置文件不删除、分批删除，以及连接信息获取失败时不删除"""
+        old = self.server.add_profiles(1, 5, "Auto")
+        unknown = self.server.add_profiles(1, 2, "Auto")
+        for dir_id in old:
+            self.server.profiles[1][dir_id]["updateTime"] = time.time() - 10 * 86400
+        for dir_id in unknown:
+            self.server.profiles[1][dir_id].pop("updateTime", None)
+            self.server.profiles[1][dir_id].pop("createTime", None)
+
+        self.client.get_connection_info = lambda *args: {"code": 500, "msg": "error"}
+        with self.assertRaises(RuntimeError):
+            _cleanup_stale_job(self.client, 1, "7d")
+        del self.client.get_connection_info
+        self.assertEqual(len(self.server.profiles[1]), 7)
+
+        self.server.reset_stats()
+        _cleanup_stale_job(self.client, 1, "7d", batch_size=2)
+        self.assertEqual(set(self.server.profiles[1]), set(unknown))
+        self.assertEqual(self.server.stats()["requests"]["delete_profile"], 3)
+
+    def test_run_scheduler(self):
+        """测试常驻运行计划文件中的任务，任务复用同一个客户端"""
+        self.server.add_profiles(1, 3)
+        path = os.path.join(self.tmp, "schedule.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"workspaces": [1], "jobs": [
+                {"task": "health_check", "every": "0.1", "jitter": 0, "run_at_start": True},
+                {"task": "clear_cache", "every": 60, "jitter": 0, "run_at_start": True}
+            ]}, f)
+
+        stop = threading.Event()
+        threading.Timer(0.5, stop.set).start()
+        self.assertTrue(run_scheduler(path, client=self.client, stop_event=stop))
+
+        requests = self.server.stats()["requests"]
+        self.assertGreaterEqual(requests["health_check"], 3)
+        self.assertEqual(requests["clear_local_cache"], 1)
+        self.assertEqual(requests["clear_server_cache"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from core import BrowserSessionPool
+
+
+class TestBrowserSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.client = Mock()
+        self.client.open_profile.return_value = {"code": 0}
+        self.client.close_profile.return_value = {"code": 0}
+        self.client.get_connection_info.side_effect = lambda ids: {
+            "code": 0,
+            "data": {str(ids[0]): {"http": f"127.0.0.1:{ids[0]}"}}
+        }
+        self.alive = {}
+        self.factory = Mock(side_effect=lambda address: Mock(address=address))
+
+    def _pool(self, **kwargs):
+        kwargs.setdefault("idle_timeout", 0)
+        return BrowserSessionPool(
+            self.client,
+            driver_factory=self.factory,
+            health_check=lambda driver: self.alive.get(driver.address, True),
+            **kwargs
+        )
+
+    def test_reuse_skips_cold_start(self):
+        """测试同一配置文件连续租借时复用窗口"""
+        with self._pool(max_sessions=2) as pool:
+            with pool.lease("a") as first:
+                pass
+            with pool.lease("a") as second:
+                self.assertIs(second.driver, first.driver)
+        self.assertEqual(self.client.open_profile.call_count, 1)
+        self.client.close_profile.assert_called_once_with("a")
+
+    def test_evicts_least_recently_used(self):
+        """测试名额用尽时关闭最久未用的空闲窗口"""
+        with self._pool(max_sessions=2) as pool:
+            for dir_id in ("a", "b", "a", "c"):
+                with pool.lease(dir_id):
+                    pass
+            self.assertEqual(len(pool), 2)
+            self.client.close_profile.assert_called_once_with("b")
+
+    def test_unhealthy_session_reopened(self):
+        """测试健康检查失败时重新打开窗口"""
+        with self._pool() as pool:
+            with pool.lease("a"):
+                pass
+            self.alive["127.0.0.1:a"] = False
+            with pool.lease("a"):
+                pass
+        self.assertEqual(self.client.open_profile.call_count, 2)
+
+    def test_busy_session_waits(self):
+        """测试同一窗口同时只租借给一个任务"""
+        with self._pool() as pool:
+            session = pool.acquire("a")
+            with self.assertRaises(TimeoutError):
+                pool.acquire("a", timeout=0.05)
+            threading.Timer(0.05, pool.release, args=(session,)).start()
+            self.assertIs(pool.acquire("a", timeout=2), session)
+            pool.release(session)
+
+    def test_reopen_waits_for_pending_close(self):
+        """测试窗口关闭完成前，同一配置文件的租借等待而不是立即重新打开"""
+        events = []
+        closing = threading.Event()
+        finish_close = threading.Event()
+
+        def slow_close(dir_id):
+            closing.set()
+            finish_close.wait(2)
+            events.append(("close", dir_id))
+            return {"code": 0}
+
+        self.client.close_profile.side_effect = slow_close
+        self.client.open_profile.side_effect = lambda dir_id: events.append(("open", dir_id)) or {"code": 0}
+        with self._pool() as pool:
+            with pool.lease("a"):
+                pass
+            pool._sessions["a"].last_used -= 100
+            pool.idle_timeout = 1
+            reaper = threading.Thread(target=pool.reap_idle)
+            reaper.start()
+            self.assertTrue(closing.wait(2))
+
+            leased = []
+            waiter = threading.Thread(target=lambda: leased.append(pool.acquire("a", timeout=5)))
+            waiter.start()
+            time.sleep(0.1)
+            self.assertEqual(leased, [])
+            finish_close.set()
+            reaper.join()
+            waiter.join()
+            pool.release(leased[0])
+            self.assertEqual(events, [("open", "a"), ("close", "a"), ("open", "a")])
+            finish_close.set()
+
+    def test_idle_timeout(self):
+        """测试空闲超时的窗口被后台线程关闭"""
+        pool = self._pool(idle_timeout=0.1)
+        with pool.lease("a"):
+            pass
+        deadline = time.monotonic() + 2
+        while len(pool) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(len(pool), 0)
+        self.client.close_profile.assert_called_once_with("a")
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
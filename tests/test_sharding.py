@@ -0,0 +1,106 @@
+import unittest
+from config.settings import parse_api_nodes
+from core import ProfileIndex, RoxyAPIClient, ShardedRoxyClient
+from tasks.create_profiles import create_multiple_profiles
+from tasks.modify_proxies import modify_profile_proxies
+from testing import FakeRoxyServer
+
+
+class TestShardedClient(unittest.TestCase):
+    def setUp(self):
+        self.servers = [FakeRoxyServer(token=None, latency=0.01, seed=i).start() for i in range(3)]
+        self.clients = [RoxyAPIClient(server.base_url, "") for server in self.servers]
+        self.sharded = ShardedRoxyClient(clients=self.clients)
+
+    def tearDown(self):
+        self.sharded.close()
+        for client in self.clients:
+            client.close()
+        for server in self.servers:
+            server.stop()
+
+    def test_creates_spread_and_operations_pinned(self):
+        """测试创建分散到各节点，后续操作发往归属节点"""
+        created = create_multiple_profiles(30, 1, "Shard", concurrency=6, client=self.sharded)
+        self.assertEqual(len(created), 30)
+        counts = [len(server.profiles[1]) for server in self.servers]
+        self.assertEqual(sum(counts), 30)
+        self.assertTrue(all(count >= 5 for count in counts), counts)
+
+        dir_id = created[0]
+        owner = next(s for s in self.servers if dir_id in s.profiles[1])
+        self.assertEqual(self.sharded.open_profile(dir_id)["code"], 0)
+        self.assertIn(dir_id, owner.opened)
+        info = self.sharded.get_connection_info(created[:6])
+        self.assertEqual(list(info["data"]), [dir_id])
+
+        self.assertTrue(modify_profile_proxies(created, {"proxyMethod": "noproxy"}, 1, client=self.sharded, concurrency=6))
+        self.assertEqual(self.sharded.delete_profile(1, created)["code"], 0)
+        self.assertEqual(sum(len(server.profiles[1]) for server in self.servers), 0)
+
+    def test_unknown_owner_discovered(self):
+        """测试未记录归属的配置文件通过扫描各节点找到"""
+        dir_id = self.servers[2].add_profiles(1, 1)[0]
+        self.assertEqual(self.sharded.random_fingerprint(1, dir_id)["code"], 0)
+        self.assertIs(self.sharded.owner_of(dir_id), self.clients[2])
+        with self.assertRaises(KeyError):
+            self.sharded.owner_of("missing")
+
+    def test_unknown_ids_return_error(self):
+        """测试未知 dirId 返回 code 为 -1 的响应，且短时间内不重复扫描"""
+        known = self.servers[0].add_profiles(1, 2)
+        self.assertEqual(self.sharded.open_profile("missing")["code"], -1)
+        for server in self.servers:
+            server.reset_stats()
+        self.assertEqual(self.sharded.close_profile("missing2")["code"], -1)
+        response = self.sharded.delete_profile(1, known + ["missing"])
+        self.assertEqual(response["code"], -1)
+        self.assertEqual(len(self.servers[0].profiles[1]), 0)
+        self.assertTrue(all("workspaces" not in server.stats()["requests"] for server in self.servers))
+
+    def test_owners_persisted(self):
+        """测试归属写入索引，新的客户端无需扫描即可路由"""
+        index = ProfileIndex(":memory:")
+        sharded = ShardedRoxyClient(clients=self.clients, owner_index=index)
+        created = create_multiple_profiles(6, 1, "Persist", concurrency=3, client=sharded)
+        sharded.close()
+        self.assertEqual(len(index.owners()), 6)
+
+        restored = ShardedRoxyClient(clients=self.clients, owner_index=index)
+        for server in self.servers:
+            server.reset_stats()
+        self.assertEqual(restored.random_fingerprint(1, created[0])["code"], 0)
+        self.assertTrue(all("list_profiles" not in server.stats()["requests"] for server in self.servers))
+        self.assertEqual(restored.delete_profile(1, created)["code"], 0)
+        self.assertEqual(index.owners(), {})
+        restored.close()
+        index.close()
+
+    def test_list_passthroughs(self):
+        """测试列表、账号和标签接口合并各节点结果"""
+        for server in self.servers:
+            server.add_profiles(1, 3)
+        response = self.sharded.list_profiles(1, page=1, size=2)
+        self.assertEqual(response["data"]["total"], 9)
+        self.assertEqual(len(response["data"]["rows"]), 6)
+        self.assertEqual(self.sharded.get_accounts(1)["code"], 0)
+        self.assertEqual(self.sharded.get_labels(1)["code"], 0)
+
+    def test_iter_profiles_merges_nodes(self):
+        """测试遍历合并所有节点并记录归属"""
+        for i, server in enumerate(self.servers):
+            server.add_profiles(1, 50 * (i + 1))
+        profiles = list(self.sharded.iter_profiles(1, page_size=20))
+        self.assertEqual(len(profiles), 300)
+        self.assertEqual([node["owned"] for node in self.sharded.node_stats()], [50, 100, 150])
+
+    def test_parse_api_nodes(self):
+        """测试解析多节点配置"""
+        nodes = parse_api_nodes("tok1@10.0.0.1:50000, 10.0.0.2")
+        self.assertEqual(nodes[0]["base_url"], "http://10.0.0.1:50000")
+        self.assertEqual(nodes[0]["token"], "tok1")
+        self.assertEqual(nodes[1]["host"], "10.0.0.2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import os
+import subprocess
+import sys
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, MagicMock
 from tasks.create_profiles import create_multiple_profiles
 from tasks.modify_proxies import modify_profile_proxies
 from tasks.random_all_fp import random_fingerprints
@@ -29,6 +32,19 @@ class TestTasks(unittest.TestCase):
         self.assertEqual(len(result), 2)
         self.assertEqual(mock_instance.create_profile.call_count, 2)
 
+    def test_create_multiple_profiles_concurrent(self):
+        """测试并发批量创建时编号确定且结果有序"""
+        mock_instance = Mock()
+        mock_instance.create_profile.side_effect = lambda data: {
+            "code": 0 if data["windowName"] != "P_3" else 1,
+            "data": {"dirId": f"id_{data['windowName']}"}
+        }
+
+        result = create_multiple_profiles(6, self.test_workspace_id, "P", concurrency=4, client=mock_instance)
+        self.assertEqual(result, ["id_P_1", "id_P_2", "id_P_4", "id_P_5", "id_P_6"])
+        names = sorted(c.args[0]["windowName"] for c in mock_instance.create_profile.call_args_list)
+        self.assertEqual(names, sorted(f"P_{i}" for i in range(1, 7)))
+
     @patch('core.RoxyAPIClient')
     def test_modify_proxies(self, mock_client):
         """测试修改代理设置"""
@@ -73,6 +89,15 @@ class TestTasks(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(mock_instance.random_fingerprint.call_count, 2)
 
+    def test_random_fingerprints_streams_workspace(self):
+        """测试未指定配置文件时遍历整个工作区"""
+        mock_instance = Mock()
+        mock_instance.iter_profiles.return_value = iter([{"dirId": f"d{i}"} for i in range(45)])
+        mock_instance.random_fingerprint.return_value = self.mock_success_response
+
+        self.assertTrue(random_fingerprints(self.test_workspace_id, client=mock_instance))
+        self.assertEqual(mock_instance.random_fingerprint.call_count, 45)
+
     @patch('core.RoxyAPIClient')
     @patch('selenium.webdriver.Chrome')
     @patch('selenium.webdriver.support.ui.WebDriverWait')
@@ -115,5 +140,56 @@ class TestTasks(unittest.TestCase):
         mock_instance.open_profile.assert_called_once()
         mock_instance.get_connection_info.assert_called_once()
 
+    @patch('tasks.run_login.WebDriverWait')
+    def test_run_login_with_session_pool(self, mock_wait):
+        """测试使用会话池登录时不关闭窗口"""
+        pool = MagicMock()
+        session = Mock()
+        pool.lease.return_value.__enter__.return_value = session
+
+        result = run_login_task(
+            self.test_dir_id, "https://example.com", "u", "p",
+            "#username", "#password", "#submit", "#success",
+            pool=pool
+        )
+
+        self.assertTrue(result)
+        pool.lease.assert_called_once_with(self.test_dir_id)
+        session.driver.get.assert_called_once_with("https://example.com")
+
+    @patch('tasks.run_login.WebDriverWait')
+    @patch('tasks.run_login.webdriver.Chrome')
+    def test_run_login_quits_selenium_driver(self, mock_chrome, mock_wait):
+        """测试 Selenium 登录失败时退出 driver、关闭窗口，并可抛出失败原因"""
+        client = Mock()
+        client.open_profile.return_value = self.mock_success_response
+        client.get_connection_info.return_value = {
+            "code": 0, "data": {self.test_dir_id: {"http": "127.0.0.1:1234"}}
+        }
+        mock_wait.return_value.until.side_effect = RuntimeError("元素未出现")
+        args = (self.test_dir_id, "https://example.com", "u", "p", "#username", "#password", "#submit", "#success")
+
+        self.assertFalse(run_login_task(*args, client=client))
+        mock_chrome.return_value.quit.assert_called_once()
+        client.close_profile.assert_called_once_with(self.test_dir_id)
+
+        with self.assertRaisesRegex(RuntimeError, "元素未出现"):
+            run_login_task(*args, client=client, raise_on_error=True)
+        self.assertEqual(mock_chrome.return_value.quit.call_count, 2)
+
+    def test_lazy_task_registry(self):
+        """测试导入 main 不加载 selenium，按需加载所选任务"""
+        from tasks import load_task, CLI_TASKS
+        self.assertIs(load_task("create"), create_multiple_profiles)
+        self.assertEqual(set(CLI_TASKS), {"create", "modify_proxy", "login", "random_fp", "login_farm", "assign_proxy", "provision", "schedule", "clear_cache", "index_sync", "index_query"})
+
+        code = (
+            "import sys, main; from tasks import load_task; load_task('create'); "
+            "print(any(m.startswith('selenium') for m in sys.modules), 'aiohttp' in sys.modules)"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.split(), ["False", "False"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
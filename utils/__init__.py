@@ -6,6 +6,8 @@ from .helpers import (
     parse_connection_info,
     batch_process
 )
+from .rate_limit import TokenBucket
+from .proxy_probe import probe_proxy, probe_proxies, healthy_proxies
 
 __all__ = [
     'get_logger',
@@ -13,5 +15,9 @@ __all__ = [
     'validate_proxy_config',
     'format_browser_args',
     'parse_connection_info',
-    'batch_process'
+    'batch_process',
+    'TokenBucket',
+    'probe_proxy',
+    'probe_proxies',
+    'healthy_proxies'
 ]
\ No newline at end of file
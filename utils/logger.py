@@ -1,11 +1,9 @@
-from loguru import logger
 import sys
 import os
+import threading
 
-# 创建日志目录（使用绝对路径）
+# 日志目录（使用绝对路径）
 log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
 
 # 配置日志格式
 log_format = (
@@ -15,29 +13,66 @@ log_format = (
     "<level>{message}</level>"
 )
 
-# 移除默认的处理器
-logger.remove()
+_configured = False
+_configure_lock = threading.Lock()
 
-# 添加控制台处理器
-logger.add(
-    sys.stderr,
-    format=log_format,
-    level="INFO",
-    enqueue=True
-)
 
-# 添加文件处理器
-# 修改文件处理器的路径
-logger.add(
-    os.path.join(log_dir, "roxy_{time:YYYY-MM-DD}.log"),
-    format=log_format,
-    level="DEBUG",
-    rotation="00:00",
-    retention="30 days",
-    enqueue=True,
-    encoding="utf-8"
-)
+def _configure():
+    """首次写日志时再创建日志目录并安装处理器，避免拖慢命令行启动"""
+    global _configured
+    from loguru import logger
+
+    if _configured:
+        return logger
+    with _configure_lock:
+        if _configured:
+            return logger
+
+        # 创建日志目录
+        if not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+
+        # 移除默认的处理器
+        logger.remove()
+
+        # 添加控制台处理器
+        logger.add(
+            sys.stderr,
+            format=log_format,
+            level="INFO",
+            enqueue=True
+        )
+
+        # 添加文件处理器
+        logger.add(
+            os.path.join(log_dir, "roxy_{time:YYYY-MM-DD}.log"),
+            format=log_format,
+            level="DEBUG",
+            rotation="00:00",
+            retention="30 days",
+            enqueue=True,
+            encoding="utf-8"
+        )
+        _configured = True
+    return logger
+
+
+class _LazyLogger:
+    """首次调用日志方法时才完成 loguru 配置的代理"""
+
+    __slots__ = ("_name", "_bound")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._bound = None
+
+    def __getattr__(self, attr):
+        bound = self._bound
+        if bound is None:
+            bound = self._bound = _configure().bind(name=self._name)
+        return getattr(bound, attr)
+
 
 def get_logger(name="RoxyAutomation"):
     """获取配置好的logger实例"""
-    return logger.bind(name=name)
\ No newline at end of file
+    return _LazyLogger(name)
@@ -0,0 +1,160 @@
+import base64
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import PROXY_PROBE_CONCURRENCY, PROXY_PROBE_TIMEOUT, PROXY_PROBE_TARGET
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+CHECKS = ("tcp", "connect", "socks5")
+
+
+class ProxyProbeError(Exception):
+    """代理握手失败"""
+
+
+def _target(value: str = PROXY_PROBE_TARGET) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host, int(port)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ProxyProbeError("代理提前关闭连接")
+        data += chunk
+    return data
+
+
+def _http_connect(sock: socket.socket, proxy_info: Dict, target: Tuple[str, int]) -> None:
+    """发送 HTTP CONNECT，代理返回 2xx 视为可用"""
+    address = f"{target[0]}:{target[1]}"
+    lines = [f"CONNECT {address} HTTP/1.1", f"Host: {address}"]
+    if proxy_info.get("username"):
+        credentials = f"{proxy_info['username']}:{proxy_info.get('password', '')}".encode()
+        lines.append(f"Proxy-Authorization: Basic {base64.b64encode(credentials).decode()}")
+    sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+    response = b""
+    while b"\r\n" not in response:
+        chunk = sock.recv(1024)
+        if not chunk:
+            raise ProxyProbeError("代理提前关闭连接")
+        response += chunk
+    status_line = response.split(b"\r\n", 1)[0].decode("latin-1")
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].startswith("2"):
+        raise ProxyProbeError(f"CONNECT 失败: {status_line}")
+
+
+def _socks5_connect(sock: socket.socket, proxy_info: Dict, target: Tuple[str, int]) -> None:
+    """完成 SOCKS5 握手（含 RFC 1929 用户名密码认证）并请求连接目标"""
+    username = proxy_info.get("username")
+    sock.sendall(b"\x05\x02\x00\x02" if username else b"\x05\x01\x00")
+    version, method = _recv_exact(sock, 2)
+    if version != 5 or method == 0xFF:
+        raise ProxyProbeError("SOCKS5 不接受任何认证方式")
+    if method == 0x02:
+        if not username:
+            raise ProxyProbeError("SOCKS5 要求用户名密码认证")
+        user = username.encode()
+        password = str(proxy_info.get("password", "")).encode()
+        sock.sendall(b"\x01" + bytes([len(user)]) + user + bytes([len(password)]) + password)
+        if _recv_exact(sock, 2)[1] != 0:
+            raise ProxyProbeError("SOCKS5 认证失败")
+
+    host = target[0].encode()
+    sock.sendall(b"\x05\x01\x00\x03" + bytes([len(host)]) + host + struct.pack(">H", target[1]))
+    reply = _recv_exact(sock, 4)
+    if reply[1] != 0:
+        raise ProxyProbeError(f"SOCKS5 连接失败: 0x{reply[1]:02x}")
+    # 读完绑定地址，避免连接被对端重置影响结果
+    address_type = reply[3]
+    length = {1: 4, 4: 16}.get(address_type)
+    if length is None:
+        length = _recv_exact(sock, 1)[0]
+    _recv_exact(sock, length + 2)
+
+
+def _default_check(proxy_info: Dict) -> str:
+    category = str(proxy_info.get("proxyCategory") or "").lower()
+    if category.startswith("socks"):
+        return "socks5"
+    if category.startswith("http"):
+        return "connect"
+    return "tcp"
+
+
+def probe_proxy(
+    proxy_info: Dict,
+    check: Optional[str] = None,
+    timeout: float = PROXY_PROBE_TIMEOUT,
+    target: Optional[Tuple[str, int]] = None
+) -> Dict:
+    """检测单个代理
+
+    check 为 "tcp"（只建立 TCP 连接）、"connect"（HTTP CONNECT 隧道）或 "socks5"，
+    未指定时按 proxyCategory 选择，缺省为 tcp。返回
+    {"proxy", "alive", "latency", "check", "error"}，latency 为完成检测的秒数。
+    """
+    check = check or _default_check(proxy_info)
+    if check not in CHECKS:
+        raise ValueError(f"不支持的检测方式: {check}")
+    result = {"proxy": proxy_info, "alive": False, "latency": None, "check": check, "error": None}
+
+    if proxy_info.get("proxyMethod") == "noproxy":
+        result.update(alive=True, latency=0.0)
+        return result
+
+    host, port = proxy_info.get("proxyHost"), proxy_info.get("proxyPort")
+    if not host or not port:
+        result["error"] = "缺少代理地址或端口"
+        return result
+
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+            sock.settimeout(max(0.0, timeout - (time.perf_counter() - start)) or 0.001)
+            if check == "connect":
+                _http_connect(sock, proxy_info, target or _target())
+            elif check == "socks5":
+                _socks5_connect(sock, proxy_info, target or _target())
+    except (OSError, ProxyProbeError, ValueError) as e:
+        result["error"] = str(e) or type(e).__name__
+        return result
+    result.update(alive=True, latency=time.perf_counter() - start)
+    return result
+
+
+def probe_proxies(
+    proxies: Iterable[Dict],
+    check: Optional[str] = None,
+    timeout: float = PROXY_PROBE_TIMEOUT,
+    concurrency: int = PROXY_PROBE_CONCURRENCY,
+    target: Optional[Tuple[str, int]] = None
+) -> List[Dict]:
+    """并发检测一组代理，结果顺序与输入一致"""
+    proxies = list(proxies)
+    if not proxies:
+        return []
+    workers = max(1, min(concurrency, len(proxies)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proxy-probe") as executor:
+        results = list(executor.map(lambda proxy: probe_proxy(proxy, check, timeout, target), proxies))
+    alive = sum(1 for result in results if result["alive"])
+    logger.info(f"代理检测完成: 可用 {alive}/{len(results)}")
+    return results
+
+
+def healthy_proxies(results: Iterable[Dict], max_latency: Optional[float] = None) -> List[Dict]:
+    """从检测结果中取出可用代理，按延迟从低到高排序"""
+    alive = [
+        result for result in results
+        if result["alive"] and (max_latency is None or result["latency"] <= max_latency)
+    ]
+    alive.sort(key=lambda result: result["latency"])
+    return [result["proxy"] for result in alive]